@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Agregado de estadísticas de Estira las piernas para muchos equipos.
+
+Recorre un árbol ``RAIZ/<equipo>/<usuario>/`` con los archivos de
+estadísticas de cada usuario y escribe, por equipo, las pausas y los
+usuarios activos de cada día y de cada semana. La lógica está en
+``src/flota.py``; este programa no carga Tk ni toca la configuración
+del usuario que lo ejecuta.
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+from src import flota
+from src.estadisticas import clave_semana
+
+
+def _analizar_argumentos() -> argparse.Namespace:
+    analizador = argparse.ArgumentParser(
+        description="Agregado de estadísticas de Estira las piernas por equipo"
+    )
+    analizador.add_argument(
+        "raiz",
+        type=Path,
+        help="directorio con una carpeta por equipo y, dentro, una por usuario",
+    )
+    analizador.add_argument(
+        "-o",
+        "--salida",
+        type=Path,
+        help="informe JSON (por defecto RAIZ/flota.json)",
+    )
+    analizador.add_argument(
+        "--cache",
+        type=Path,
+        help="resúmenes por usuario de la pasada anterior "
+        "(por defecto el informe con sufijo .cache)",
+    )
+    analizador.add_argument(
+        "-j",
+        "--procesos",
+        type=int,
+        help="procesos que leen en paralelo (por defecto, uno por CPU)",
+    )
+    return analizador.parse_args()
+
+
+def principal() -> None:
+    argumentos = _analizar_argumentos()
+    if not argumentos.raiz.is_dir():
+        print(f"Aviso: {argumentos.raiz} no es un directorio.")
+        sys.exit(1)
+    salida = argumentos.salida or argumentos.raiz / "flota.json"
+    cache = argumentos.cache or salida.with_name(salida.name + ".cache")
+
+    inicio = time.perf_counter()
+    usuarios, releidos = flota.actualizar(argumentos.raiz, cache, argumentos.procesos)
+    equipos = flota.agregar(usuarios)
+    flota.escribir(salida, equipos, datetime.now().isoformat(timespec="seconds"))
+    duracion = time.perf_counter() - inicio
+
+    semana = clave_semana(date.today())
+    print(f"{'Equipo':<24} {'Usuarios':>8} {'Activos':>8} {'Pausas':>8}  ({semana})")
+    for nombre, equipo in equipos.items():
+        actual = equipo["semanal"].get(semana, {})
+        print(
+            f"{nombre:<24} {equipo['usuarios']:>8} "
+            f"{actual.get('usuarios_activos', 0):>8} {actual.get('pausas', 0):>8}"
+        )
+    print(
+        f"{len(usuarios)} usuarios ({releidos} releídos) en {duracion:.2f} s "
+        f"→ {salida}"
+    )
+
+
+if __name__ == "__main__":
+    principal()
@@ -0,0 +1,75 @@
+#!/bin/sh
+# Muestra el estado de Estira las piernas para barras de escritorio
+# (polybar, waybar, i3status…) leyendo el registro que publica la
+# aplicación, sin arrancar Python ni hablar con ella.
+#
+# Uso: estado_panel.sh [--json]
+#   --json  Salida para un módulo "custom" de waybar (text, tooltip, class)
+set -eu
+
+ARCHIVO="$HOME/.config/estira-las-piernas/panel.estado"
+JSON=false
+
+for arg in "$@"; do
+	case "$arg" in
+		--json)
+			JSON=true
+			;;
+		*)
+			echo "Uso: $0 [--json]" >&2
+			exit 1
+			;;
+	esac
+done
+
+leer() {
+	dd if="$ARCHIVO" bs=64 count=1 2>/dev/null || true
+}
+
+# Dos lecturas iguales seguidas: el registro no estaba a medio escribir
+registro="$(leer)"
+intentos=0
+while [ "$intentos" -lt 5 ]; do
+	otra="$(leer)"
+	[ "$otra" = "$registro" ] && break
+	registro="$otra"
+	intentos=$((intentos + 1))
+done
+
+# shellcheck disable=SC2086
+set -- $registro
+if [ "$#" -lt 8 ] || [ "$1" != "ELP1" ]; then
+	texto="⏸ sin datos"
+	detalle="Estira las piernas no ha publicado su estado"
+	clase="parado"
+else
+	en_marcha="$3"
+	fase="$4"
+	vence="$5"
+	dia="$6"
+	pausas="$7"
+	racha="$8"
+	[ "$dia" = "$(date +%Y%m%d)" ] || pausas=0
+
+	if [ "$en_marcha" != "1" ]; then
+		texto="⏸"
+		clase="parado"
+	else
+		restante=$((vence - $(date +%s)))
+		[ "$restante" -ge 0 ] || restante=0
+		cuenta="$(printf '%02d:%02d' $((restante / 60)) $((restante % 60)))"
+		case "$fase" in
+			T) texto="🍅 $cuenta"; clase="trabajo" ;;
+			D) texto="☕ $cuenta"; clase="descanso" ;;
+			*) texto="🦵 $cuenta"; clase="simple" ;;
+		esac
+	fi
+	detalle="Pausas hoy: $pausas · Racha: $racha días"
+fi
+
+if [ "$JSON" = true ]; then
+	printf '{"text": "%s", "tooltip": "%s", "class": "%s"}\n' \
+		"$texto" "$detalle" "$clase"
+else
+	printf '%s\n' "$texto"
+fi
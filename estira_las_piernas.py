@@ -2,23 +2,100 @@
 """Estira las piernas – Recordatorio saludable para pausas activas.
 
 Punto de entrada de la aplicación. La lógica está en el paquete ``src/``.
+Con ``--headless`` arranca sin ventana (ni Tk) y la crea al pedirla
+desde la bandeja o el atajo global.
+
+Solo puede haber una instancia: si ya hay otra en marcha, este programa
+le envía una orden por el socket de control y termina sin cargar Tk.
 """
 
+import argparse
 import signal
 import sys
-import tkinter as tk
 
-from src.aplicacion import AplicacionRecordatorioEstiramiento
+from src import control
+from src import perfil
+
+
+def _analizar_argumentos() -> argparse.Namespace:
+    analizador = argparse.ArgumentParser(description="Estira las piernas")
+    analizador.add_argument(
+        "--headless",
+        action="store_true",
+        help="arrancar sin ventana; se crea al mostrarla desde la bandeja",
+    )
+    analizador.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="RUTA",
+        help="medir arranque y avisos y guardar el informe JSON en RUTA "
+        "(por defecto ~/.config/estira-las-piernas/perfil.json)",
+    )
+    analizador.add_argument(
+        "orden",
+        nargs="?",
+        choices=sorted(control.ORDENES),
+        help="orden para la instancia en marcha (no arranca una nueva)",
+    )
+    return analizador.parse_args()
+
+
+def _reenviar(orden: str, espera: float) -> int:
+    respuesta = control.enviar(orden, espera)
+    if respuesta is None:
+        print("Aviso: no hay ninguna instancia de Estira las piernas en marcha.")
+        return 1
+    print(respuesta)
+    return 1 if respuesta.startswith("error:") else 0
 
 
 def principal() -> None:
-    ventana_raiz = tk.Tk()
-    app = AplicacionRecordatorioEstiramiento(ventana_raiz)
+    argumentos = _analizar_argumentos()
+
+    if argumentos.orden is not None:
+        sys.exit(_reenviar(control.ORDENES[argumentos.orden], 0.0))
+
+    servidor = control.ServidorControl()
+    if not servidor.adquirir():
+        # Otra instancia en marcha: el autoarranque no hace nada más y el
+        # lanzador le pide que muestre su ventana
+        orden = "estado" if argumentos.headless else "mostrar"
+        sys.exit(_reenviar(orden, control.ESPERA_ARRANQUE_S))
+
+    if argumentos.profile is not None:
+        perfil.activar(argumentos.profile or None)
+    else:
+        perfil.activar_por_entorno()
+
+    if argumentos.headless:
+        with perfil.medir("importaciones"):
+            from src.demonio import Demonio
+
+        instancia = Demonio(servidor)
+        salir = instancia.salir
+        ejecutar = instancia.ejecutar
+    else:
+        with perfil.medir("importaciones"):
+            import tkinter as tk
+
+            from src.aplicacion import AplicacionRecordatorioEstiramiento
+
+        with perfil.medir("tk"):
+            ventana_raiz = tk.Tk()
+        app = AplicacionRecordatorioEstiramiento(ventana_raiz)
+        buzon = control.Buzon(ventana_raiz.tk)
+        servidor.iniciar(app.atender_orden, buzon.llamar)
+        salir = app.salir_aplicacion
+
+        def ejecutar() -> None:
+            perfil.fin_arranque()
+            ventana_raiz.mainloop()
 
     def _al_interrumpir(*_args) -> None:
         print("\n👋 Cerrando Estira las piernas…")
         try:
-            app.salir_aplicacion()
+            salir()
         except Exception:
             pass
         sys.exit(0)
@@ -27,9 +104,11 @@ def principal() -> None:
     signal.signal(signal.SIGTERM, _al_interrumpir)
 
     try:
-        ventana_raiz.mainloop()
+        ejecutar()
     except KeyboardInterrupt:
         _al_interrumpir()
+    finally:
+        servidor.cerrar()
 
 
 if __name__ == "__main__":
@@ -74,7 +74,7 @@ elif [ "$INSTALAR_AUTOARRANQUE" = true ]; then
 [Desktop Entry]
 Name=Estira las piernas
 Comment=Recordatorio para levantarte cada cierto tiempo
-Exec=python3 "$ARCHIVO_APP"
+Exec=python3 "$ARCHIVO_APP" --headless
 Icon=$RUTA_ICONO
 Terminal=false
 Type=Application
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Servidor de sincronización de Estira las piernas.
+
+Reparte entre los equipos de un mismo usuario los contadores de pausas
+por día, mes y semana (ver ``src/sincronizacion.py``). Cada equipo lo usa añadiendo
+``"sincronizacion_url": "http://EQUIPO:PUERTO"`` a su ``config.json``;
+el equipo que lo ejecuta puede apuntar a ``http://127.0.0.1:PUERTO``.
+
+No tiene autenticación: por defecto solo escucha en la propia máquina.
+Para otros equipos, ``--direccion 0.0.0.0`` en una red de confianza o
+detrás de un túnel SSH o un proxy con TLS.
+"""
+
+import argparse
+from pathlib import Path
+
+from src.constantes import PUERTO_SINCRONIZACION, RUTA_SERVIDOR_SINCRONIZACION
+from src.sincronizacion import ServidorSincronizacion
+
+
+def _analizar_argumentos() -> argparse.Namespace:
+    analizador = argparse.ArgumentParser(
+        description="Servidor de sincronización de Estira las piernas"
+    )
+    analizador.add_argument(
+        "--direccion",
+        default="127.0.0.1",
+        help="dirección en la que escuchar (por defecto 127.0.0.1)",
+    )
+    analizador.add_argument(
+        "--puerto",
+        type=int,
+        default=PUERTO_SINCRONIZACION,
+        help=f"puerto TCP (por defecto {PUERTO_SINCRONIZACION})",
+    )
+    analizador.add_argument(
+        "--datos",
+        type=Path,
+        default=RUTA_SERVIDOR_SINCRONIZACION,
+        help="archivo JSON con los contadores de todos los equipos "
+        "(por defecto ~/.config/estira-las-piernas/servidor_sincronizacion.json)",
+    )
+    return analizador.parse_args()
+
+
+def principal() -> None:
+    argumentos = _analizar_argumentos()
+    try:
+        ServidorSincronizacion(argumentos.datos).servir(
+            argumentos.direccion, argumentos.puerto
+        )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    principal()
@@ -0,0 +1,153 @@
+"""Análisis del historial de eventos para la pestaña Estadísticas.
+
+Las cifras se calculan por lotes sobre las columnas (``array``) de
+``Historial``, sin bucles de Python por evento: las marcas se pasan a
+hora local por tramos con el mismo desfase UTC (solo cambia con el
+horario de verano, y los tramos se localizan con búsquedas binarias) y
+después se agrupan por día y por hora con ``map`` y ``Counter``, que
+recorren en C. Los huecos entre avisos salen de la primera y la última
+marca de cada día, localizadas con ``bisect``.
+
+El resultado se guarda hasta que el historial crece o cambia el día,
+así que abrir la pestaña o refrescarla entre dos pausas no recorre
+nada.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import Counter
+from datetime import date, datetime, timedelta
+from itertools import compress, repeat
+from operator import add, floordiv, mod
+from typing import Iterator, NamedTuple
+
+from .constantes import SEMANAS_MEDIA
+from .historial import RESULTADO_SALTADO, TIPO_AVISO, TIPO_DESCANSO, Historial
+
+_EPOCA = date(1970, 1, 1).toordinal()
+_DIA_S = 86400
+# Salto con el que se buscan los cambios de horario (menor que medio año)
+_SALTO_TRAMO_S = 30 * _DIA_S
+
+# Tablas para bytes.translate: 1 en la posición del tipo y 0 en el resto,
+# selectores de itertools.compress sin recorrer los tipos en Python
+_SOLO = {
+    tipo: bytes(int(i == tipo) for i in range(256))
+    for tipo in (TIPO_AVISO, TIPO_DESCANSO)
+}
+
+
+class Resumen(NamedTuple):
+    media_semanal: float
+    # Avisos por hora local del día (24 posiciones)
+    por_hora: tuple[int, ...]
+    # Minutos medios entre dos avisos del mismo día
+    separacion_media_min: float | None
+    descansos: int
+    # Fracción de descansos Pomodoro saltados con Escape
+    tasa_saltos: float | None
+
+
+def _desfase(marca: int) -> int:
+    """Segundos que hay que sumar a *marca* para tener la hora local."""
+    desfase = datetime.fromtimestamp(marca).astimezone().utcoffset()
+    return int(desfase.total_seconds()) if desfase is not None else 0
+
+
+def _tramos(marcas: list[int]) -> Iterator[tuple[int, int, int]]:
+    """(desde, hasta, desfase) de los tramos de *marcas* con igual desfase."""
+    inicio, total = 0, len(marcas)
+    while inicio < total:
+        desfase = _desfase(marcas[inicio])
+        fin = inicio + 1
+        while fin < total:
+            siguiente = marcas[fin - 1] + _SALTO_TRAMO_S
+            salto = max(fin + 1, bisect_left(marcas, siguiente, fin))
+            if _desfase(marcas[salto - 1]) == desfase:
+                fin = salto
+                continue
+            # El cambio está en [fin, salto): búsqueda binaria
+            bajo, alto = fin, salto - 1
+            while bajo < alto:
+                medio = (bajo + alto) // 2
+                if _desfase(marcas[medio]) == desfase:
+                    bajo = medio + 1
+                else:
+                    alto = medio
+            fin = bajo
+            break
+        yield inicio, fin, desfase
+        inicio = fin
+
+
+class _Agregado(NamedTuple):
+    por_dia: Counter
+    por_hora: Counter
+    suma_huecos: int
+    huecos: int
+
+
+def _agregar(marcas: list[int]) -> _Agregado:
+    """Avisos por día (ordinal) y por hora local, y huecos del mismo día."""
+    por_dia: Counter = Counter()
+    por_hora: Counter = Counter()
+    suma_huecos = huecos = 0
+    for desde, hasta, desfase in _tramos(marcas):
+        locales = list(map(add, marcas[desde:hasta], repeat(desfase)))
+        dias = Counter(map(floordiv, locales, repeat(_DIA_S)))
+        por_hora.update(map(mod, map(floordiv, locales, repeat(3600)), repeat(24)))
+        for dia, avisos in dias.items():
+            if avisos > 1:
+                primero = bisect_left(locales, dia * _DIA_S)
+                ultimo = primero + avisos - 1
+                suma_huecos += locales[ultimo] - locales[primero]
+                huecos += avisos - 1
+            por_dia[dia + _EPOCA] += avisos
+    return _Agregado(por_dia, por_hora, suma_huecos, huecos)
+
+
+def calcular(historial: Historial, hoy: date) -> Resumen:
+    """Recorre el historial una vez y devuelve todas las cifras."""
+    tipos = historial.tipos.tobytes()
+    marcas = list(compress(historial.marcas, tipos.translate(_SOLO[TIPO_AVISO])))
+    agregado = _agregar(marcas)
+    por_dia = agregado.por_dia
+
+    lunes = (hoy - timedelta(days=hoy.weekday())).toordinal()
+    inicio_media = lunes - 7 * SEMANAS_MEDIA
+    previas = sum(
+        pausas for dia, pausas in por_dia.items() if inicio_media <= dia < lunes
+    )
+
+    resultados = bytes(
+        compress(historial.resultados, tipos.translate(_SOLO[TIPO_DESCANSO]))
+    )
+    saltados = resultados.count(RESULTADO_SALTADO)
+
+    return Resumen(
+        media_semanal=previas / SEMANAS_MEDIA,
+        por_hora=tuple(agregado.por_hora[hora] for hora in range(24)),
+        separacion_media_min=(
+            agregado.suma_huecos / agregado.huecos / 60 if agregado.huecos else None
+        ),
+        descansos=len(resultados),
+        tasa_saltos=saltados / len(resultados) if resultados else None,
+    )
+
+
+class Analizador:
+    """Calcula el ``Resumen`` de un historial y lo guarda en caché."""
+
+    def __init__(self, historial: Historial) -> None:
+        self._historial = historial
+        self._clave: tuple[int, date] | None = None
+        self._resumen: Resumen | None = None
+
+    def resumen(self) -> Resumen:
+        hoy = date.today()
+        clave = (len(self._historial), hoy)
+        if self._resumen is None or clave != self._clave:
+            self._resumen = calcular(self._historial, hoy)
+            self._clave = clave
+        return self._resumen
@@ -4,71 +4,135 @@ from __future__ import annotations
 
 import tkinter as tk
 import webbrowser
-from datetime import datetime, timedelta
 from tkinter import filedialog, messagebox, ttk
+from typing import Callable
 
 from .constantes import (
     ATAJOS_PREDETERMINADOS,
     INTERVALO_MAXIMO_MINUTOS,
     INTERVALO_MINIMO_MINUTOS,
     INTERVALO_PREDETERMINADO_MINUTOS,
-    KEYBINDER_DISPONIBLE,
+    MOTOR_ESTADISTICAS_PREDETERMINADO,
     NOMBRE_APP,
     POMODORO_DESCANSO_PREDETERMINADO,
     POMODORO_TRABAJO_PREDETERMINADO,
+    RECORDATORIOS_ADICIONALES,
+    RETARDO_PREPARAR_DESCANSO_MS,
+    RETENCION_DIAS_PREDETERMINADA,
     RUTA_ICONO,
+    SEMANAS_MEDIA,
     SONIDOS_SISTEMA,
 )
 from . import atajos
+from . import bucle_glib
 from . import config as cfg
-from . import notificaciones
+from . import control
+from . import perfil
 from . import sonido
 from .bandeja import BandejaSistema
 from .estadisticas import Estadisticas
 from .estilo import configurar_estilo
+from .motor import MotorRecordatorios, normalizar_intervalo
+from .planificador import POLITICA_UNA_VEZ, Planificador, hasta_proximo_segundo
 from .ventana_descanso import VentanaDescanso
 
+# Alturas del histograma de pausas por hora
+_BARRAS = "▁▂▃▄▅▆▇█"
+
 
 class AplicacionRecordatorioEstiramiento:
     """Ventana principal con pestañas, temporizador y bandeja del sistema."""
 
-    def __init__(self, ventana_raiz: tk.Tk) -> None:
+    def __init__(
+        self,
+        ventana_raiz: tk.Tk,
+        motor: MotorRecordatorios | None = None,
+        bandeja: BandejaSistema | None = None,
+    ) -> None:
+        """Con *motor* y *bandeja* se adopta un motor ya en marcha (modo
+        ``--headless``): la bandeja y los atajos siguen siendo suyos."""
         self.ventana_raiz = ventana_raiz
         self.ventana_raiz.title(NOMBRE_APP)
         self.ventana_raiz.resizable(False, False)
+        self._ventana_visible = True
+
+        motor_propio = motor is None
+        if motor is None:
+            with perfil.medir("config.cargar"):
+                config = cfg.cargar()
+            with perfil.medir("estadisticas.cargar"):
+                estadisticas = Estadisticas(
+                    config.get(
+                        "motor_estadisticas", MOTOR_ESTADISTICAS_PREDETERMINADO
+                    ),
+                    config.get("retencion_dias", RETENCION_DIAS_PREDETERMINADA),
+                )
+            motor = MotorRecordatorios(
+                Planificador(self.ventana_raiz), config, estadisticas
+            )
+        else:
+            # Los plazos y el bombeo de GLib pasan al bucle de Tk
+            motor.planificador.cambiar_temporizador(self.ventana_raiz)
+            bucle_glib.cambiar_temporizador(self.ventana_raiz)
 
-        # Estado del temporizador
-        self.trabajo_recordatorio: str | None = None
-        self.trabajo_reloj: str | None = None
-        self.proximo_recordatorio_en: datetime | None = None
-        self.en_ejecucion = False
-
-        # Pomodoro
-        self.modo_pomodoro = False
-        self.fase_pomodoro: str = "trabajo"
-        self.pomodoros_completados = 0
-
-        # Ventana de descanso activa
-        self.ventana_descanso: VentanaDescanso | None = None
+        # Temporizador, Pomodoro y avisos: todos los plazos viven en el motor
+        self.motor = motor
+        self.planificador = motor.planificador
+        self.recordatorios = motor.recordatorios
+        self.estadisticas = motor.estadisticas
 
-        # Módulos auxiliares
-        self.estadisticas = Estadisticas()
-        self.bandeja = BandejaSistema()
+        # Ventana de descanso: se construye oculta tras el arranque y se reutiliza
+        self.ventana_descanso = VentanaDescanso(self.ventana_raiz, self.planificador)
+        self.ventana_raiz.after(
+            RETARDO_PREPARAR_DESCANSO_MS, self.ventana_descanso.preparar
+        )
 
         # Configuración persistente
-        self.config = cfg.cargar()
+        self.config = motor.config
+        self._guardado_config = cfg.GuardadoDiferido(self.config)
+
+        self._bandeja_propia = bandeja is None
+        self.bandeja = bandeja if bandeja is not None else BandejaSistema()
 
         # Variables de tkinter
         self._crear_variables_tk()
 
         # Inicialización
-        configurar_estilo(self.ventana_raiz)
-        self._construir_interfaz()
+        with perfil.medir("estilo"):
+            configurar_estilo(self.ventana_raiz)
+        with perfil.medir("interfaz"):
+            self._construir_interfaz()
         self.actualizar_estadisticas_ui()
-        self._iniciar_bandeja()
-        self._registrar_atajos_globales()
+        if self._bandeja_propia:
+            bucle_glib.iniciar(self.ventana_raiz)
+            with perfil.medir("bandeja"):
+                self._iniciar_bandeja()
+            with perfil.medir("atajos"):
+                self._registrar_atajos_globales()
+
+        motor.al_sincronizar_config = self._volcar_variables_en_config
+        motor.al_cambiar_estado = self._al_cambiar_estado_motor
+        motor.al_registrar_pausa = self.actualizar_estadisticas_ui
+        motor.al_iniciar_descanso = self._mostrar_ventana_descanso
+        motor.al_cancelar_descanso = self._cerrar_ventana_descanso
+        # Un motor propio sigue donde lo dejó la ejecución anterior
+        if motor_propio and motor.reanudar():
+            self.variable_modo_pomodoro.set(motor.modo_pomodoro)
+        if motor.en_ejecucion:
+            self._al_cambiar_estado_motor()
 
         self.ventana_raiz.protocol("WM_DELETE_WINDOW", self.al_pulsar_cerrar)
+        self.ventana_raiz.bind("<Map>", self._al_mapear, add="+")
+        self.ventana_raiz.bind("<Unmap>", self._al_desmapear, add="+")
+
+        construidas = len(self._pestanas_construidas)
+        perfil.anotar_arranque(
+            "pestanas",
+            {
+                "construidas": construidas,
+                "total": construidas + len(self._pestanas_pendientes),
+            },
+        )
 
     # ── Variables de tkinter ───────────────────────────────────────
 
@@ -78,7 +142,10 @@ class AplicacionRecordatorioEstiramiento:
             value=c.get("interval_minutes", INTERVALO_PREDETERMINADO_MINUTOS)
         )
         self.variable_estado = tk.StringVar(value="Configurado y detenido")
-        self.variable_cuenta_regresiva = tk.StringVar(value="Temporizador inactivo")
+        self._texto_cuenta_regresiva = "Temporizador inactivo"
+        self.variable_cuenta_regresiva = tk.StringVar(
+            value=self._texto_cuenta_regresiva
+        )
 
         self.variable_pomodoro_trabajo = tk.IntVar(
             value=c.get("pomodoro_trabajo", POMODORO_TRABAJO_PREDETERMINADO)
@@ -98,6 +165,13 @@ class AplicacionRecordatorioEstiramiento:
         self.variable_pausas_hoy = tk.StringVar()
         self.variable_racha = tk.StringVar()
         self.variable_tiempo_activo = tk.StringVar()
+        self.variable_semana = tk.StringVar()
+        self.variable_mes = tk.StringVar()
+        self.variable_media_semanal = tk.StringVar()
+        self.variable_separacion = tk.StringVar()
+        self.variable_saltos = tk.StringVar()
+        self.variable_mejor_racha = tk.StringVar()
+        self.variable_horas = tk.StringVar()
 
         self.variable_atajo_toggle = tk.StringVar(
             value=c.get(
@@ -110,22 +184,39 @@ class AplicacionRecordatorioEstiramiento:
             )
         )
 
+        # Recordatorios adicionales: tipo → (activo, intervalo, sonido)
+        self.variables_recordatorios: dict[
+            str, tuple[tk.BooleanVar, tk.IntVar, tk.StringVar]
+        ] = {
+            tipo: (
+                tk.BooleanVar(value=valores["activo"]),
+                tk.IntVar(value=valores["intervalo"]),
+                tk.StringVar(value=valores["sonido"]),
+            )
+            for tipo, valores in self.recordatorios.ajustes().items()
+        }
+
     # ── Configuración persistente ──────────────────────────────────
 
-    def _guardar_config(self) -> None:
+    def _volcar_variables_en_config(self) -> None:
+        """Copia los valores de los widgets al dict compartido con el motor."""
         self.config.update(
             {
                 "interval_minutes": self.obtener_intervalo_actual(),
-                "modo_pomodoro": self.modo_pomodoro,
+                "modo_pomodoro": self.motor.modo_pomodoro,
                 "pomodoro_trabajo": self.variable_pomodoro_trabajo.get(),
                 "pomodoro_descanso": self.variable_pomodoro_descanso.get(),
                 "sonido": self.variable_sonido.get(),
                 "sonido_personalizado": self.variable_sonido_personalizado.get(),
                 "atajo_toggle": self.variable_atajo_toggle.get(),
                 "atajo_ventana": self.variable_atajo_ventana.get(),
+                "recordatorios": self._leer_recordatorios_ui(),
             }
         )
-        cfg.guardar(self.config)
+
+    def _guardar_config(self) -> None:
+        self._volcar_variables_en_config()
+        self._guardado_config.programar(self.config)
 
     # ── Construcción de la interfaz ────────────────────────────────
 
@@ -151,9 +242,13 @@ class AplicacionRecordatorioEstiramiento:
         pestanas = ttk.Notebook(tarjeta)
         pestanas.grid(row=2, column=0, sticky="nsew", pady=(0, 10))
 
+        # Cada pestaña se construye la primera vez que se selecciona
+        self._pestanas_pendientes: dict[str, tuple[ttk.Frame, Callable]] = {}
+        self._pestanas_construidas: set[str] = set()
         for texto, constructor in [
             (" Temporizador ", self._construir_tab_principal),
             (" Pomodoro ", self._construir_tab_pomodoro),
+            (" Recordatorios ", self._construir_tab_recordatorios),
             (" Sonido ", self._construir_tab_sonido),
             (" Estadísticas ", self._construir_tab_estadisticas),
             (" Atajos ", self._construir_tab_atajos),
@@ -162,7 +257,9 @@ class AplicacionRecordatorioEstiramiento:
             tab = ttk.Frame(pestanas, style="Card.TFrame", padding=10)
             pestanas.add(tab, text=texto)
             tab.columnconfigure(0, weight=1)
-            constructor(tab)
+            self._pestanas_pendientes[str(tab)] = (tab, constructor)
+        pestanas.bind("<<NotebookTabChanged>>", self._al_cambiar_pestana)
+        self._construir_pestana(pestanas.select())
 
         ttk.Separator(tarjeta).grid(row=3, column=0, sticky="ew", pady=(0, 8))
         ttk.Label(
@@ -174,6 +271,17 @@ class AplicacionRecordatorioEstiramiento:
             style="EstadoSecundario.TLabel",
         ).grid(row=5, column=0, sticky="w", pady=(4, 0))
 
+    def _al_cambiar_pestana(self, evento) -> None:
+        self._construir_pestana(evento.widget.select())
+
+    def _construir_pestana(self, nombre: str) -> None:
+        pendiente = self._pestanas_pendientes.pop(nombre, None)
+        if pendiente is None:
+            return
+        tab, constructor = pendiente
+        constructor(tab)
+        self._pestanas_construidas.add(nombre)
+
     # ── Pestañas individuales ──────────────────────────────────────
 
     def _construir_tab_principal(self, padre: ttk.Frame) -> None:
@@ -264,6 +372,49 @@ class AplicacionRecordatorioEstiramiento:
         )
         self.boton_pomodoro_detener.grid(row=0, column=1)
 
+        if self.motor.en_ejecucion:
+            self._actualizar_etiqueta_pomodoro()
+
+    def _construir_tab_recordatorios(self, padre: ttk.Frame) -> None:
+        ttk.Label(
+            padre,
+            text="Avisos adicionales mientras el temporizador está activo.",
+            style="TextoSuave.TLabel",
+        ).grid(row=0, column=0, columnspan=4, sticky="w", pady=(0, 8))
+
+        sonidos = list(SONIDOS_SISTEMA.keys())
+        for fila, (tipo, (activo, intervalo, nombre_sonido)) in enumerate(
+            self.variables_recordatorios.items(), start=1
+        ):
+            ttk.Checkbutton(
+                padre,
+                text=RECORDATORIOS_ADICIONALES[tipo]["nombre"],
+                variable=activo,
+                command=self._al_cambiar_recordatorios,
+            ).grid(row=fila, column=0, sticky="w", pady=(6, 0))
+            ttk.Spinbox(
+                padre,
+                from_=1,
+                to=INTERVALO_MAXIMO_MINUTOS,
+                textvariable=intervalo,
+                width=5,
+                justify="center",
+            ).grid(row=fila, column=1, padx=(10, 4), pady=(6, 0))
+            ttk.Label(padre, text="min", style="TextoSuave.TLabel").grid(
+                row=fila, column=2, sticky="w", pady=(6, 0)
+            )
+            combo = ttk.Combobox(
+                padre,
+                textvariable=nombre_sonido,
+                values=sonidos,
+                state="readonly",
+                width=12,
+            )
+            combo.grid(row=fila, column=3, padx=(10, 0), pady=(6, 0))
+            combo.bind(
+                "<<ComboboxSelected>>", lambda _e: self._al_cambiar_recordatorios()
+            )
+
     def _construir_tab_sonido(self, padre: ttk.Frame) -> None:
         ttk.Label(padre, text="Sonido de aviso:", style="Texto.TLabel").grid(
             row=0, column=0, sticky="w"
@@ -306,6 +457,12 @@ class AplicacionRecordatorioEstiramiento:
             ("Pausas hoy:", self.variable_pausas_hoy),
             ("Racha de días:", self.variable_racha),
             ("Tiempo activo hoy:", self.variable_tiempo_activo),
+            ("Esta semana:", self.variable_semana),
+            ("Este mes:", self.variable_mes),
+            (f"Media semanal ({SEMANAS_MEDIA} sem.):", self.variable_media_semanal),
+            ("Mejor racha:", self.variable_mejor_racha),
+            ("Tiempo entre pausas:", self.variable_separacion),
+            ("Descansos saltados:", self.variable_saltos),
         ]
         for i, (etiqueta, var) in enumerate(filas):
             ttk.Label(padre, text=etiqueta, style="Texto.TLabel").grid(
@@ -315,8 +472,22 @@ class AplicacionRecordatorioEstiramiento:
                 row=i, column=1, sticky="w", padx=(10, 0), pady=(6, 0)
             )
 
+        ttk.Label(padre, text="Pausas por hora:", style="Texto.TLabel").grid(
+            row=len(filas), column=0, sticky="nw", pady=(12, 0)
+        )
+        self.etiqueta_horas = ttk.Label(
+            padre,
+            textvariable=self.variable_horas,
+            style="TextoSuave.TLabel",
+            font=("Monospace", 10),
+        )
+        self.etiqueta_horas.grid(
+            row=len(filas), column=1, sticky="w", padx=(10, 0), pady=(12, 0)
+        )
+        self._actualizar_analisis()
+
     def _construir_tab_atajos(self, padre: ttk.Frame) -> None:
-        if not KEYBINDER_DISPONIBLE:
+        if not atajos.disponible():
             ttk.Label(
                 padre,
                 text="Keybinder3 no disponible.\n"
@@ -386,7 +557,7 @@ class AplicacionRecordatorioEstiramiento:
 
     @staticmethod
     def normalizar_intervalo(valor: int) -> int:
-        return max(INTERVALO_MINIMO_MINUTOS, min(INTERVALO_MAXIMO_MINUTOS, valor))
+        return normalizar_intervalo(valor)
 
     def obtener_intervalo_actual(self) -> int:
         try:
@@ -400,190 +571,138 @@ class AplicacionRecordatorioEstiramiento:
     # ── Temporizador ───────────────────────────────────────────────
 
     def iniciar(self) -> None:
-        if self.modo_pomodoro:
-            self.fase_pomodoro = "trabajo"
-            self.pomodoros_completados = 0
-            self._actualizar_etiqueta_pomodoro()
-
-        self.en_ejecucion = True
         self._guardar_config()
-        self._actualizar_texto_estado()
-        self._programar_siguiente()
+        self.motor.iniciar()
 
     def _iniciar_temporizador(self) -> None:
         """Inicia el temporizador simple (pestaña Temporizador)."""
-        self.modo_pomodoro = False
+        self.motor.modo_pomodoro = False
         self.variable_modo_pomodoro.set(False)
         self.iniciar()
 
     def detener(self) -> None:
-        self.en_ejecucion = False
-        if self.trabajo_recordatorio is not None:
-            self.ventana_raiz.after_cancel(self.trabajo_recordatorio)
-            self.trabajo_recordatorio = None
-        if self.trabajo_reloj is not None:
-            self.ventana_raiz.after_cancel(self.trabajo_reloj)
-            self.trabajo_reloj = None
-        if self.ventana_descanso is not None:
-            self.ventana_descanso.cerrar()
-            self.ventana_descanso = None
-        self.proximo_recordatorio_en = None
-        self.variable_estado.set("Recordatorio detenido")
-        self.variable_cuenta_regresiva.set("Temporizador inactivo")
+        self.motor.detener()
 
     def alternar_temporizador(self) -> None:
-        if self.en_ejecucion:
+        if self.motor.en_ejecucion:
             self.detener()
         else:
             self.iniciar()
 
-    def _obtener_intervalo_fase_actual(self) -> int:
-        if self.modo_pomodoro:
-            if self.fase_pomodoro == "trabajo":
-                try:
-                    return max(1, int(self.variable_pomodoro_trabajo.get()))
-                except Exception:
-                    return POMODORO_TRABAJO_PREDETERMINADO
-            try:
-                return max(1, int(self.variable_pomodoro_descanso.get()))
-            except Exception:
-                return POMODORO_DESCANSO_PREDETERMINADO
-        return self.obtener_intervalo_actual()
-
-    def _programar_siguiente(self) -> None:
-        if self.trabajo_recordatorio is not None:
-            self.ventana_raiz.after_cancel(self.trabajo_recordatorio)
-        intervalo_min = self._obtener_intervalo_fase_actual()
-        intervalo_ms = intervalo_min * 60 * 1000
-        self.proximo_recordatorio_en = datetime.now() + timedelta(
-            milliseconds=intervalo_ms
-        )
-        self.trabajo_recordatorio = self.ventana_raiz.after(
-            intervalo_ms, self._al_recordatorio
-        )
+    def _al_cambiar_estado_motor(self) -> None:
+        self.variable_estado.set(self.motor.texto_estado())
+        self._actualizar_etiqueta_pomodoro()
         self._actualizar_cuenta_regresiva()
 
+    # ── Cuenta atrás visible ───────────────────────────────────────
+    # Solo hay ticks por segundo mientras la ventana está visible; oculta
+    # en la bandeja, el único despertar es el plazo real del recordatorio.
+
+    def _al_mapear(self, evento) -> None:
+        if evento.widget is self.ventana_raiz:
+            self._ventana_visible = True
+            self._actualizar_cuenta_regresiva()
+
+    def _al_desmapear(self, evento) -> None:
+        if evento.widget is self.ventana_raiz:
+            self._ventana_visible = False
+            self.planificador.cancelar("reloj")
+
     def _actualizar_cuenta_regresiva(self) -> None:
-        if not self.en_ejecucion or self.proximo_recordatorio_en is None:
-            self.variable_cuenta_regresiva.set("Temporizador inactivo")
-            self.trabajo_reloj = None
+        restante = self.motor.restante()
+        if restante is None:
+            texto = "Temporizador inactivo"
+            if self.motor.en_descanso_visual:
+                texto = "☕ Descanso en curso"
+            self._fijar_cuenta_regresiva(texto)
+            self.planificador.cancelar("reloj")
             return
-        restante = self.proximo_recordatorio_en - datetime.now()
-        total_segundos = max(0, int(restante.total_seconds()))
-        minutos, segundos = divmod(total_segundos, 60)
+        minutos, segundos = divmod(int(restante), 60)
         prefijo = ""
-        if self.modo_pomodoro:
-            prefijo = "🍅 " if self.fase_pomodoro == "trabajo" else "☕ "
-        self.variable_cuenta_regresiva.set(
+        if self.motor.modo_pomodoro:
+            prefijo = "🍅 " if self.motor.fase_pomodoro == "trabajo" else "☕ "
+        self._fijar_cuenta_regresiva(
             f"{prefijo}Próximo aviso en {minutos:02d}:{segundos:02d}"
         )
-        self.trabajo_reloj = self.ventana_raiz.after(
-            1000, self._actualizar_cuenta_regresiva
+        if not self._ventana_visible:
+            self.planificador.cancelar("reloj")
+            return
+        # Siguiente tick justo al cruzar el próximo segundo: sin deriva
+        self.planificador.programar(
+            "reloj",
+            hasta_proximo_segundo(restante),
+            self._actualizar_cuenta_regresiva,
+            politica=POLITICA_UNA_VEZ,
         )
 
-    def _al_recordatorio(self) -> None:
-        if not self.en_ejecucion:
-            return
-        self.estadisticas.registrar_pausa()
-        self.actualizar_estadisticas_ui()
-        if self.modo_pomodoro:
-            if self.fase_pomodoro == "trabajo":
-                self.pomodoros_completados += 1
-                notificaciones.notificar(
-                    "Descanso", "¡Buen trabajo! Tómate un descanso."
-                )
-                self.fase_pomodoro = "descanso"
-                self._reproducir_pitido()
-                self._actualizar_etiqueta_pomodoro()
-                self._actualizar_texto_estado()
-                self._mostrar_ventana_descanso()
-                return
-            else:
-                notificaciones.notificar(
-                    "A trabajar", "El descanso terminó. ¡Vamos de nuevo!"
-                )
-                self.fase_pomodoro = "trabajo"
-            self._actualizar_etiqueta_pomodoro()
-            self._actualizar_texto_estado()
-        else:
-            notificaciones.notificar(
-                "Hora de moverse",
-                "Levántate y estira las piernas unos minutos.",
-            )
-        self._reproducir_pitido()
-        self._programar_siguiente()
+    def _fijar_cuenta_regresiva(self, texto: str) -> None:
+        """Actualiza la etiqueta solo si el texto cambia (evita ida a Tcl)."""
+        if texto != self._texto_cuenta_regresiva:
+            self._texto_cuenta_regresiva = texto
+            self.variable_cuenta_regresiva.set(texto)
 
     def _probar_aviso_ahora(self) -> None:
-        notificaciones.notificar(
-            "Hora de moverse",
-            "Levántate y estira las piernas unos minutos.",
-        )
-        self._reproducir_pitido()
-
-    def _actualizar_texto_estado(self) -> None:
-        if self.modo_pomodoro:
-            fase = "Trabajo" if self.fase_pomodoro == "trabajo" else "Descanso"
-            self.variable_estado.set(
-                f"Pomodoro: {fase} · Completados: {self.pomodoros_completados}"
-            )
-        else:
-            intervalo = self.obtener_intervalo_actual()
-            self.variable_estado.set(f"Recordatorio activo cada {intervalo} min")
+        self._volcar_variables_en_config()
+        self.motor.probar_aviso()
 
     # ── Pomodoro ───────────────────────────────────────────────────
 
     def _al_cambiar_modo_pomodoro(self) -> None:
-        if self.en_ejecucion:
+        if self.motor.en_ejecucion:
             self.detener()
         self._guardar_config()
 
     def _iniciar_pomodoro(self) -> None:
         """Activa el modo Pomodoro e inicia el temporizador."""
-        self.modo_pomodoro = True
+        self.motor.modo_pomodoro = True
         self.variable_modo_pomodoro.set(True)
         self.iniciar()
 
-    def _mostrar_ventana_descanso(self) -> None:
-        """Abre la ventana fullscreen de descanso y pausa el temporizador."""
-        # Pausar el temporizador normal durante el descanso visual
-        if self.trabajo_recordatorio is not None:
-            self.ventana_raiz.after_cancel(self.trabajo_recordatorio)
-            self.trabajo_recordatorio = None
-        if self.trabajo_reloj is not None:
-            self.ventana_raiz.after_cancel(self.trabajo_reloj)
-            self.trabajo_reloj = None
+    def _mostrar_ventana_descanso(self, minutos: int) -> bool:
+        """Muestra la ventana fullscreen de descanso; ella lleva la cuenta."""
+        self.planificador.cancelar("reloj")
+        self.ventana_descanso.mostrar(minutos, self.motor.finalizar_descanso)
+        return True
 
-        try:
-            minutos = max(1, int(self.variable_pomodoro_descanso.get()))
-        except Exception:
-            minutos = POMODORO_DESCANSO_PREDETERMINADO
-
-        self.ventana_descanso = VentanaDescanso(
-            self.ventana_raiz, minutos, self._al_finalizar_descanso
-        )
-
-    def _al_finalizar_descanso(self) -> None:
-        """Callback cuando la ventana de descanso se cierra."""
-        self.ventana_descanso = None
-        if not self.en_ejecucion:
-            return
-        # Cambiar a fase de trabajo y continuar
-        self.fase_pomodoro = "trabajo"
-        notificaciones.notificar(
-            "A trabajar", "El descanso terminó. ¡Vamos de nuevo!"
-        )
-        self._reproducir_pitido()
-        self._actualizar_etiqueta_pomodoro()
-        self._actualizar_texto_estado()
-        self._programar_siguiente()
+    def _cerrar_ventana_descanso(self) -> None:
+        if self.ventana_descanso.visible:
+            self.ventana_descanso.cerrar()
 
     def _actualizar_etiqueta_pomodoro(self) -> None:
         if hasattr(self, "etiqueta_fase_pomodoro"):
-            fase = "🍅 Trabajo" if self.fase_pomodoro == "trabajo" else "☕ Descanso"
+            fase = (
+                "🍅 Trabajo" if self.motor.fase_pomodoro == "trabajo" else "☕ Descanso"
+            )
             self.etiqueta_fase_pomodoro.configure(
-                text=f"Fase actual: {fase} · Pomodoros: {self.pomodoros_completados}"
+                text=f"Fase actual: {fase} · "
+                f"Pomodoros: {self.motor.pomodoros_completados}"
             )
 
+    # ── Recordatorios adicionales ──────────────────────────────────
+
+    def _leer_recordatorios_ui(self) -> dict:
+        ajustes = {}
+        for tipo, (activo, intervalo, nombre_sonido) in (
+            self.variables_recordatorios.items()
+        ):
+            try:
+                minutos = max(1, int(intervalo.get()))
+            except Exception:
+                minutos = RECORDATORIOS_ADICIONALES[tipo]["intervalo"]
+            ajustes[tipo] = {
+                "activo": activo.get(),
+                "intervalo": minutos,
+                "sonido": nombre_sonido.get(),
+            }
+        return ajustes
+
+    def _al_cambiar_recordatorios(self) -> None:
+        self._guardar_config()
+        self.recordatorios.configurar(self.config["recordatorios"])
+        if self.motor.en_ejecucion:
+            self.recordatorios.iniciar()
+            self.motor.precargar_sonidos()
+
     # ── Sonido ─────────────────────────────────────────────────────
 
     def _al_cambiar_sonido(self, _evento=None) -> None:
@@ -592,6 +711,7 @@ class AplicacionRecordatorioEstiramiento:
         self.entrada_sonido_personalizado.configure(state=estado)
         self.boton_explorar_sonido.configure(state=estado)
         self._guardar_config()
+        self.motor.precargar_sonidos()
 
     def _explorar_sonido(self) -> None:
         ruta = filedialog.askopenfilename(
@@ -601,15 +721,11 @@ class AplicacionRecordatorioEstiramiento:
         if ruta:
             self.variable_sonido_personalizado.set(ruta)
             self._guardar_config()
+            self.motor.precargar_sonidos()
 
     def _probar_sonido(self) -> None:
-        self._reproducir_pitido()
-
-    def _reproducir_pitido(self) -> None:
-        ruta = sonido.obtener_ruta(
-            self.variable_sonido.get(), self.variable_sonido_personalizado.get()
-        )
-        sonido.reproducir(ruta)
+        self._volcar_variables_en_config()
+        self.motor.reproducir_pitido()
 
     # ── Estadísticas ───────────────────────────────────────────────
 
@@ -623,6 +739,38 @@ class AplicacionRecordatorioEstiramiento:
             f"consecutivo{'s' if racha != 1 else ''}"
         )
         self.variable_tiempo_activo.set(tiempo)
+        if hasattr(self, "etiqueta_horas"):
+            self._actualizar_analisis()
+
+    def _actualizar_analisis(self) -> None:
+        """Rellena las cifras del historial (en caché hasta la próxima pausa).
+
+        Los totales del periodo y la mejor racha salen de las estadísticas
+        diarias, que incluyen lo consolidado, lo importado y lo de otros
+        equipos aunque no esté en el historial de eventos.
+        """
+        resumen = self.estadisticas.resumen_historial()
+        self.variable_semana.set(f"{self.estadisticas.pausas_semana()} pausas")
+        self.variable_mes.set(f"{self.estadisticas.pausas_mes()} pausas")
+        self.variable_media_semanal.set(f"{resumen.media_semanal:.1f} pausas")
+        racha = self.estadisticas.mejor_racha()
+        self.variable_mejor_racha.set(f"{racha} día{'s' if racha != 1 else ''}")
+        self.variable_separacion.set(
+            "—"
+            if resumen.separacion_media_min is None
+            else f"{resumen.separacion_media_min:.0f} min de media"
+        )
+        self.variable_saltos.set(
+            "—"
+            if resumen.tasa_saltos is None
+            else f"{resumen.tasa_saltos:.0%} de {resumen.descansos}"
+        )
+        maximo = max(resumen.por_hora)
+        barras = "".join(
+            _BARRAS[round(n / maximo * (len(_BARRAS) - 1))] if n else " "
+            for n in resumen.por_hora
+        )
+        self.variable_horas.set(f"{barras}\n0     6     12    18  23")
 
     # ── Atajos de teclado globales ─────────────────────────────────
 
@@ -635,11 +783,13 @@ class AplicacionRecordatorioEstiramiento:
             self.variable_atajo_ventana.get(), self._callback_atajo_ventana
         )
 
+    # Keybinder llama desde el bucle de GLib, que corre en el hilo de Tk
+
     def _callback_atajo_toggle(self, _keystring) -> None:
-        self.ventana_raiz.after(0, self.alternar_temporizador)
+        self.alternar_temporizador()
 
     def _callback_atajo_ventana(self, _keystring) -> None:
-        self.ventana_raiz.after(0, self.alternar_ventana)
+        self.alternar_ventana()
 
     def _aplicar_atajos(self) -> None:
         atajos.desvincular(self.config.get("atajo_toggle", ""))
@@ -657,13 +807,9 @@ class AplicacionRecordatorioEstiramiento:
 
     def _iniciar_bandeja(self) -> None:
         self.bandeja.iniciar(
-            al_alternar_ventana=lambda: self.ventana_raiz.after(
-                0, self.alternar_ventana
-            ),
-            al_alternar_temporizador=lambda: self.ventana_raiz.after(
-                0, self.alternar_temporizador
-            ),
-            al_salir=lambda: self.ventana_raiz.after(0, self.salir_aplicacion),
+            al_alternar_ventana=self.alternar_ventana,
+            al_alternar_temporizador=self.alternar_temporizador,
+            al_salir=self.salir_aplicacion,
         )
 
     def alternar_ventana(self) -> None:
@@ -683,6 +829,10 @@ class AplicacionRecordatorioEstiramiento:
     def _ocultar_ventana(self) -> None:
         self.ventana_raiz.withdraw()
 
+    def atender_orden(self, orden: str) -> str:
+        """Ejecuta una orden recibida por el socket de control."""
+        return control.atender(orden, self.motor, self._mostrar_ventana)
+
     # ── Cierre ─────────────────────────────────────────────────────
 
     def al_pulsar_cerrar(self) -> None:
@@ -693,6 +843,13 @@ class AplicacionRecordatorioEstiramiento:
 
     def salir_aplicacion(self) -> None:
         self._guardar_config()
-        self.detener()
+        self._guardado_config.vaciar()
+        self._cerrar_ventana_descanso()
+        self.motor.cerrar()
+        self.planificador.cancelar_todo()
         self.bandeja.detener()
+        bucle_glib.detener()
+        sonido.cerrar()
+        self.estadisticas.cerrar()
+        self.ventana_descanso.destruir()
         self.ventana_raiz.destroy()
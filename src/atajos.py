@@ -2,22 +2,36 @@
 
 from __future__ import annotations
 
-from .constantes import KEYBINDER_DISPONIBLE, _Keybinder
+from typing import Any
+
+from . import introspeccion
+
+
+def _keybinder() -> Any:
+    gi = introspeccion.cargar("atajos")
+    return gi["Keybinder"] if gi is not None else None
+
+
+def disponible() -> bool:
+    """Si hay Keybinder3; con la caché de sondeos no importa GI."""
+    return introspeccion.disponible("atajos")
 
 
 def inicializar() -> None:
     """Inicializa Keybinder (debe llamarse una vez al inicio)."""
-    if not KEYBINDER_DISPONIBLE or _Keybinder is None:
+    keybinder = _keybinder()
+    if keybinder is None:
         return
-    _Keybinder.init()
+    keybinder.init()
 
 
 def vincular(combinacion: str, callback) -> None:
     """Registra un atajo global. *callback* recibe (keystring)."""
-    if not combinacion or not KEYBINDER_DISPONIBLE or _Keybinder is None:
+    keybinder = _keybinder() if combinacion else None
+    if keybinder is None:
         return
     try:
-        exito = _Keybinder.bind(combinacion, callback)
+        exito = keybinder.bind(combinacion, callback)
         if exito:
             print(f"Atajo global registrado: {combinacion}")
         else:
@@ -28,9 +42,10 @@ def vincular(combinacion: str, callback) -> None:
 
 def desvincular(combinacion: str) -> None:
     """Elimina un atajo global previamente registrado."""
-    if not combinacion or not KEYBINDER_DISPONIBLE or _Keybinder is None:
+    keybinder = _keybinder() if combinacion else None
+    if keybinder is None:
         return
     try:
-        _Keybinder.unbind(combinacion)
+        keybinder.unbind(combinacion)
     except Exception:
         pass
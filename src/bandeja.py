@@ -2,17 +2,10 @@
 
 from __future__ import annotations
 
-import threading
 from typing import Any, Callable
 
-from .constantes import (
-    APPINDICATOR_DISPONIBLE,
-    AppIndicator3,
-    GLib,
-    Gtk,
-    NOMBRE_APP,
-    RUTA_ICONO,
-)
+from .constantes import NOMBRE_APP, RUTA_ICONO
+from . import introspeccion
 
 
 class BandejaSistema:
@@ -20,8 +13,6 @@ class BandejaSistema:
 
     def __init__(self) -> None:
         self.indicador = None
-        self._hilo_gtk: threading.Thread | None = None
-        self._bucle = None  # GLib.MainLoop
 
     @property
     def activa(self) -> bool:
@@ -34,15 +25,16 @@ class BandejaSistema:
         al_alternar_temporizador: Callable[[], Any],
         al_salir: Callable[[], Any],
     ) -> None:
-        """Crea el indicador, menú y arranca el bucle GTK en segundo plano."""
-        if (
-            not APPINDICATOR_DISPONIBLE
-            or AppIndicator3 is None
-            or Gtk is None
-            or GLib is None
-        ):
+        """Crea el indicador y su menú.
+
+        Los eventos llegan por el bucle de GLib, que ``bucle_glib`` bombea
+        desde el bucle principal: los callbacks corren en ese hilo.
+        """
+        gi = introspeccion.cargar("bandeja")
+        if gi is None:
             print("Aviso: AppIndicator3 no disponible; sin icono de bandeja.")
             return
+        AppIndicator3, Gtk = gi["AppIndicator3"], gi["Gtk"]
 
         if not RUTA_ICONO.exists():
             print(f"Aviso: no se encontró el icono en {RUTA_ICONO}")
@@ -75,20 +67,13 @@ class BandejaSistema:
         menu_gtk.show_all()
         self.indicador.set_menu(menu_gtk)
 
-        self._bucle = GLib.MainLoop()
-        self._hilo_gtk = threading.Thread(target=self._ejecutar_bucle, daemon=True)
-        self._hilo_gtk.start()
-
-    def _ejecutar_bucle(self) -> None:
-        if self._bucle is not None:
-            self._bucle.run()
-
     def detener(self) -> None:
-        """Para el bucle GTK y libera el indicador."""
-        if self._bucle is not None:
+        """Oculta y libera el indicador."""
+        gi = introspeccion.cargar("bandeja")
+        if self.indicador is not None and gi is not None:
             try:
-                self._bucle.quit()
+                estados = gi["AppIndicator3"].IndicatorStatus
+                self.indicador.set_status(estados.PASSIVE)
             except Exception:
                 pass
-            self._bucle = None
         self.indicador = None
@@ -0,0 +1,181 @@
+"""Integración del bucle de GLib en el bucle principal.
+
+La bandeja (AppIndicator3/Gtk) y los atajos (Keybinder) despachan sus
+eventos desde el ``MainContext`` por defecto de GLib. En lugar de un
+``GLib.MainLoop`` en un hilo aparte, ese contexto se integra en el
+bucle principal (Tk o ``BucleSinTk``): tras cada ronda se consultan al
+contexto sus descriptores (``prepare``/``query``) y se vigilan con
+``createfilehandler``, y su próximo plazo, si lo tiene, con ``after``.
+El bucle solo despierta cuando GLib tiene algo que hacer: un clic en la
+bandeja, un atajo, la respuesta de D-Bus (que llega por el descriptor de
+despertar del contexto) o un temporizador de GLib. En reposo no hay
+ningún despertar periódico.
+
+En cada despertar se atienden como mucho ``PRESUPUESTO_ITERACIONES_GLIB``
+iteraciones sin bloquear. Si los enlaces de GLib no permiten consultar
+los descriptores se recurre a sondear el contexto cada
+``INTERVALO_GLIB_MIN_MS``-``INTERVALO_GLIB_MAX_MS``.
+
+Así los callbacks de la bandeja y de los atajos se ejecutan en el hilo
+de la interfaz y pueden llamarla directamente.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from .constantes import (
+    INTERVALO_GLIB_MAX_MS,
+    INTERVALO_GLIB_MIN_MS,
+    PRESUPUESTO_ITERACIONES_GLIB,
+)
+from . import introspeccion
+
+# Máscaras de createfilehandler (tkinter.READABLE, WRITABLE, EXCEPTION)
+LEGIBLE = 2
+ESCRIBIBLE = 4
+EXCEPCION = 8
+
+# GLib.IOCondition
+_IO_IN, _IO_PRI, _IO_OUT, _IO_ERR, _IO_HUP = 1, 2, 4, 8, 16
+
+_contexto: Any = None  # GLib.MainContext
+_adquirido = False
+# Objeto con after/after_cancel; los descriptores se vigilan con su
+# atributo ``tk`` (ventana de Tk) o con él mismo (BucleSinTk)
+_temporizador: Any = None
+_trabajo: str | None = None
+# descriptor → máscara vigilada
+_vigilados: dict[int, int] = {}
+_sondeo = False
+_intervalo_ms = INTERVALO_GLIB_MIN_MS
+
+
+def iniciar(temporizador: Any) -> bool:
+    """Integra GLib en el bucle de *temporizador*; False si no hay GLib."""
+    global _contexto, _adquirido, _temporizador
+    gi = introspeccion.cargar("glib")
+    if gi is None:
+        return False
+    if _contexto is None:
+        _contexto = gi["GLib"].MainContext.default()
+    detener()
+    if not _adquirido:
+        # prepare/query/check exigen ser el dueño del contexto
+        _adquirido = bool(_contexto.acquire())
+    _temporizador = temporizador
+    _programar(0)
+    return True
+
+
+def cambiar_temporizador(temporizador: Any) -> None:
+    """Pasa al bucle de otro *temporizador* (p.ej. al crear la interfaz)."""
+    if _temporizador is not None:
+        iniciar(temporizador)
+
+
+def detener() -> None:
+    global _temporizador, _trabajo
+    if _temporizador is not None:
+        if _trabajo is not None:
+            try:
+                _temporizador.after_cancel(_trabajo)
+            except Exception:
+                pass
+        _vigilar({})
+    _trabajo = None
+    _temporizador = None
+
+
+def _programar(ms: int) -> None:
+    global _trabajo, _intervalo_ms
+    _intervalo_ms = ms
+    _trabajo = _temporizador.after(ms, _al_despertar)
+
+
+def _al_despertar(*_args: Any) -> None:
+    """Plazo de GLib vencido o descriptor listo: atender y rearmar."""
+    global _trabajo
+    if _trabajo is not None:
+        try:
+            _temporizador.after_cancel(_trabajo)
+        except Exception:
+            pass
+        _trabajo = None
+    temporizador = _temporizador
+    atendidos = 0
+    while atendidos < PRESUPUESTO_ITERACIONES_GLIB and _contexto.pending():
+        _contexto.iteration(False)
+        atendidos += 1
+    # Un callback puede haber parado o movido la integración
+    if _temporizador is None or _temporizador is not temporizador:
+        return
+    if _trabajo is not None:
+        return
+    if _sondeo:
+        _sondear(atendidos)
+        return
+    if atendidos >= PRESUPUESTO_ITERACIONES_GLIB:
+        # Queda trabajo: seguir tras dejar pasar los eventos de Tk
+        _programar(0)
+        return
+    _rearmar()
+
+
+def _rearmar() -> None:
+    """Vigila los descriptores de GLib y programa su próximo plazo."""
+    global _sondeo
+    try:
+        _, prioridad = _contexto.prepare()
+        _, espera_ms, descriptores = _contexto.query(prioridad)
+        # Cierra la ronda sin sondear: los descriptores los vigila el bucle
+        listo = _contexto.check(prioridad, descriptores)
+    except (AttributeError, TypeError) as e:
+        print(f"Aviso: GLib no permite vigilar sus descriptores ({e}); se sondea.")
+        _sondeo = True
+        _vigilar({})
+        _programar(INTERVALO_GLIB_MIN_MS)
+        return
+    if listo:
+        _contexto.dispatch()
+        _programar(0)
+        return
+    mascaras: dict[int, int] = {}
+    for descriptor in descriptores:
+        mascara = 0
+        if descriptor.events & (_IO_IN | _IO_PRI | _IO_HUP):
+            mascara |= LEGIBLE
+        if descriptor.events & _IO_OUT:
+            mascara |= ESCRIBIBLE
+        if descriptor.events & _IO_ERR:
+            mascara |= EXCEPCION
+        if mascara:
+            mascaras[descriptor.fd] = mascaras.get(descriptor.fd, 0) | mascara
+    _vigilar(mascaras)
+    if espera_ms >= 0:
+        _programar(espera_ms)
+
+
+def _vigilar(mascaras: dict[int, int]) -> None:
+    """Ajusta los descriptores vigilados a *mascaras* (descriptor → máscara)."""
+    manejador = getattr(_temporizador, "tk", _temporizador)
+    for descriptor in [d for d in _vigilados if d not in mascaras]:
+        del _vigilados[descriptor]
+        try:
+            manejador.deletefilehandler(descriptor)
+        except Exception:
+            pass
+    for descriptor, mascara in mascaras.items():
+        if _vigilados.get(descriptor) != mascara:
+            manejador.createfilehandler(descriptor, mascara, _al_despertar)
+            _vigilados[descriptor] = mascara
+
+
+def _sondear(atendidos: int) -> None:
+    """Respaldo sin descriptores: sondeo con intervalo creciente en reposo."""
+    if atendidos:
+        _programar(INTERVALO_GLIB_MIN_MS)
+    else:
+        _programar(
+            min(max(_intervalo_ms, INTERVALO_GLIB_MIN_MS) * 2, INTERVALO_GLIB_MAX_MS)
+        )
@@ -0,0 +1,47 @@
+"""Cerrojo entre procesos de los archivos de estadísticas e historial.
+
+Un solo ``lockf`` (que también funciona sobre NFS) en
+``estadisticas.lock`` protege ``estadisticas.json``, su diario y el
+historial. Los cerrojos de ``lockf`` son por proceso y cerrar cualquier
+descriptor del archivo los suelta todos, así que dentro de un proceso se
+comparte un único descriptor con un contador de anidamiento; un
+``RLock`` ordena además los hilos del propio proceso.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+from .constantes import RUTA_CERROJO_ESTADISTICAS, RUTA_DIRECTORIO_CONFIG
+
+_hilos = threading.RLock()
+_nivel = 0
+_archivo: IO | None = None
+
+
+@contextmanager
+def cerrojo_estadisticas() -> Iterator[None]:
+    """Exclusión frente a otros procesos; se puede anidar."""
+    global _nivel, _archivo
+    with _hilos:
+        if _nivel == 0:
+            RUTA_DIRECTORIO_CONFIG.mkdir(parents=True, exist_ok=True)
+            archivo = open(RUTA_CERROJO_ESTADISTICAS, "a+b")
+            try:
+                fcntl.lockf(archivo, fcntl.LOCK_EX)
+            except BaseException:
+                archivo.close()
+                raise
+            _archivo = archivo
+        _nivel += 1
+        try:
+            yield
+        finally:
+            _nivel -= 1
+            if _nivel == 0:
+                archivo, _archivo = _archivo, None
+                fcntl.lockf(archivo, fcntl.LOCK_UN)
+                archivo.close()
@@ -3,8 +3,14 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 
-from .constantes import RUTA_ARCHIVO_CONFIG, RUTA_DIRECTORIO_CONFIG
+from .constantes import (
+    RETARDO_GUARDADO_CONFIG_S,
+    RUTA_ARCHIVO_CONFIG,
+    RUTA_DIRECTORIO_CONFIG,
+)
 
 
 def cargar() -> dict:
@@ -18,8 +24,72 @@ def cargar() -> dict:
 
 
 def guardar(config: dict) -> None:
-    """Persiste el diccionario de configuración a disco."""
+    """Persiste el diccionario de configuración a disco de forma atómica.
+
+    Escribe en un temporal, hace ``fsync`` y lo renombra sobre el archivo
+    final, así un cierre a mitad de escritura nunca deja un JSON vacío.
+    """
     RUTA_DIRECTORIO_CONFIG.mkdir(parents=True, exist_ok=True)
-    RUTA_ARCHIVO_CONFIG.write_text(
-        json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
+    temporal = RUTA_ARCHIVO_CONFIG.with_suffix(".json.tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, RUTA_ARCHIVO_CONFIG)
+
+
+class GuardadoDiferido:
+    """Agrupa ráfagas de cambios de configuración en una sola escritura.
+
+    ``programar`` compara con lo último escrito y descarta los guardados
+    sin cambios; si hay diferencias, (re)arma un temporizador y la
+    escritura se hace en un hilo aparte pasado ``retardo`` segundos.
+    ``vaciar`` escribe lo pendiente de inmediato (usar al salir).
+    """
+
+    def __init__(
+        self, config_en_disco: dict, retardo: float = RETARDO_GUARDADO_CONFIG_S
+    ) -> None:
+        self._retardo = retardo
+        self._en_disco = dict(config_en_disco)
+        self._pendiente: dict | None = None
+        self._temporizador: threading.Timer | None = None
+        self._cerrojo = threading.Lock()
+
+    def campos_modificados(self, config: dict) -> set[str]:
+        """Claves cuyo valor difiere de lo último escrito a disco."""
+        with self._cerrojo:
+            base = self._pendiente if self._pendiente is not None else self._en_disco
+            claves = base.keys() | config.keys()
+            return {c for c in claves if base.get(c) != config.get(c)}
+
+    def programar(self, config: dict) -> None:
+        if not self.campos_modificados(config):
+            return
+        with self._cerrojo:
+            self._pendiente = dict(config)
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+            self._temporizador = threading.Timer(self._retardo, self._escribir)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    def vaciar(self) -> None:
+        """Cancela el temporizador y escribe lo pendiente en este hilo."""
+        with self._cerrojo:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+        self._escribir()
+
+    def _escribir(self) -> None:
+        with self._cerrojo:
+            pendiente, self._pendiente = self._pendiente, None
+            self._temporizador = None
+            if pendiente is None:
+                return
+            try:
+                guardar(pendiente)
+                self._en_disco = pendiente
+            except Exception as e:
+                print(f"Aviso: no se pudo guardar la configuración: {e}")
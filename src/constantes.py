@@ -1,9 +1,9 @@
-"""Constantes globales e importaciones opcionales de GObject Introspection."""
+"""Constantes globales de la aplicación."""
 
 from __future__ import annotations
 
+import os
 from pathlib import Path
-from typing import Any
 
 # ── Información de la aplicación ───────────────────────────────
 
@@ -18,12 +18,147 @@ INTERVALO_MAXIMO_MINUTOS = 240
 POMODORO_TRABAJO_PREDETERMINADO = 25
 POMODORO_DESCANSO_PREDETERMINADO = 5
 
+# ── Planificador ───────────────────────────────────────────────
+
+# Retraso a partir del cual un plazo se considera perdido (p.ej. suspensión)
+TOLERANCIA_RETRASO_S = 5.0
+# Espera máxima entre despertares para notar una reanudación a tiempo
+ESPERA_MAXIMA_PLANIFICADOR_S = 30.0
+# Qué hacer con un recordatorio vencido durante una suspensión:
+# "saltar" (reiniciar la cuenta), "agrupar" o "una_vez" (avisar al volver)
+POLITICA_RECUPERACION_PREDETERMINADA = "saltar"
+
 # ── Rutas ──────────────────────────────────────────────────────
 
 RUTA_DIRECTORIO_CONFIG = Path.home() / ".config" / "estira-las-piernas"
 RUTA_ARCHIVO_CONFIG = RUTA_DIRECTORIO_CONFIG / "config.json"
 RUTA_ARCHIVO_ESTADISTICAS = RUTA_DIRECTORIO_CONFIG / "estadisticas.json"
+RUTA_DIARIO_ESTADISTICAS = RUTA_DIRECTORIO_CONFIG / "estadisticas.diario"
+RUTA_CERROJO_ESTADISTICAS = RUTA_DIRECTORIO_CONFIG / "estadisticas.lock"
+RUTA_BD_ESTADISTICAS = RUTA_DIRECTORIO_CONFIG / "estadisticas.sqlite3"
+RUTA_HISTORIAL = RUTA_DIRECTORIO_CONFIG / "historial.bin"
+RUTA_COLA_HISTORIAL = RUTA_DIRECTORIO_CONFIG / "historial.cola"
+RUTA_PUNTO_CONTROL = RUTA_DIRECTORIO_CONFIG / "temporizador.estado"
+# Registro de ancho fijo que leen las barras de escritorio (estado_panel.sh)
+RUTA_ESTADO_PANEL = RUTA_DIRECTORIO_CONFIG / "panel.estado"
 RUTA_ICONO = Path(__file__).resolve().parent.parent / "img" / "logo.png"
+# Resultado de los sondeos de GI, propio de cada equipo
+RUTA_CACHE_GI = Path.home() / ".cache" / "estira-las-piernas" / "gi.json"
+
+# ── Bucle de GLib ──────────────────────────────────────────────
+
+# Iteraciones de GLib atendidas como mucho en cada despertar del bucle
+PRESUPUESTO_ITERACIONES_GLIB = 32
+# Sondeo de respaldo si GLib no deja vigilar sus descriptores: intervalo
+# tras actividad y tope del intervalo en reposo
+INTERVALO_GLIB_MIN_MS = 10
+INTERVALO_GLIB_MAX_MS = 100
+
+# ── Notificaciones ─────────────────────────────────────────────
+
+# Espera máxima de la respuesta del servicio de notificaciones
+TIEMPO_ESPERA_DBUS_MS = 5000
+# Tras un fallo de D-Bus se usa notify-send y se reintenta pasado este
+# plazo, que se dobla con cada fallo seguido hasta el tope
+REINTENTO_DBUS_MIN_S = 30.0
+REINTENTO_DBUS_MAX_S = 600.0
+
+# ── Ventana de descanso ────────────────────────────────────────
+
+# Tras el arranque, espera antes de construir (oculta) la ventana de descanso
+RETARDO_PREPARAR_DESCANSO_MS = 1500
+
+# ── Persistencia ───────────────────────────────────────────────
+
+# Segundos que se agrupan los cambios de configuración antes de escribir
+RETARDO_GUARDADO_CONFIG_S = 1.0
+
+# ── Perfilado ──────────────────────────────────────────────────
+
+# "1" activa el perfilado como --profile; cualquier otro valor es la ruta
+VARIABLE_ENTORNO_PERFIL = "ESTIRA_PERFIL"
+RUTA_INFORME_PERFIL = RUTA_DIRECTORIO_CONFIG / "perfil.json"
+# Avisos que se conservan en el informe (los más recientes)
+MAXIMO_AVISOS_PERFIL = 500
+
+# ── Estadísticas ───────────────────────────────────────────────
+
+# Registros acumulados en el diario antes de compactarlo en el snapshot
+UMBRAL_COMPACTACION_DIARIO = 256
+
+# Motor de almacenamiento: "json" (snapshot + diario) o "sqlite"
+MOTOR_ESTADISTICAS_PREDETERMINADO = "json"
+
+# Días con detalle en estadisticas.json; los meses completos anteriores se
+# consolidan en totales mensuales y semanales ("retencion_dias" en config)
+RETENCION_DIAS_PREDETERMINADA = 180
+
+# Segundos que el motor SQLite espera al cerrojo de otra instancia
+TIEMPO_ESPERA_BD_S = 10.0
+
+# Eventos del historial por segmento comprimido
+EVENTOS_POR_SEGMENTO = 4096
+
+# Semanas completas que promedia la pestaña Estadísticas
+SEMANAS_MEDIA = 8
+
+# ── Sincronización entre equipos ───────────────────────────────
+
+# Equipos que comparten este directorio de configuración (p.ej. por NFS)
+RUTA_EQUIPOS = RUTA_DIRECTORIO_CONFIG / "equipos.json"
+# Estado de sincronización de cada equipo, en un archivo por equipo
+RUTA_DIRECTORIO_ESTADO = (
+    Path(os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state")
+    / "estira-las-piernas"
+)
+RUTA_ID_MAQUINA = Path("/etc/machine-id")
+# Estado del servidor de servidor_sincronizacion.py
+RUTA_SERVIDOR_SINCRONIZACION = RUTA_DIRECTORIO_CONFIG / "servidor_sincronizacion.json"
+PUERTO_SINCRONIZACION = 8765
+# Periodo entre sincronizaciones y espera tras registrar una pausa
+INTERVALO_SINCRONIZACION_S = 300.0
+RETARDO_SINCRONIZACION_PAUSA_S = 10.0
+# Cambios por petición en cada sentido
+LOTE_SINCRONIZACION = 2000
+TIEMPO_ESPERA_SINCRONIZACION_S = 10.0
+
+# ── Agregado de flota ──────────────────────────────────────────
+
+# Usuarios que tiene que leer cada proceso para que compense repartirlos
+MINIMO_USUARIOS_POR_PROCESO = 64
+
+# ── Recordatorios adicionales ──────────────────────────────────
+
+# Recordatorios que pueden convivir con el de estirar las piernas.
+# "intervalo" en minutos; "sonido" es una clave de SONIDOS_SISTEMA.
+RECORDATORIOS_ADICIONALES: dict[str, dict] = {
+    "ojos": {
+        "nombre": "Vista 20-20-20",
+        "titulo": "Descansa la vista",
+        "mensaje": "Mira algo a unos 6 metros durante 20 segundos.",
+        "intervalo": 20,
+        "sonido": "Click",
+    },
+    "hidratacion": {
+        "nombre": "Hidratación",
+        "titulo": "Bebe agua",
+        "mensaje": "Tómate un vaso de agua.",
+        "intervalo": 60,
+        "sonido": "Información",
+    },
+    "postura": {
+        "nombre": "Postura",
+        "titulo": "Revisa tu postura",
+        "mensaje": "Espalda recta, hombros relajados y pantalla a la altura "
+        "de los ojos.",
+        "intervalo": 30,
+        "sonido": "Campana",
+    },
+}
+
+# Recordatorios que vencen con menos de estos segundos de diferencia
+# se muestran en una sola notificación
+VENTANA_AGRUPACION_S = 5.0
 
 # ── Sonidos del sistema ────────────────────────────────────────
 
@@ -38,42 +173,26 @@ SONIDOS_SISTEMA: dict[str, str] = {
     "Sin sonido": "",
 }
 
+# Formato de la salida de audio persistente (PCM de 16 bits)
+FRECUENCIA_AUDIO = 44100
+CANALES_AUDIO = 2
+# Búfer pedido al servidor de sonido: cuánto tarda en sonar un aviso
+LATENCIA_AUDIO_MS = 30
+# Los sonidos más largos se recortan al guardarlos en memoria
+DURACION_MAXIMA_SONIDO_S = 10
+
+# ── Procesos auxiliares ────────────────────────────────────────
+
+# Ayudantes externos (reproductores, notify-send) vivos a la vez
+MAXIMO_AYUDANTES = 4
+# Pasado este plazo un ayudante se da por colgado y se mata
+PLAZO_AYUDANTE_S = 15.0
+# Los decodificadores tienen más margen: trabajan una vez por sonido
+PLAZO_DECODIFICADOR_S = 30.0
+
 # ── Atajos de teclado predeterminados ──────────────────────────
 
 ATAJOS_PREDETERMINADOS: dict[str, str] = {
     "toggle_temporizador": "<Ctrl><Alt>p",
     "mostrar_ocultar": "<Ctrl><Alt>s",
 }
-
-# ── Importaciones opcionales de GI ─────────────────────────────
-# Se inicializan a None para que el analizador estático no marque
-# "posiblemente desvinculado" en el código que las usa.
-
-AppIndicator3: Any = None
-Gtk: Any = None
-GLib: Any = None
-_Keybinder: Any = None
-
-APPINDICATOR_DISPONIBLE = False
-KEYBINDER_DISPONIBLE = False
-
-try:
-    import gi
-
-    gi.require_version("AppIndicator3", "0.1")
-    gi.require_version("Gtk", "3.0")
-    from gi.repository import AppIndicator3, Gtk, GLib  # type: ignore[no-redef]
-
-    APPINDICATOR_DISPONIBLE = True
-except Exception:
-    pass
-
-try:
-    import gi  # noqa: F811
-
-    gi.require_version("Keybinder", "3.0")
-    from gi.repository import Keybinder as _Keybinder  # type: ignore[no-redef]
-
-    KEYBINDER_DISPONIBLE = True
-except Exception:
-    pass
@@ -0,0 +1,307 @@
+"""Instancia única y socket de control.
+
+La primera instancia toma un cerrojo (``flock``) y escucha en un socket
+Unix; las siguientes se conectan, envían una orden (``mostrar``,
+``alternar``, ``iniciar``, ``detener`` o ``estado``), imprimen la
+respuesta y terminan. Así un segundo lanzamiento no crea otro
+temporizador ni escribe a la vez en los mismos archivos.
+
+El socket solo admite al usuario que lo creó: tiene permisos 0600 y,
+donde hay ``SO_PEERCRED`` (Linux), se comprueba además el uid del otro
+extremo de cada conexión.
+
+El protocolo es una línea de texto por conexión en cada sentido. Este
+módulo no importa Tk, GI ni ``constantes``: el cliente debe responder
+en milisegundos.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import queue
+import socket
+import struct
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from .motor import MotorRecordatorios
+
+# Órdenes admitidas y sus alias en inglés
+ORDENES: dict[str, str] = {
+    "mostrar": "mostrar",
+    "show": "mostrar",
+    "alternar": "alternar",
+    "toggle": "alternar",
+    "iniciar": "iniciar",
+    "start": "iniciar",
+    "detener": "detener",
+    "stop": "detener",
+    "estado": "estado",
+    "status": "estado",
+}
+
+# Espera máxima de una orden, en ambos extremos del socket
+TIEMPO_ESPERA_CONTROL_S = 2.0
+# Cuánto espera un cliente a que una instancia que arranca abra el socket
+ESPERA_ARRANQUE_S = 3.0
+
+
+def _directorio() -> Path:
+    """Directorio por usuario y por equipo (no se comparte por NFS)."""
+    ejecucion = os.environ.get("XDG_RUNTIME_DIR")
+    if ejecucion and os.path.isdir(ejecucion):
+        return Path(ejecucion)
+    return Path(tempfile.gettempdir()) / f"estira-las-piernas-{os.getuid()}"
+
+
+RUTA_SOCKET = _directorio() / "estira-las-piernas.sock"
+RUTA_CERROJO = _directorio() / "estira-las-piernas.lock"
+
+
+def normalizar_orden(texto: str) -> str | None:
+    return ORDENES.get(texto.strip().lower())
+
+
+def enviar(orden: str, espera: float = 0.0) -> str | None:
+    """Envía *orden* a la instancia en marcha y devuelve su respuesta.
+
+    Si el socket aún no existe se reintenta durante *espera* segundos;
+    devuelve None si no hay ninguna instancia escuchando.
+    """
+    limite = time.monotonic() + espera
+    while True:
+        cliente = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Algo más que el servidor, para recibir su "no responde"
+        cliente.settimeout(TIEMPO_ESPERA_CONTROL_S + 1)
+        try:
+            cliente.connect(str(RUTA_SOCKET))
+            break
+        except (FileNotFoundError, ConnectionRefusedError):
+            cliente.close()
+            if time.monotonic() >= limite:
+                return None
+            time.sleep(0.05)
+        except OSError:
+            cliente.close()
+            return None
+    with cliente:
+        try:
+            cliente.sendall(f"{orden}\n".encode())
+            with cliente.makefile("rb") as lector:
+                return lector.readline().decode(errors="replace").strip()
+        except OSError:
+            return None
+
+
+def _mismo_usuario(conexion: socket.socket) -> bool:
+    """Si el otro extremo de *conexion* es un proceso de este usuario."""
+    try:
+        credenciales = conexion.getsockopt(
+            socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+        )
+    except (AttributeError, OSError):
+        # Sin SO_PEERCRED quedan los permisos del socket
+        return True
+    _pid, uid, _gid = struct.unpack("3i", credenciales)
+    return uid == os.getuid()
+
+
+def describir_estado(motor: MotorRecordatorios) -> str:
+    texto = motor.texto_estado()
+    restante = motor.restante()
+    if motor.en_descanso_visual:
+        texto += " · Descanso en curso"
+    elif restante is not None:
+        minutos, segundos = divmod(int(restante), 60)
+        texto += f" · Próximo aviso en {minutos:02d}:{segundos:02d}"
+    return texto
+
+
+def atender(
+    orden: str, motor: MotorRecordatorios, mostrar: Callable[[], None]
+) -> str:
+    """Ejecuta una orden sobre *motor*; debe llamarse desde su bucle."""
+    if orden == "mostrar":
+        mostrar()
+    elif orden == "alternar":
+        motor.alternar()
+    elif orden == "iniciar" and not motor.en_ejecucion:
+        motor.iniciar()
+    elif orden == "detener" and motor.en_ejecucion:
+        motor.detener()
+    return describir_estado(motor)
+
+
+class Buzon:
+    """Lleva llamadas de otros hilos al hilo de un bucle de eventos.
+
+    Las funciones se encolan y se escribe un byte en una tubería cuyo
+    extremo de lectura vigila el bucle con ``createfilehandler`` (el
+    intérprete ``ventana.tk`` o ``BucleSinTk``). No se usa ``after``
+    desde otro hilo: Tk no lo admite de forma fiable.
+    """
+
+    def __init__(self, bucle) -> None:
+        self._bucle = bucle
+        self._cola: queue.SimpleQueue[Callable[[], None]] = queue.SimpleQueue()
+        # Que cerrar() no deje escribir en un descriptor ya reutilizado
+        self._cerrojo = threading.Lock()
+        self._abierto = True
+        self._lectura, self._escritura = os.pipe()
+        os.set_blocking(self._lectura, False)
+        os.set_blocking(self._escritura, False)
+        # 2 = tkinter.READABLE
+        bucle.createfilehandler(self._lectura, 2, self._atender)
+
+    def llamar(self, funcion: Callable[[], None]) -> None:
+        """Encola *funcion* desde cualquier hilo y despierta al bucle."""
+        with self._cerrojo:
+            if not self._abierto:
+                return
+            self._cola.put(funcion)
+            try:
+                os.write(self._escritura, b"\0")
+            except BlockingIOError:
+                pass  # la tubería ya tiene despertares pendientes
+
+    def _atender(self, *_args) -> None:
+        try:
+            while os.read(self._lectura, 512):
+                pass
+        except BlockingIOError:
+            pass
+        while True:
+            try:
+                funcion = self._cola.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                funcion()
+            except Exception as e:
+                print(f"Aviso: error en una orden de control: {e}")
+
+    def cerrar(self) -> None:
+        with self._cerrojo:
+            if not self._abierto:
+                return
+            self._abierto = False
+            try:
+                self._bucle.deletefilehandler(self._lectura)
+            except Exception:
+                pass
+            os.close(self._lectura)
+            os.close(self._escritura)
+
+
+class ServidorControl:
+    """Cerrojo de instancia única y socket que atiende las órdenes."""
+
+    def __init__(self) -> None:
+        self._cerrojo: IO | None = None
+        self._socket: socket.socket | None = None
+        self._atender: Callable[[str], str] | None = None
+        self._llamar: Callable[[Callable[[], None]], None] | None = None
+
+    def adquirir(self) -> bool:
+        """Intenta ser la instancia principal; False si ya hay otra."""
+        RUTA_CERROJO.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        cerrojo = open(RUTA_CERROJO, "a")
+        try:
+            fcntl.flock(cerrojo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            cerrojo.close()
+            return False
+        self._cerrojo = cerrojo
+        try:
+            # Resto de una instancia que terminó sin cerrar
+            RUTA_SOCKET.unlink()
+        except FileNotFoundError:
+            pass
+        servidor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            servidor.bind(str(RUTA_SOCKET))
+            os.chmod(RUTA_SOCKET, 0o600)
+            servidor.listen(8)
+        except OSError as e:
+            servidor.close()
+            print(f"Aviso: no se pudo abrir el socket de control: {e}")
+            return True
+        self._socket = servidor
+        return True
+
+    def iniciar(
+        self,
+        atender: Callable[[str], str],
+        llamar: Callable[[Callable[[], None]], None],
+    ) -> None:
+        """Atiende órdenes en un hilo; *llamar* las lleva al bucle principal."""
+        if self._socket is None:
+            return
+        self._atender = atender
+        self._llamar = llamar
+        threading.Thread(
+            target=self._aceptar, args=(self._socket,), daemon=True
+        ).start()
+
+    def _aceptar(self, servidor: socket.socket) -> None:
+        while True:
+            try:
+                conexion, _ = servidor.accept()
+            except OSError:
+                return
+            with conexion:
+                conexion.settimeout(TIEMPO_ESPERA_CONTROL_S)
+                try:
+                    self._atender_conexion(conexion)
+                except OSError:
+                    pass
+
+    def _atender_conexion(self, conexion: socket.socket) -> None:
+        if not _mismo_usuario(conexion):
+            conexion.sendall(b"error: otro usuario no puede controlar esta instancia\n")
+            return
+        with conexion.makefile("rb") as lector:
+            texto = lector.readline(64).decode(errors="replace")
+        orden = normalizar_orden(texto)
+        if orden is None:
+            respuesta = f"error: orden desconocida {texto.strip()!r}"
+        else:
+            respuesta = self._en_bucle(orden)
+        conexion.sendall(f"{respuesta}\n".encode())
+
+    def _en_bucle(self, orden: str) -> str:
+        resultado: queue.Queue[str] = queue.Queue(maxsize=1)
+
+        def ejecutar() -> None:
+            try:
+                resultado.put(self._atender(orden))
+            except Exception as e:
+                resultado.put(f"error: {e}")
+
+        self._llamar(ejecutar)
+        try:
+            return resultado.get(timeout=TIEMPO_ESPERA_CONTROL_S)
+        except queue.Empty:
+            return "error: la instancia no responde"
+
+    def cerrar(self) -> None:
+        if self._socket is not None:
+            servidor, self._socket = self._socket, None
+            try:
+                # Despierta al hilo bloqueado en accept()
+                servidor.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            servidor.close()
+            try:
+                RUTA_SOCKET.unlink()
+            except OSError:
+                pass
+        if self._cerrojo is not None:
+            self._cerrojo.close()
+            self._cerrojo = None
@@ -0,0 +1,313 @@
+"""Modo ``--headless``: el motor de recordatorios sin cargar Tk.
+
+Pensado para la instancia de autoarranque, que casi nunca abre la
+ventana. Ejecuta ``MotorRecordatorios`` (temporizador, Pomodoro,
+notificaciones, sonido y estadísticas) sobre ``BucleSinTk``, un bucle
+mínimo con la misma interfaz ``after``/``after_cancel`` que usa el
+``Planificador``. La bandeja y los atajos globales funcionan igual.
+
+La primera vez que se pide mostrar la ventana se crea ``tk.Tk()`` con la
+interfaz completa, que adopta el motor en marcha; a partir de ahí el
+bucle de Tk sustituye a ``BucleSinTk``.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import selectors
+import signal
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from .constantes import (
+    ATAJOS_PREDETERMINADOS,
+    MOTOR_ESTADISTICAS_PREDETERMINADO,
+    RETENCION_DIAS_PREDETERMINADA,
+)
+from . import atajos
+from . import bucle_glib
+from . import config as cfg
+from . import control
+from . import notificaciones
+from . import perfil
+from . import sonido
+from .bandeja import BandejaSistema
+from .estadisticas import Estadisticas
+from .motor import MotorRecordatorios
+from .planificador import Planificador
+
+
+class BucleSinTk:
+    """Bucle de eventos mínimo con la interfaz ``after`` de Tk.
+
+    También vigila descriptores con ``createfilehandler`` y
+    ``deletefilehandler`` (como ``tk.createfilehandler``) sobre un
+    ``selectors``; las llamadas de otros hilos lo despiertan escribiendo
+    en una tubería propia. Las señales también escriben en ella
+    (``signal.set_wakeup_fd``): el núcleo puede entregarlas a otro hilo y
+    sin eso el manejador no se ejecutaría hasta el siguiente despertar.
+    """
+
+    def __init__(self) -> None:
+        self._temporizadores: list[tuple[float, int, str, Callable, tuple]] = []
+        self._cancelados: set[str] = set()
+        self._llamadas: deque[tuple[Callable, tuple]] = deque()
+        self._cerrojo = threading.Lock()
+        self._orden = itertools.count()
+        self._activo = False
+        self._hilo: int | None = None
+        self._selector = selectors.DefaultSelector()
+        self._despertador, self._aviso = os.pipe()
+        os.set_blocking(self._despertador, False)
+        os.set_blocking(self._aviso, False)
+        self._selector.register(self._despertador, selectors.EVENT_READ)
+
+    def _despertar(self) -> None:
+        # Desde el propio bucle no hace falta: vuelve a calcular la espera
+        if threading.get_ident() == self._hilo:
+            return
+        try:
+            os.write(self._aviso, b"\0")
+        except BlockingIOError:
+            pass  # ya hay despertares pendientes
+
+    def after(self, ms: int, funcion: Callable, *args) -> str:
+        with self._cerrojo:
+            orden = next(self._orden)
+            ident = f"after#{orden}"
+            heapq.heappush(
+                self._temporizadores,
+                (time.monotonic() + ms / 1000, orden, ident, funcion, args),
+            )
+        self._despertar()
+        return ident
+
+    def after_cancel(self, ident: str) -> None:
+        with self._cerrojo:
+            self._cancelados.add(ident)
+
+    def createfilehandler(
+        self, descriptor: int, mascara: int, funcion: Callable[[int, int], None]
+    ) -> None:
+        """Llama a ``funcion(descriptor, mascara)`` cuando esté listo."""
+        eventos = 0
+        if mascara & (bucle_glib.LEGIBLE | bucle_glib.EXCEPCION):
+            eventos |= selectors.EVENT_READ
+        if mascara & bucle_glib.ESCRIBIBLE:
+            eventos |= selectors.EVENT_WRITE
+        try:
+            self._selector.modify(descriptor, eventos, (funcion, mascara))
+        except KeyError:
+            self._selector.register(descriptor, eventos, (funcion, mascara))
+
+    def deletefilehandler(self, descriptor: int) -> None:
+        try:
+            self._selector.unregister(descriptor)
+        except (KeyError, ValueError):
+            pass
+
+    def llamar(self, funcion: Callable, *args) -> None:
+        """Encola *funcion* desde cualquier hilo y despierta al bucle."""
+        with self._cerrojo:
+            self._llamadas.append((funcion, args))
+        self._despertar()
+
+    def detener(self) -> None:
+        self._activo = False
+        self._despertar()
+
+    def vaciar_llamadas(self) -> list[tuple[Callable, tuple]]:
+        """Devuelve y descarta las llamadas encoladas que no se atendieron."""
+        with self._cerrojo:
+            llamadas = list(self._llamadas)
+            self._llamadas.clear()
+        return llamadas
+
+    def ejecutar(self) -> None:
+        """Atiende temporizadores, descriptores y llamadas hasta detener()."""
+        self._activo = True
+        self._hilo = threading.get_ident()
+        principal = threading.current_thread() is threading.main_thread()
+        if principal:
+            anterior = signal.set_wakeup_fd(self._aviso)
+        try:
+            while self._activo:
+                with self._cerrojo:
+                    espera = 0.0 if self._llamadas else self._espera_pendiente()
+                listos = self._selector.select(
+                    None if espera is None else max(0.0, espera)
+                )
+                lote: list[tuple[Callable, tuple]] = []
+                for clave, _ in listos:
+                    if clave.fd == self._despertador:
+                        self._vaciar_despertador()
+                    else:
+                        funcion, mascara = clave.data
+                        lote.append((funcion, (clave.fd, mascara)))
+                with self._cerrojo:
+                    lote.extend(self._llamadas)
+                    self._llamadas.clear()
+                    lote.extend(self._extraer_vencidos())
+                for funcion, args in lote:
+                    if not self._activo:
+                        break
+                    try:
+                        funcion(*args)
+                    except Exception as e:
+                        print(f"Aviso: error en el bucle: {e}")
+        finally:
+            self._hilo = None
+            if principal:
+                signal.set_wakeup_fd(anterior)
+
+    def _vaciar_despertador(self) -> None:
+        try:
+            while os.read(self._despertador, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _espera_pendiente(self) -> float | None:
+        while self._temporizadores and self._temporizadores[0][2] in self._cancelados:
+            self._cancelados.discard(heapq.heappop(self._temporizadores)[2])
+        if not self._temporizadores:
+            return None
+        return self._temporizadores[0][0] - time.monotonic()
+
+    def _extraer_vencidos(self) -> list[tuple[Callable, tuple]]:
+        ahora = time.monotonic()
+        vencidos = []
+        while self._temporizadores and self._temporizadores[0][0] <= ahora:
+            _, _, ident, funcion, args = heapq.heappop(self._temporizadores)
+            if ident in self._cancelados:
+                self._cancelados.discard(ident)
+                continue
+            vencidos.append((funcion, args))
+        return vencidos
+
+
+class Demonio:
+    """Instancia sin ventana; crea la interfaz solo cuando se pide."""
+
+    def __init__(self, servidor: control.ServidorControl) -> None:
+        self.servidor = servidor
+        self.bucle = BucleSinTk()
+        with perfil.medir("config.cargar"):
+            config = cfg.cargar()
+        with perfil.medir("estadisticas.cargar"):
+            estadisticas = Estadisticas(
+                config.get("motor_estadisticas", MOTOR_ESTADISTICAS_PREDETERMINADO),
+                config.get("retencion_dias", RETENCION_DIAS_PREDETERMINADA),
+            )
+        self.motor = MotorRecordatorios(Planificador(self.bucle), config, estadisticas)
+        self.bandeja = BandejaSistema()
+        self.ventana_raiz = None
+        self.app = None
+        self._crear_interfaz = False
+        # Llamadas al bucle de Tk una vez creado; el cerrojo evita perder
+        # las que llegan mientras se cambia de bucle
+        self._buzon: control.Buzon | None = None
+        self._cerrojo_buzon = threading.Lock()
+
+    # ── Ciclo de vida ──────────────────────────────────────────
+
+    def ejecutar(self) -> None:
+        # Sin ventana, el aviso de respaldo no debe abrir un diálogo de Tk
+        notificaciones.usar_dialogos = False
+        config = self.motor.config
+        # La bandeja y los atajos se atienden desde este mismo bucle
+        bucle_glib.iniciar(self.bucle)
+        with perfil.medir("bandeja"):
+            self.bandeja.iniciar(
+                al_alternar_ventana=self.alternar_ventana,
+                al_alternar_temporizador=self.motor.alternar,
+                al_salir=self.salir,
+            )
+        with perfil.medir("atajos"):
+            self._registrar_atajos(config)
+        self.servidor.iniciar(self.atender_orden, self._desde_hilo)
+        # Solo se arranca de cero sin punto de control: si el usuario lo
+        # dejó parado, sigue parado
+        if self.motor.reanudar() is None:
+            self.motor.iniciar()
+        perfil.fin_arranque()
+        while True:
+            self.bucle.ejecutar()
+            if not self._crear_interfaz or self._ejecutar_interfaz():
+                return
+
+    def _registrar_atajos(self, config: dict) -> None:
+        atajos.inicializar()
+        atajos.vincular(
+            config.get("atajo_toggle", ATAJOS_PREDETERMINADOS["toggle_temporizador"]),
+            lambda _k: self.motor.alternar(),
+        )
+        atajos.vincular(
+            config.get("atajo_ventana", ATAJOS_PREDETERMINADOS["mostrar_ocultar"]),
+            lambda _k: self.alternar_ventana(),
+        )
+
+    def _desde_hilo(self, funcion: Callable[[], None]) -> None:
+        """Lleva una llamada del socket de control al bucle activo."""
+        with self._cerrojo_buzon:
+            if self._buzon is not None:
+                self._buzon.llamar(funcion)
+            else:
+                self.bucle.llamar(funcion)
+
+    def atender_orden(self, orden: str) -> str:
+        if self.app is not None:
+            return self.app.atender_orden(orden)
+        return control.atender(orden, self.motor, self._pedir_interfaz)
+
+    def alternar_ventana(self) -> None:
+        if self.app is not None:
+            self.app.alternar_ventana()
+            return
+        self._pedir_interfaz()
+
+    def _pedir_interfaz(self) -> None:
+        # Salir del bucle sin Tk y continuar en el de Tk
+        self._crear_interfaz = True
+        self.bucle.detener()
+
+    def _ejecutar_interfaz(self) -> bool:
+        """Crea la interfaz y atiende su bucle; False si no hay pantalla."""
+        import tkinter as tk
+
+        from .aplicacion import AplicacionRecordatorioEstiramiento
+
+        try:
+            ventana_raiz = tk.Tk()
+        except tk.TclError as e:
+            print(f"Aviso: no se pudo abrir la ventana: {e}")
+            self._crear_interfaz = False
+            return False
+        notificaciones.usar_dialogos = True
+        self.ventana_raiz = ventana_raiz
+        self.app = AplicacionRecordatorioEstiramiento(
+            self.ventana_raiz, self.motor, self.bandeja
+        )
+        with self._cerrojo_buzon:
+            self._buzon = control.Buzon(self.ventana_raiz.tk)
+            # Lo que llegó desde otros hilos durante el cambio de bucle
+            for funcion, args in self.bucle.vaciar_llamadas():
+                self.ventana_raiz.after(0, funcion, *args)
+        self.ventana_raiz.mainloop()
+        return True
+
+    def salir(self) -> None:
+        if self.app is not None:
+            self.app.salir_aplicacion()
+            return
+        self.motor.cerrar()
+        self.motor.planificador.cancelar_todo()
+        self.bandeja.detener()
+        bucle_glib.detener()
+        sonido.cerrar()
+        self.motor.estadisticas.cerrar()
+        self.bucle.detener()
@@ -1,23 +1,299 @@
-"""Gestión de estadísticas diarias y rachas de pausas."""
+"""Gestión de estadísticas diarias y rachas de pausas.
+
+La persistencia se delega en un almacén intercambiable:
+
+- ``AlmacenJSON`` (predeterminado): ``estadisticas.json`` con el snapshot
+  completo y ``estadisticas.diario``, un diario de solo anexado con una
+  línea JSON por pausa registrada desde el último snapshot. Registrar una
+  pausa solo añade una línea, y cada ``UMBRAL_COMPACTACION_DIARIO``
+  registros el diario se pliega en el snapshot. Solo los últimos
+  ``retencion_dias`` conservan el detalle diario; al compactar, los meses
+  completos anteriores se consolidan (ver ``consolidar``), así que el
+  archivo y su carga dejan de crecer con los años.
+- ``AlmacenSQLite`` (ver ``estadisticas_sqlite``): base de datos en modo
+  WAL con índices por día y por marca de tiempo.
+
+Las consultas de la interfaz se responden desde un índice en memoria
+(racha hasta ayer, entrada de hoy y hora de la primera pausa ya
+parseada) que se construye una vez al cargar y ``registrar_pausa``
+mantiene en O(1). Al cambiar de día el índice avanza sin recorrer el
+historial.
+
+Con la sincronización activada (``sincronizacion``), la racha, las
+pausas por día y los totales por semana y por mes suman también las de
+los demás equipos del usuario.
+"""
 
 from __future__ import annotations
 
 import json
+import os
 from datetime import date, datetime, timedelta
+from typing import Container, Iterable
 
-from .constantes import RUTA_ARCHIVO_ESTADISTICAS, RUTA_DIRECTORIO_CONFIG
+from .constantes import (
+    MOTOR_ESTADISTICAS_PREDETERMINADO,
+    RETENCION_DIAS_PREDETERMINADA,
+    RUTA_ARCHIVO_ESTADISTICAS,
+    RUTA_DIARIO_ESTADISTICAS,
+    UMBRAL_COMPACTACION_DIARIO,
+)
+from .analisis import Analizador, Resumen
+from .cerrojo import cerrojo_estadisticas
+from .historial import TIPO_AVISO, TIPO_DESCANSO, Historial
 
 
-class Estadisticas:
-    """Registra pausas diarias, calcula rachas y tiempo activo."""
+def aplicar_pausa(datos: dict, dia: str, hora: str) -> None:
+    """Suma una pausa a la entrada *dia* de *datos* (formato ``{"dias": …}``)."""
+    dias = datos.setdefault("dias", {})
+    if dia not in dias:
+        dias[dia] = {
+            "pausas": 0,
+            "primera": None,
+            "ultima": None,
+        }
+    entrada = dias[dia]
+    entrada["pausas"] += 1
+    if entrada["primera"] is None:
+        entrada["primera"] = hora
+    entrada["ultima"] = hora
 
-    def __init__(self) -> None:
-        self.datos: dict = self._cargar()
 
-    # ── Persistencia ───────────────────────────────────────────
+def _dias_en_rango(desde: date, hasta: date):
+    dia = desde
+    while dia <= hasta:
+        yield dia.isoformat()
+        dia += timedelta(days=1)
+
+
+def clave_mes(dia: date) -> str:
+    return f"{dia.year:04d}-{dia.month:02d}"
+
+
+def clave_semana(dia: date) -> str:
+    """Semana ISO de *dia* (``AAAA-Wss``), la que empieza en su lunes."""
+    anio, semana, _ = dia.isocalendar()
+    return f"{anio:04d}-W{semana:02d}"
+
+
+def limite_consolidacion(retencion_dias: int, hoy: date) -> date:
+    """Primer día que se conserva con detalle: el del mes de la retención."""
+    return (hoy - timedelta(days=retencion_dias)).replace(day=1)
+
+
+def consolidar(datos: dict, retencion_dias: int, hoy: date) -> bool:
+    """Pasa a totales agregados los meses completos anteriores a la retención.
+
+    Cada día consolidado suma sus pausas a ``datos["meses"]["AAAA-MM"]``
+    (``{"pausas": N, "dias": máscara}``, con el bit ``d - 1`` puesto si el
+    día *d* tuvo pausas, lo que basta para las rachas) y a
+    ``datos["semanas"]["AAAA-Wss"]``. Cada día está o en ``dias`` o en
+    los agregados, nunca en ambos, así que los totales siguen siendo
+    exactos. Devuelve True si movió algo.
+    """
+    limite = limite_consolidacion(retencion_dias, hoy).isoformat()
+    dias = datos.setdefault("dias", {})
+    antiguos = [iso for iso in dias if iso < limite]
+    if not antiguos:
+        return False
+    meses = datos.setdefault("meses", {})
+    semanas = datos.setdefault("semanas", {})
+    for iso in antiguos:
+        pausas = dias.pop(iso).get("pausas", 0)
+        dia = date.fromisoformat(iso)
+        mes = meses.setdefault(clave_mes(dia), {"pausas": 0, "dias": 0})
+        mes["pausas"] += pausas
+        mes["dias"] |= 1 << (dia.day - 1)
+        semana = clave_semana(dia)
+        semanas[semana] = semanas.get(semana, 0) + pausas
+    return True
+
+
+def inicio_detalle(datos: dict) -> date | None:
+    """Primer día que puede tener detalle; los anteriores están consolidados.
+
+    None si no se ha consolidado nada.
+    """
+    meses = datos.get("meses")
+    if not meses:
+        return None
+    ultimo = date.fromisoformat(max(meses) + "-01")
+    return (ultimo + timedelta(days=32)).replace(day=1)
+
+
+def dias_activos_hasta(
+    datos: dict,
+    dia: date,
+    otros: Container[str] = (),
+    otros_meses: dict[str, dict] | None = None,
+) -> int:
+    """Días seguidos con pausas que terminan en *dia* (incluido).
+
+    Recorre el detalle diario (y los días ISO de *otros*, con pausas en
+    otros equipos) y, más atrás, las máscaras de los meses consolidados
+    (unidas a las de *otros_meses*); un mes completo se salta de una vez.
+    """
+    dias = datos.get("dias", {})
+    meses = datos.get("meses", {})
+    otros_meses = otros_meses or {}
+    racha = 0
+    while True:
+        iso = dia.isoformat()
+        if iso in dias or iso in otros:
+            racha += 1
+            dia -= timedelta(days=1)
+            continue
+        mes = clave_mes(dia)
+        mascara = meses.get(mes, {}).get("dias", 0)
+        mascara |= otros_meses.get(mes, {}).get("dias", 0)
+        completa = (1 << dia.day) - 1
+        if mascara & completa == completa:
+            # Todo el mes hasta *dia* tuvo pausas: saltar al mes anterior
+            racha += dia.day
+            dia = dia.replace(day=1) - timedelta(days=1)
+            continue
+        if not mascara >> (dia.day - 1) & 1:
+            return racha
+        racha += 1
+        dia -= timedelta(days=1)
+
+
+def racha_maxima(
+    datos: dict,
+    otros: Iterable[str] = (),
+    otros_meses: dict[str, dict] | None = None,
+) -> int:
+    """Racha más larga de días seguidos con pausas en todo el historial.
+
+    Cuenta los días con detalle, los de *otros* y, de los meses
+    consolidados (propios y de *otros_meses*), los de su máscara.
+    """
+    activos = {date.fromisoformat(iso).toordinal() for iso in datos.get("dias", {})}
+    activos.update(date.fromisoformat(iso).toordinal() for iso in otros)
+    for meses in (datos.get("meses", {}), otros_meses or {}):
+        for mes, agregado in meses.items():
+            primero = date.fromisoformat(mes + "-01").toordinal()
+            mascara = agregado.get("dias", 0)
+            activos.update(primero + bit for bit in range(31) if mascara >> bit & 1)
+    mejor = actual = 0
+    previo = None
+    for dia in sorted(activos):
+        actual = actual + 1 if previo is not None and dia == previo + 1 else 1
+        mejor = max(mejor, actual)
+        previo = dia
+    return mejor
+
+
+class AlmacenJSON:
+    """Snapshot JSON más diario de solo anexado, seguro entre procesos.
+
+    Todas las operaciones se hacen con el cerrojo consultivo de
+    ``cerrojo`` (``lockf`` en ``estadisticas.lock``, válido sobre NFS). Cada
+    proceso solo anexa sus propias pausas al diario y, antes de escribir,
+    aplica lo que otros hayan anexado desde su última lectura; si otro
+    proceso ha compactado, recarga snapshot y diario. Así los
+    incrementos de varias instancias se suman en lugar de pisarse.
+    """
+
+    def __init__(self, retencion_dias: int = RETENCION_DIAS_PREDETERMINADA) -> None:
+        self._retencion_dias = retencion_dias
+        self._registros_diario = 0
+        self._datos: dict = {"dias": {}}
+        # Posición leída del diario y firmas para detectar compactaciones
+        self._desplazamiento = 0
+        self._identidad_diario: tuple[int, int] | None = None
+        self._cola_incompleta = False
+        self._firma_snapshot: tuple | None = None
+
+    # ── Sincronización entre procesos ─────────────────────────
+
+    @staticmethod
+    def _firma(ruta) -> tuple | None:
+        try:
+            st = os.stat(ruta)
+        except FileNotFoundError:
+            return None
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def _sincronizar(self) -> bool:
+        """Aplica los cambios de otros procesos. Devuelve True si había."""
+        diario = self._firma(RUTA_DIARIO_ESTADISTICAS)
+        compactado = (
+            self._firma(RUTA_ARCHIVO_ESTADISTICAS) != self._firma_snapshot
+            or (
+                self._identidad_diario is not None
+                and (diario is None or diario[:2] != self._identidad_diario)
+            )
+            or (diario is not None and diario[2] < self._desplazamiento)
+        )
+        if compactado:
+            self._recargar()
+            return True
+        if diario is not None and diario[2] > self._desplazamiento:
+            if self._leer_diario():
+                self._compactar()
+            return True
+        return False
+
+    def _recargar(self) -> None:
+        """Relee snapshot y diario completos conservando el mismo dict."""
+        self._firma_snapshot = self._firma(RUTA_ARCHIVO_ESTADISTICAS)
+        snapshot = self._leer_snapshot()
+        self._datos.clear()
+        self._datos.update(snapshot)
+        self._datos.setdefault("dias", {})
+        self._registros_diario = 0
+        self._desplazamiento = 0
+        self._identidad_diario = None
+        self._cola_incompleta = False
+        if self._leer_diario():
+            # Reescribir para no anexar detrás de una línea dañada
+            self._compactar()
+
+    def _leer_diario(self) -> bool:
+        """Aplica las líneas nuevas del diario. Devuelve True si hay dañadas."""
+        try:
+            with open(RUTA_DIARIO_ESTADISTICAS, "rb") as f:
+                st = os.fstat(f.fileno())
+                f.seek(self._desplazamiento)
+                bloque = f.read()
+        except FileNotFoundError:
+            return False
+        completas, _, resto = bloque.rpartition(b"\n")
+        danado = False
+        for linea in completas.split(b"\n") if completas else ():
+            try:
+                registro = json.loads(linea)
+                aplicar_pausa(self._datos, registro["d"], registro["h"])
+            except Exception:
+                # Línea truncada por un cierre inesperado: se descarta
+                danado = True
+                continue
+            self._registros_diario += 1
+        self._desplazamiento += len(bloque) - len(resto)
+        self._identidad_diario = (st.st_dev, st.st_ino)
+        self._cola_incompleta = bool(resto)
+        return danado
+
+    def _compactar(self) -> None:
+        """Consolida lo antiguo, escribe el snapshot atómicamente y vacía el diario."""
+        consolidar(self._datos, self._retencion_dias, date.today())
+        temporal = RUTA_ARCHIVO_ESTADISTICAS.with_suffix(".json.tmp")
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(self._datos, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, RUTA_ARCHIVO_ESTADISTICAS)
+        # El snapshot ya contiene todo lo del diario
+        RUTA_DIARIO_ESTADISTICAS.unlink(missing_ok=True)
+        self._firma_snapshot = self._firma(RUTA_ARCHIVO_ESTADISTICAS)
+        self._registros_diario = 0
+        self._desplazamiento = 0
+        self._identidad_diario = None
+        self._cola_incompleta = False
 
     @staticmethod
-    def _cargar() -> dict:
+    def _leer_snapshot() -> dict:
         if not RUTA_ARCHIVO_ESTADISTICAS.exists():
             return {"dias": {}}
         try:
@@ -27,68 +303,362 @@ class Estadisticas:
         except Exception:
             return {"dias": {}}
 
+    # ── Interfaz de almacén ───────────────────────────────────
+
+    def cargar(self) -> dict:
+        """Lee el snapshot y reaplica los registros pendientes del diario."""
+        with cerrojo_estadisticas():
+            self._recargar()
+            if consolidar(self._datos, self._retencion_dias, date.today()):
+                # Primera carga tras cumplirse la retención de algún mes
+                self._compactar()
+        return self._datos
+
+    def leer(self) -> dict:
+        """Snapshot más diario sin escribir nada (para importarlos a otro almacén)."""
+        with cerrojo_estadisticas():
+            self._datos = self._leer_snapshot()
+            self._datos.setdefault("dias", {})
+            self._leer_diario()
+        return self._datos
+
+    def guardar(self, datos: dict) -> None:
+        """Fusiona lo escrito por otros procesos y compacta el diario."""
+        with cerrojo_estadisticas():
+            self._sincronizar()
+            self._compactar()
+
+    def registrar(self, ahora: datetime) -> bool:
+        """Anexa una pausa al diario y la aplica en memoria.
+
+        Devuelve True si antes se incorporaron pausas de otros procesos.
+        """
+        dia = ahora.date().isoformat()
+        hora = ahora.strftime("%H:%M:%S")
+        linea = json.dumps({"d": dia, "h": hora}, separators=(",", ":")) + "\n"
+        with cerrojo_estadisticas():
+            externos = self._sincronizar()
+            if self._cola_incompleta:
+                # Cerrar la línea truncada para no corromper la nueva
+                linea = "\n" + linea
+            with open(RUTA_DIARIO_ESTADISTICAS, "ab") as f:
+                f.write(linea.encode("utf-8"))
+                self._desplazamiento = f.tell()
+                st = os.fstat(f.fileno())
+            self._identidad_diario = (st.st_dev, st.st_ino)
+            self._cola_incompleta = False
+            aplicar_pausa(self._datos, dia, hora)
+            self._registros_diario += 1
+            if self._registros_diario >= UMBRAL_COMPACTACION_DIARIO:
+                self._compactar()
+        return externos
+
+    def pausas_por_dia(self, desde: date, hasta: date) -> dict[str, int] | None:
+        """Pausas de cada día con registros entre *desde* y *hasta*.
+
+        None si el rango empieza en días ya consolidados.
+        """
+        limite = inicio_detalle(self._datos)
+        if limite is not None and desde < limite:
+            return None
+        dias = self._datos.get("dias", {})
+        resultado = {}
+        for iso in _dias_en_rango(desde, hasta):
+            entrada = dias.get(iso)
+            if entrada is not None:
+                resultado[iso] = entrada.get("pausas", 0)
+        return resultado
+
+    def pausas_entre(self, inicio: datetime, fin: datetime) -> int | None:
+        """El JSON solo guarda totales diarios: cuenta días completos.
+
+        None si el rango empieza en días ya consolidados.
+        """
+        pausas = self.pausas_por_dia(inicio.date(), fin.date())
+        return None if pausas is None else sum(pausas.values())
+
+    def cerrar(self) -> None:
+        pass
+
+
+def crear_almacen(
+    motor: str = MOTOR_ESTADISTICAS_PREDETERMINADO,
+    retencion_dias: int = RETENCION_DIAS_PREDETERMINADA,
+):
+    """Devuelve el almacén para *motor* ("json" o "sqlite")."""
+    if motor == "sqlite":
+        try:
+            from .estadisticas_sqlite import AlmacenSQLite
+
+            return AlmacenSQLite(retencion_dias)
+        except Exception as e:
+            print(f"Aviso: SQLite no disponible ({e}); se usa JSON.")
+    return AlmacenJSON(retencion_dias)
+
+
+class Estadisticas:
+    """Registra pausas diarias, calcula rachas y tiempo activo."""
+
+    def __init__(
+        self,
+        motor: str = MOTOR_ESTADISTICAS_PREDETERMINADO,
+        retencion_dias: int = RETENCION_DIAS_PREDETERMINADA,
+    ) -> None:
+        self._almacen = crear_almacen(motor, retencion_dias)
+        self.datos: dict = self._cargar()
+        # Cada aviso y cada descanso, con hora, duración y resultado
+        self.historial = Historial()
+        self._analizador = Analizador(self.historial)
+
+        # Índice en memoria para consultas en O(1)
+        self._indice_dia: date = date.today()
+        self._racha_hasta_ayer = 0
+        self._entrada_hoy: dict | None = None
+        self._inicio_hoy: datetime | None = None
+        # Pausas de los demás equipos del usuario (sincronizacion): por
+        # día y, de lo que ellos ya consolidaron, por mes y por semana
+        self._remotos: dict[str, int] = {}
+        self._remotos_meses: dict[str, dict] = {}
+        self._remotos_semanas: dict[str, int] = {}
+        self._reconstruir_indice()
+
+    # ── Persistencia ───────────────────────────────────────────
+
+    def _cargar(self) -> dict:
+        return self._almacen.cargar()
+
     def guardar(self) -> None:
-        RUTA_DIRECTORIO_CONFIG.mkdir(parents=True, exist_ok=True)
-        RUTA_ARCHIVO_ESTADISTICAS.write_text(
-            json.dumps(self.datos, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+        self._almacen.guardar(self.datos)
+
+    def cerrar(self) -> None:
+        """Libera el almacén (conexiones abiertas, etc.)."""
+        self._almacen.cerrar()
+        self.historial.cerrar()
 
     # ── Registro ───────────────────────────────────────────────
 
     def registrar_pausa(self) -> None:
-        hoy = date.today().isoformat()
-        if hoy not in self.datos.setdefault("dias", {}):
-            self.datos["dias"][hoy] = {
-                "pausas": 0,
-                "primera": None,
-                "ultima": None,
-            }
-        entrada = self.datos["dias"][hoy]
-        entrada["pausas"] += 1
-        ahora = datetime.now().strftime("%H:%M:%S")
-        if entrada["primera"] is None:
-            entrada["primera"] = ahora
-        entrada["ultima"] = ahora
-        self.guardar()
+        ahora = datetime.now().replace(microsecond=0)
+        self._indice_al_dia(ahora.date())
+        self.historial.anotar(TIPO_AVISO, ahora.timestamp())
+        if self._almacen.registrar(ahora):
+            # Otra instancia ha escrito pausas: rehacer el índice
+            self._reconstruir_indice()
+        elif self._entrada_hoy is None:
+            self._entrada_hoy = self.datos["dias"][ahora.date().isoformat()]
+            self._inicio_hoy = self._parsear_inicio(ahora.date(), self._entrada_hoy)
+
+    def registrar_descanso(
+        self, inicio: float, duracion: float, resultado: int
+    ) -> None:
+        """Anota un descanso Pomodoro que empezó en *inicio* (epoch)."""
+        self.historial.anotar(TIPO_DESCANSO, inicio, duracion, resultado)
+
+    def actualizar_remotos(
+        self,
+        remotos: dict[str, int],
+        meses: dict[str, dict] | None = None,
+        semanas: dict[str, int] | None = None,
+    ) -> None:
+        """Sustituye las pausas que aportan los demás equipos.
+
+        *meses* tiene la forma de ``datos["meses"]`` y *semanas* la de
+        ``datos["semanas"]``.
+        """
+        self._remotos = remotos
+        self._remotos_meses = meses or {}
+        self._remotos_semanas = semanas or {}
+        self._reconstruir_indice()
+
+    # ── Índice en memoria ──────────────────────────────────────
+
+    def _reconstruir_indice(self) -> None:
+        """Recorre el historial una vez para preparar el índice del día."""
+        hoy = date.today()
+        dias = self.datos.get("dias", {})
+        self._indice_dia = hoy
+        self._racha_hasta_ayer = dias_activos_hasta(
+            self.datos, hoy - timedelta(days=1), self._remotos, self._remotos_meses
+        )
+        self._entrada_hoy = dias.get(hoy.isoformat())
+        self._inicio_hoy = self._parsear_inicio(hoy, self._entrada_hoy)
+
+    def _indice_al_dia(self, hoy: date | None = None) -> None:
+        """Avanza el índice si ha cambiado el día desde la última consulta."""
+        if hoy is None:
+            hoy = date.today()
+        if hoy == self._indice_dia:
+            return
+        if hoy == self._indice_dia + timedelta(days=1):
+            # Medianoche: la racha de ayer pasa a ser la base de hoy
+            if self._activo_hoy():
+                self._racha_hasta_ayer += 1
+            else:
+                self._racha_hasta_ayer = 0
+            self._indice_dia = hoy
+            self._entrada_hoy = self.datos.get("dias", {}).get(hoy.isoformat())
+            self._inicio_hoy = self._parsear_inicio(hoy, self._entrada_hoy)
+            return
+        # Salto de varios días o reloj hacia atrás
+        self._reconstruir_indice()
+
+    def _activo_hoy(self) -> bool:
+        """Si el día del índice tiene pausas en este u otro equipo."""
+        return (
+            self._entrada_hoy is not None
+            or self._indice_dia.isoformat() in self._remotos
+        )
+
+    @staticmethod
+    def _parsear_inicio(dia: date, entrada: dict | None) -> datetime | None:
+        if entrada is None or entrada.get("primera") is None:
+            return None
+        try:
+            hora = datetime.strptime(entrada["primera"], "%H:%M:%S").time()
+        except (TypeError, ValueError):
+            return None
+        return datetime.combine(dia, hora)
 
     # ── Consultas ──────────────────────────────────────────────
 
     def pausas_hoy(self) -> int:
-        hoy = date.today().isoformat()
-        return self.datos.get("dias", {}).get(hoy, {}).get("pausas", 0)
+        self._indice_al_dia()
+        remotas = self._remotos.get(self._indice_dia.isoformat(), 0)
+        if self._entrada_hoy is None:
+            return remotas
+        return self._entrada_hoy.get("pausas", 0) + remotas
 
     def racha_dias(self) -> int:
-        dias_ordenados = sorted(self.datos.get("dias", {}).keys(), reverse=True)
-        if not dias_ordenados:
+        self._indice_al_dia()
+        if not self._activo_hoy():
             return 0
-        racha = 0
-        dia_actual = date.today()
-        for iso in dias_ordenados:
-            try:
-                d = date.fromisoformat(iso)
-            except ValueError:
-                continue
-            if d == dia_actual:
-                racha += 1
-                dia_actual -= timedelta(days=1)
-            elif d < dia_actual:
-                break
-        return racha
+        return self._racha_hasta_ayer + 1
+
+    def mejor_racha(self) -> int:
+        """Racha más larga, también en lo consolidado y en otros equipos."""
+        return racha_maxima(self.datos, self._remotos, self._remotos_meses)
 
     def tiempo_desde_primera_pausa_hoy(self) -> str:
-        hoy = date.today().isoformat()
-        primera = self.datos.get("dias", {}).get(hoy, {}).get("primera")
-        if primera is None:
+        self._indice_al_dia()
+        if self._inicio_hoy is None:
             return "—"
-        try:
-            inicio = datetime.strptime(primera, "%H:%M:%S").replace(
-                year=date.today().year,
-                month=date.today().month,
-                day=date.today().day,
+        delta = datetime.now() - self._inicio_hoy
+        horas, resto = divmod(max(0, int(delta.total_seconds())), 3600)
+        minutos, _ = divmod(resto, 60)
+        return f"{horas}h {minutos}m"
+
+    def resumen_historial(self) -> Resumen:
+        """Media semanal, distribución horaria, huecos y descansos saltados.
+
+        Se calcula sobre el historial de eventos y se reutiliza hasta la
+        siguiente pausa o descanso registrado.
+        """
+        return self._analizador.resumen()
+
+    # ── Consultas por rango ────────────────────────────────────
+
+    def pausas_por_dia(self, desde: date, hasta: date) -> dict[str, int] | None:
+        """Pausas de cada día entre *desde* y *hasta* (ambos incluidos).
+
+        De los días consolidados (ver ``consolidar``) solo quedan totales
+        por mes y por semana: si el rango empieza antes de
+        ``inicio_detalle`` devuelve None en lugar de un detalle incompleto.
+        Lo mismo con lo que han consolidado los demás equipos.
+        """
+        limite = self._limite_detalle()
+        if limite is not None and desde < limite:
+            return None
+        pausas = self._almacen.pausas_por_dia(desde, hasta)
+        if pausas is None:
+            return None
+        if self._remotos:
+            for iso in _dias_en_rango(desde, hasta):
+                if iso in self._remotos:
+                    pausas[iso] = pausas.get(iso, 0) + self._remotos[iso]
+        return pausas
+
+    def pausas_en_rango(self, desde: date, hasta: date) -> int | None:
+        """Pausas entre *desde* y *hasta* (ambos incluidos).
+
+        La parte consolidada del rango se suma con los totales mensuales y
+        semanales, así que tiene que estar hecha de meses naturales o de
+        semanas ISO (lunes a domingo) completos; si no, devuelve None.
+        """
+        limite = self._limite_detalle()
+        total = 0
+        dia = desde
+        while dia <= hasta:
+            if limite is None or dia >= limite:
+                return total + self._pausas_detalle(dia, hasta)
+            siguiente = (dia + timedelta(days=32)).replace(day=1)
+            fin = siguiente - timedelta(days=1)
+            if dia.day == 1 and fin <= hasta:
+                # Cada equipo puede haber consolidado el mes o no
+                total += self._pausas_mes_consolidado(clave_mes(dia))
+                total += self._pausas_detalle(dia, fin)
+                dia = siguiente
+                continue
+            domingo = dia + timedelta(days=6)
+            if dia.weekday() != 0 or domingo > hasta:
+                return None
+            # Una semana puede estar consolidada solo en parte
+            semana = clave_semana(dia)
+            total += self.datos.get("semanas", {}).get(semana, 0)
+            total += self._remotos_semanas.get(semana, 0)
+            total += self._pausas_detalle(dia, domingo)
+            dia = domingo + timedelta(days=1)
+        return total
+
+    def _limite_detalle(self) -> date | None:
+        """``inicio_detalle`` de este equipo o de los demás, el más tardío."""
+        limites = [
+            limite
+            for limite in (
+                inicio_detalle(self.datos),
+                inicio_detalle({"meses": self._remotos_meses}),
             )
-            delta = datetime.now() - inicio
-            horas, resto = divmod(int(delta.total_seconds()), 3600)
-            minutos, _ = divmod(resto, 60)
-            return f"{horas}h {minutos}m"
-        except Exception:
-            return "—"
+            if limite is not None
+        ]
+        return max(limites, default=None)
+
+    def _pausas_detalle(self, desde: date, hasta: date) -> int:
+        """Pausas de los días con detalle entre *desde* y *hasta*, de todos."""
+        dias = self.datos.get("dias", {})
+        total = 0
+        for iso in _dias_en_rango(desde, hasta):
+            entrada = dias.get(iso)
+            if entrada is not None:
+                total += entrada.get("pausas", 0)
+            total += self._remotos.get(iso, 0)
+        return total
+
+    def _pausas_mes_consolidado(self, mes: str) -> int:
+        propio = self.datos.get("meses", {}).get(mes, {})
+        remoto = self._remotos_meses.get(mes, {})
+        return propio.get("pausas", 0) + remoto.get("pausas", 0)
+
+    def pausas_semana(self, dia: date | None = None) -> int:
+        """Pausas de la semana (lunes a domingo) que contiene *dia*."""
+        dia = dia or date.today()
+        lunes = dia - timedelta(days=dia.weekday())
+        return self.pausas_en_rango(lunes, lunes + timedelta(days=6)) or 0
+
+    def pausas_mes(self, dia: date | None = None) -> int:
+        """Pausas del mes natural que contiene *dia*."""
+        dia = dia or date.today()
+        inicio = dia.replace(day=1)
+        siguiente = (inicio + timedelta(days=32)).replace(day=1)
+        return self.pausas_en_rango(inicio, siguiente - timedelta(days=1)) or 0
+
+    def pausas_totales(self) -> int:
+        """Todas las pausas registradas, con detalle o ya consolidadas."""
+        return sum(
+            entrada.get("pausas", 0) for entrada in self.datos.get("dias", {}).values()
+        ) + sum(mes.get("pausas", 0) for mes in self.datos.get("meses", {}).values())
+
+    def pausas_entre(self, inicio: datetime, fin: datetime) -> int | None:
+        """Pausas entre dos instantes (resolución diaria con el motor JSON).
+
+        None si el rango empieza en días ya consolidados.
+        """
+        return self._almacen.pausas_entre(inicio, fin)
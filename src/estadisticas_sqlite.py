@@ -0,0 +1,307 @@
+"""Almacén de estadísticas en SQLite.
+
+Guarda cada pausa en ``pausas`` (indexada por marca de tiempo) y un
+resumen por día en ``dias`` (clave primaria por fecha ISO), de modo que
+registrar una pausa es una inserción y las consultas por rango son
+búsquedas indexadas. La base usa modo WAL para que las escrituras no
+bloqueen a los lectores.
+
+La primera vez que se abre importa ``estadisticas.json`` (y su diario)
+si existen, incluidos los totales de meses y semanas ya consolidados
+(``meses`` y ``semanas``); los archivos JSON solo se leen y se conservan
+intactos. El JSON solo guarda la primera y la última pausa de cada día:
+las demás se importan a ``pausas`` repartidas entre ambas, para que las
+consultas por instantes cuenten también los días importados.
+
+Como el motor JSON, al cargar pasa a ``meses`` y ``semanas`` los meses
+completos anteriores a la retención (ver ``estadisticas.consolidar``) y
+borra sus filas de ``dias`` y ``pausas``: la base y lo que se carga en
+memoria no crecen con los años.
+
+Varias instancias pueden compartir la base: los incrementos son
+``UPSERT`` atómicos y tras cada registro se relee la fila del día. El
+modo WAL necesita memoria compartida, así que en directorios NFS
+conviene el motor JSON.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime, time, timedelta
+
+from .constantes import (
+    RETENCION_DIAS_PREDETERMINADA,
+    RUTA_BD_ESTADISTICAS,
+    RUTA_DIRECTORIO_CONFIG,
+    TIEMPO_ESPERA_BD_S,
+)
+from .estadisticas import consolidar, inicio_detalle, limite_consolidacion
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS dias (
+    dia     TEXT PRIMARY KEY,
+    pausas  INTEGER NOT NULL DEFAULT 0,
+    primera TEXT,
+    ultima  TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS pausas (
+    id    INTEGER PRIMARY KEY,
+    marca REAL NOT NULL,
+    dia   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pausas_marca ON pausas (marca);
+CREATE INDEX IF NOT EXISTS idx_pausas_dia ON pausas (dia);
+CREATE TABLE IF NOT EXISTS meses (
+    mes    TEXT PRIMARY KEY,
+    pausas INTEGER NOT NULL,
+    dias   INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS semanas (
+    semana TEXT PRIMARY KEY,
+    pausas INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor TEXT
+) WITHOUT ROWID;
+"""
+
+
+def _marcas_importadas(
+    dia: str, pausas: int, primera: str | None, ultima: str | None
+) -> list[float]:
+    """Marcas para las *pausas* de un día importado, de *primera* a *ultima*."""
+
+    def marca(hora: str | None, respaldo: float) -> float:
+        try:
+            return datetime.combine(
+                date.fromisoformat(dia), time.fromisoformat(hora)
+            ).timestamp()
+        except (TypeError, ValueError):
+            return respaldo
+
+    mediodia = datetime.combine(date.fromisoformat(dia), time(12)).timestamp()
+    inicio = marca(primera, mediodia)
+    fin = max(inicio, marca(ultima, inicio))
+    if pausas <= 1:
+        return [inicio] * pausas
+    paso = (fin - inicio) / (pausas - 1)
+    return [inicio + paso * i for i in range(pausas)]
+
+
+class AlmacenSQLite:
+    """Almacén de estadísticas sobre una base SQLite en modo WAL."""
+
+    def __init__(self, retencion_dias: int = RETENCION_DIAS_PREDETERMINADA) -> None:
+        self._retencion_dias = retencion_dias
+        RUTA_DIRECTORIO_CONFIG.mkdir(parents=True, exist_ok=True)
+        self._conexion = sqlite3.connect(
+            str(RUTA_BD_ESTADISTICAS), timeout=TIEMPO_ESPERA_BD_S
+        )
+        self._datos: dict = {"dias": {}}
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        self._conexion.executescript(_ESQUEMA)
+        self._migrar_json()
+
+    # ── Migración ──────────────────────────────────────────────
+
+    def _migrado(self, clave: str) -> bool:
+        fila = self._conexion.execute(
+            "SELECT valor FROM meta WHERE clave = ?", (clave,)
+        ).fetchone()
+        return fila is not None
+
+    def _marcar_migrado(self, clave: str) -> None:
+        self._conexion.execute(
+            "INSERT INTO meta (clave, valor) VALUES (?, ?)",
+            (clave, datetime.now().isoformat(timespec="seconds")),
+        )
+
+    def _migrar_json(self) -> None:
+        if self._migrado("migrado_json") and self._migrado("migrado_agregados"):
+            return
+        from .estadisticas import AlmacenJSON
+
+        datos = AlmacenJSON().leer()
+        with self._conexion:
+            if not self._migrado("migrado_json"):
+                dias = [
+                    (
+                        dia,
+                        int(entrada.get("pausas", 0)),
+                        entrada.get("primera"),
+                        entrada.get("ultima"),
+                    )
+                    for dia, entrada in datos.get("dias", {}).items()
+                    if isinstance(entrada, dict)
+                ]
+                self._conexion.executemany(
+                    "INSERT OR IGNORE INTO dias (dia, pausas, primera, ultima) "
+                    "VALUES (?, ?, ?, ?)",
+                    dias,
+                )
+                self._conexion.executemany(
+                    "INSERT INTO pausas (marca, dia) VALUES (?, ?)",
+                    [
+                        (marca, dia)
+                        for dia, pausas, primera, ultima in dias
+                        for marca in _marcas_importadas(dia, pausas, primera, ultima)
+                    ],
+                )
+                self._marcar_migrado("migrado_json")
+            self._migrar_agregados(datos)
+            self._marcar_migrado("migrado_agregados")
+
+    def _migrar_agregados(self, datos: dict) -> None:
+        """Importa los totales consolidados de meses y semanas.
+
+        Un mes o una semana que ya tiene días en ``dias`` se importó antes
+        día a día (bases migradas antes de existir los agregados) y se
+        omite para no contarlo dos veces.
+        """
+        for mes, agregado in datos.get("meses", {}).items():
+            (con_dias,) = self._conexion.execute(
+                "SELECT COUNT(*) FROM dias WHERE dia LIKE ?", (f"{mes}-%",)
+            ).fetchone()
+            if not con_dias:
+                self._conexion.execute(
+                    "INSERT OR IGNORE INTO meses (mes, pausas, dias) "
+                    "VALUES (?, ?, ?)",
+                    (mes, int(agregado.get("pausas", 0)), int(agregado.get("dias", 0))),
+                )
+        for semana, pausas in datos.get("semanas", {}).items():
+            anio, numero = semana.split("-W")
+            lunes = date.fromisocalendar(int(anio), int(numero), 1)
+            (con_dias,) = self._conexion.execute(
+                "SELECT COUNT(*) FROM dias WHERE dia BETWEEN ? AND ?",
+                (lunes.isoformat(), (lunes + timedelta(days=6)).isoformat()),
+            ).fetchone()
+            if not con_dias:
+                self._conexion.execute(
+                    "INSERT OR IGNORE INTO semanas (semana, pausas) VALUES (?, ?)",
+                    (semana, int(pausas)),
+                )
+
+    # ── Consolidación ──────────────────────────────────────────
+
+    def _consolidar(self, hoy: date) -> None:
+        """Pasa a ``meses`` y ``semanas`` los días anteriores a la retención."""
+        limite = limite_consolidacion(self._retencion_dias, hoy).isoformat()
+        with self._conexion:
+            # Cerrojo de escritura desde la lectura: otra instancia que
+            # consolide a la vez esperará y no encontrará nada que mover
+            self._conexion.execute("BEGIN IMMEDIATE")
+            antiguos = {
+                "dias": {
+                    dia: {"pausas": pausas}
+                    for dia, pausas in self._conexion.execute(
+                        "SELECT dia, pausas FROM dias WHERE dia < ?", (limite,)
+                    )
+                }
+            }
+            if not consolidar(antiguos, self._retencion_dias, hoy):
+                return
+            self._conexion.executemany(
+                "INSERT INTO meses (mes, pausas, dias) VALUES (?, ?, ?) "
+                "ON CONFLICT (mes) DO UPDATE SET "
+                "pausas = pausas + excluded.pausas, dias = dias | excluded.dias",
+                [
+                    (mes, agregado["pausas"], agregado["dias"])
+                    for mes, agregado in antiguos["meses"].items()
+                ],
+            )
+            self._conexion.executemany(
+                "INSERT INTO semanas (semana, pausas) VALUES (?, ?) "
+                "ON CONFLICT (semana) DO UPDATE SET "
+                "pausas = pausas + excluded.pausas",
+                antiguos["semanas"].items(),
+            )
+            self._conexion.execute("DELETE FROM pausas WHERE dia < ?", (limite,))
+            self._conexion.execute("DELETE FROM dias WHERE dia < ?", (limite,))
+
+    # ── Interfaz de almacén ────────────────────────────────────
+
+    def cargar(self) -> dict:
+        """Consolida lo antiguo y carga el detalle de la retención."""
+        hoy = date.today()
+        self._consolidar(hoy)
+        filas = self._conexion.execute(
+            "SELECT dia, pausas, primera, ultima FROM dias WHERE dia >= ?",
+            (limite_consolidacion(self._retencion_dias, hoy).isoformat(),),
+        )
+        self._datos = {
+            "dias": {
+                dia: {"pausas": pausas, "primera": primera, "ultima": ultima}
+                for dia, pausas, primera, ultima in filas
+            }
+        }
+        meses = self._conexion.execute("SELECT mes, pausas, dias FROM meses")
+        self._datos["meses"] = {
+            mes: {"pausas": pausas, "dias": dias} for mes, pausas, dias in meses
+        }
+        self._datos["semanas"] = dict(
+            self._conexion.execute("SELECT semana, pausas FROM semanas")
+        )
+        return self._datos
+
+    def guardar(self, datos: dict) -> None:
+        """Cada pausa se confirma al registrarla: no hay nada pendiente."""
+        self._conexion.commit()
+
+    def registrar(self, ahora: datetime) -> bool:
+        """Inserta la pausa y refresca en memoria la fila del día.
+
+        Devuelve True si la fila incluía pausas de otras instancias.
+        """
+        dia = ahora.date().isoformat()
+        hora = ahora.strftime("%H:%M:%S")
+        with self._conexion:
+            self._conexion.execute(
+                "INSERT INTO pausas (marca, dia) VALUES (?, ?)",
+                (ahora.timestamp(), dia),
+            )
+            self._conexion.execute(
+                "INSERT INTO dias (dia, pausas, primera, ultima) "
+                "VALUES (?, 1, ?, ?) "
+                "ON CONFLICT (dia) DO UPDATE SET "
+                "pausas = pausas + 1, ultima = excluded.ultima",
+                (dia, hora, hora),
+            )
+            pausas, primera, ultima = self._conexion.execute(
+                "SELECT pausas, primera, ultima FROM dias WHERE dia = ?", (dia,)
+            ).fetchone()
+        dias = self._datos.setdefault("dias", {})
+        previas = dias.get(dia, {}).get("pausas", 0)
+        entrada = dias.setdefault(dia, {})
+        entrada.update(pausas=pausas, primera=primera, ultima=ultima)
+        return pausas != previas + 1
+
+    def pausas_por_dia(self, desde: date, hasta: date) -> dict[str, int] | None:
+        if self._antes_del_detalle(desde):
+            return None
+        filas = self._conexion.execute(
+            "SELECT dia, pausas FROM dias WHERE dia BETWEEN ? AND ? ORDER BY dia",
+            (desde.isoformat(), hasta.isoformat()),
+        )
+        return dict(filas)
+
+    def pausas_entre(self, inicio: datetime, fin: datetime) -> int | None:
+        if self._antes_del_detalle(inicio.date()):
+            return None
+        (total,) = self._conexion.execute(
+            "SELECT COUNT(*) FROM pausas WHERE marca BETWEEN ? AND ?",
+            (inicio.timestamp(), fin.timestamp()),
+        ).fetchone()
+        return total
+
+    def _antes_del_detalle(self, dia: date) -> bool:
+        """True si *dia* cae en los meses importados ya consolidados."""
+        limite = inicio_detalle(self._datos)
+        return limite is not None and dia < limite
+
+    def cerrar(self) -> None:
+        try:
+            self._conexion.close()
+        except Exception:
+            pass
@@ -0,0 +1,97 @@
+"""Estado publicado para barras de escritorio (polybar, waybar, i3status…).
+
+La instancia en marcha mantiene ``panel.estado`` proyectado en memoria
+(``mmap``) y lo reescribe solo cuando cambia algo: iniciar, detener,
+cambio de fase o pausa registrada. Es un registro de texto de
+``TAMANO_REGISTRO`` bytes con campos separados por espacios y ancho fijo,
+así que se puede leer sin Python ni hablar con la aplicación::
+
+    ELP1 <secuencia> <en marcha 0|1> <fase T|D|S> <vence epoch>
+         <AAAAMMDD> <pausas hoy> <racha>
+
+(todo en una línea). La fase es ``T`` (trabajo Pomodoro), ``D``
+(descanso) o ``S`` (temporizador simple). La secuencia aumenta en cada
+escritura: un lector que lea dos veces el mismo registro sabe que no lo
+pilló a medias. Las pausas de hoy son las del día indicado; otro día
+cuentan como 0.
+
+``estado_panel.sh`` en la raíz del proyecto es el lector.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from datetime import date
+from pathlib import Path
+
+MAGIA = "ELP1"
+TAMANO_REGISTRO = 64
+
+_SECUENCIA_MAXIMA = 10**10
+
+
+def formatear(
+    secuencia: int,
+    en_marcha: bool,
+    fase: str,
+    vence: int,
+    dia: date,
+    pausas_hoy: int,
+    racha: int,
+) -> bytes:
+    linea = (
+        f"{MAGIA} {secuencia:<10d} {int(en_marcha)} {fase} {vence:<10d} "
+        f"{dia:%Y%m%d} {min(pausas_hoy, 99999):<5d} {min(racha, 99999):<5d}"
+    )
+    return linea.ljust(TAMANO_REGISTRO - 1).encode("ascii") + b"\n"
+
+
+class EstadoPanel:
+    """Publica el estado del temporizador en *ruta* proyectada en memoria."""
+
+    def __init__(self, ruta: Path) -> None:
+        self._ruta = ruta
+        self._mapa: mmap.mmap | None = None
+        self._secuencia = 0
+        self._ultimo: tuple | None = None
+
+    def _abrir(self) -> mmap.mmap:
+        if self._mapa is None:
+            self._ruta.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self._ruta, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                os.ftruncate(fd, TAMANO_REGISTRO)
+                self._mapa = mmap.mmap(fd, TAMANO_REGISTRO)
+            finally:
+                os.close(fd)
+        return self._mapa
+
+    def publicar(
+        self,
+        en_marcha: bool,
+        fase: str,
+        vence: float,
+        pausas_hoy: int,
+        racha: int,
+    ) -> None:
+        """Reescribe el registro si algún campo cambió."""
+        campos = (en_marcha, fase, int(vence), date.today(), pausas_hoy, racha)
+        if campos == self._ultimo:
+            return
+        try:
+            mapa = self._abrir()
+            self._secuencia = (self._secuencia + 1) % _SECUENCIA_MAXIMA
+            mapa[:] = formatear(self._secuencia, *campos)
+            self._ultimo = campos
+        except (OSError, ValueError) as e:
+            print(f"Aviso: no se pudo publicar el estado para el panel: {e}")
+
+    def cerrar(self) -> None:
+        """Marca la instancia como parada y suelta la proyección."""
+        if self._ultimo is not None:
+            _, fase, _, _, pausas_hoy, racha = self._ultimo
+            self.publicar(False, fase, 0, pausas_hoy, racha)
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
@@ -0,0 +1,294 @@
+"""Agregado de estadísticas de muchos equipos por grupos de trabajo.
+
+Lee los archivos de estadísticas que los usuarios suben (o que se
+recogen de sus ``~/.config/estira-las-piernas``) en un árbol::
+
+    RAIZ/<equipo>/<usuario>/estadisticas.json      (y estadisticas.diario)
+    RAIZ/<equipo>/<usuario>/estadisticas.sqlite3   (motor SQLite)
+
+y calcula, por equipo, las pausas y los usuarios activos de cada día y
+de cada semana ISO. Un directorio de usuario directamente bajo ``RAIZ``
+cuenta como equipo ``SIN_EQUIPO``.
+
+Cada usuario se resume por separado en un proceso del grupo
+(``ProcessPoolExecutor``) y el resumen se guarda en una caché junto con
+el tamaño y la fecha de modificación de sus archivos: en la siguiente
+pasada solo se vuelven a leer los usuarios cuyos archivos cambiaron.
+Con pocos usuarios que leer no merece la pena arrancar procesos y se
+leen en este mismo.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+from .constantes import (
+    MINIMO_USUARIOS_POR_PROCESO,
+    RUTA_ARCHIVO_ESTADISTICAS,
+    RUTA_BD_ESTADISTICAS,
+    RUTA_DIARIO_ESTADISTICAS,
+)
+from .estadisticas import clave_semana
+
+SIN_EQUIPO = "(sin equipo)"
+
+_FORMATO_CACHE = 1
+_ARCHIVOS = (
+    RUTA_ARCHIVO_ESTADISTICAS.name,
+    RUTA_DIARIO_ESTADISTICAS.name,
+    RUTA_BD_ESTADISTICAS.name,
+    RUTA_BD_ESTADISTICAS.name + "-wal",
+)
+
+
+# ── Lectura de un usuario ──────────────────────────────────────
+
+
+def _firma(directorio: Path) -> list:
+    """Tamaño y fecha de modificación de cada archivo de estadísticas."""
+    firma = []
+    for nombre in _ARCHIVOS:
+        try:
+            st = os.stat(directorio / nombre)
+        except FileNotFoundError:
+            firma.append(None)
+            continue
+        firma.append([st.st_size, st.st_mtime_ns])
+    return firma
+
+
+def _leer_json(directorio: Path) -> dict:
+    try:
+        datos = json.loads(
+            (directorio / RUTA_ARCHIVO_ESTADISTICAS.name).read_text(encoding="utf-8")
+        )
+    except FileNotFoundError:
+        datos = {}
+    dias = {
+        dia: entrada.get("pausas", 0)
+        for dia, entrada in datos.get("dias", {}).items()
+    }
+    try:
+        with open(directorio / RUTA_DIARIO_ESTADISTICAS.name, "rb") as f:
+            for linea in f:
+                try:
+                    dia = json.loads(linea)["d"]
+                except Exception:
+                    # Línea truncada por un cierre inesperado
+                    continue
+                dias[dia] = dias.get(dia, 0) + 1
+    except FileNotFoundError:
+        pass
+    mascaras = {
+        mes: agregado.get("dias", 0) for mes, agregado in datos.get("meses", {}).items()
+    }
+    return {
+        "dias": dias,
+        "semanas": datos.get("semanas", {}),
+        "activos": _dias_activos(mascaras),
+    }
+
+
+def _leer_sqlite(ruta: Path) -> dict:
+    conexion = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True)
+    try:
+        filas = conexion.execute("SELECT dia, pausas FROM dias").fetchall()
+        semanas = conexion.execute("SELECT semana, pausas FROM semanas").fetchall()
+        mascaras = conexion.execute("SELECT mes, dias FROM meses").fetchall()
+    finally:
+        conexion.close()
+    return {
+        "dias": dict(filas),
+        "semanas": dict(semanas),
+        "activos": _dias_activos(dict(mascaras)),
+    }
+
+
+def _dias_activos(mascaras: dict[str, int]) -> list[str]:
+    """Días ISO con pausas según las máscaras de los meses consolidados."""
+    return [
+        f"{mes}-{bit + 1:02d}"
+        for mes, mascara in mascaras.items()
+        for bit in range(31)
+        if mascara >> bit & 1
+    ]
+
+
+def resumir_usuario(directorio: str) -> dict:
+    """Pausas por día de un usuario, más lo consolidado por meses.
+
+    ``dias`` son los días con detalle, ``semanas`` las pausas de semanas
+    ya consolidadas y ``activos`` los días consolidados con pausas. Si la
+    base SQLite existe manda sobre el JSON, porque al crearse lo importó.
+    """
+    ruta = Path(directorio)
+    try:
+        bd = ruta / RUTA_BD_ESTADISTICAS.name
+        if bd.exists():
+            return _leer_sqlite(bd)
+        return _leer_json(ruta)
+    except (OSError, ValueError, AttributeError, sqlite3.Error) as e:
+        print(f"Aviso: no se pudieron leer las estadísticas de {directorio}: {e}")
+        return {"dias": {}, "semanas": {}, "activos": []}
+
+
+# ── Recorrido y caché ──────────────────────────────────────────
+
+
+def buscar_usuarios(raiz: Path) -> dict[str, tuple[Path, list]]:
+    """``equipo/usuario`` → (directorio, firma) de cada usuario con estadísticas."""
+    usuarios: dict[str, tuple[Path, list]] = {}
+    for primero in sorted(os.scandir(raiz), key=lambda e: e.name):
+        if not primero.is_dir() or primero.name.startswith("."):
+            continue
+        directorio = Path(primero.path)
+        firma = _firma(directorio)
+        if any(firma[:3]):
+            usuarios[f"{SIN_EQUIPO}/{primero.name}"] = (directorio, firma)
+            continue
+        for segundo in sorted(os.scandir(directorio), key=lambda e: e.name):
+            if not segundo.is_dir():
+                continue
+            firma = _firma(Path(segundo.path))
+            if any(firma[:3]):
+                usuarios[f"{primero.name}/{segundo.name}"] = (
+                    Path(segundo.path),
+                    firma,
+                )
+    return usuarios
+
+
+def _leer_cache(ruta: Path) -> dict:
+    try:
+        cache = json.loads(ruta.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+    if cache.get("formato") != _FORMATO_CACHE:
+        return {}
+    return cache.get("usuarios", {})
+
+
+def _guardar_json(ruta: Path, datos: dict) -> None:
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    # json.dumps usa el codificador en C; json.dump escribe por trozos en Python
+    temporal.write_text(
+        json.dumps(datos, ensure_ascii=False, separators=(",", ":")),
+        encoding="utf-8",
+    )
+    os.replace(temporal, ruta)
+
+
+def actualizar(
+    raiz: Path, ruta_cache: Path, procesos: int | None = None
+) -> tuple[dict[str, dict], int]:
+    """Resúmenes de todos los usuarios; devuelve también cuántos se releyeron.
+
+    Los usuarios sin cambios salen de la caché; los nuevos o modificados
+    se leen en paralelo. Los que ya no están se olvidan.
+    """
+    anteriores = _leer_cache(ruta_cache)
+    usuarios: dict[str, dict] = {}
+    pendientes: list[tuple[str, list, Path]] = []
+    for clave, (directorio, firma) in buscar_usuarios(raiz).items():
+        previo = anteriores.get(clave)
+        if previo is not None and previo.get("firma") == firma:
+            usuarios[clave] = previo
+        else:
+            pendientes.append((clave, firma, directorio))
+
+    rutas = [str(directorio) for _, _, directorio in pendientes]
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1 and len(rutas) >= 2 * MINIMO_USUARIOS_POR_PROCESO:
+        procesos = min(procesos, len(rutas) // MINIMO_USUARIOS_POR_PROCESO)
+        with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+            resumenes = list(
+                ejecutor.map(
+                    resumir_usuario,
+                    rutas,
+                    chunksize=max(1, len(rutas) // (procesos * 4)),
+                )
+            )
+    else:
+        resumenes = [resumir_usuario(ruta) for ruta in rutas]
+
+    for (clave, firma, _), resumen in zip(pendientes, resumenes):
+        resumen["firma"] = firma
+        usuarios[clave] = resumen
+    if pendientes or len(usuarios) != len(anteriores):
+        _guardar_json(ruta_cache, {"formato": _FORMATO_CACHE, "usuarios": usuarios})
+    return usuarios, len(pendientes)
+
+
+# ── Agregado por equipo ────────────────────────────────────────
+
+
+@lru_cache(maxsize=None)
+def _semana(iso: str) -> str:
+    return clave_semana(date.fromisoformat(iso))
+
+
+def agregar(usuarios: dict[str, dict]) -> dict[str, dict]:
+    """Pausas y usuarios activos por equipo, por día y por semana ISO.
+
+    Los días consolidados cuentan como activos pero no aportan pausas al
+    detalle diario (solo se conserva su total semanal).
+    """
+    equipos: dict[str, dict] = {}
+    for clave, resumen in usuarios.items():
+        equipo = clave.split("/", 1)[0]
+        if equipo not in equipos:
+            equipos[equipo] = {
+                "usuarios": 0,
+                "pausas_dia": Counter(),
+                "activos_dia": Counter(),
+                "pausas_semana": Counter(),
+                "activos_semana": Counter(),
+            }
+        grupo = equipos[equipo]
+        grupo["usuarios"] += 1
+
+        dias = {dia: pausas for dia, pausas in resumen["dias"].items() if pausas}
+        grupo["pausas_dia"].update(dias)
+        grupo["activos_dia"].update(dias.keys())
+        grupo["activos_dia"].update(resumen["activos"])
+
+        semanas: Counter = Counter(resumen["semanas"])
+        for dia, pausas in dias.items():
+            semanas[_semana(dia)] += pausas
+        activas = {semana for semana, pausas in semanas.items() if pausas}
+        activas.update(map(_semana, resumen["activos"]))
+        grupo["pausas_semana"].update(semanas)
+        grupo["activos_semana"].update(activas)
+
+    return {
+        equipo: {
+            "usuarios": grupo["usuarios"],
+            "diario": {
+                dia: {
+                    "pausas": grupo["pausas_dia"][dia],
+                    "usuarios_activos": activos,
+                }
+                for dia, activos in sorted(grupo["activos_dia"].items())
+            },
+            "semanal": {
+                semana: {
+                    "pausas": grupo["pausas_semana"][semana],
+                    "usuarios_activos": activos,
+                }
+                for semana, activos in sorted(grupo["activos_semana"].items())
+            },
+        }
+        for equipo, grupo in sorted(equipos.items())
+    }
+
+
+def escribir(ruta: Path, equipos: dict[str, dict], generado: str) -> None:
+    _guardar_json(ruta, {"formato": 1, "generado": generado, "equipos": equipos})
@@ -0,0 +1,310 @@
+"""Historial de eventos: cada aviso y cada descanso Pomodoro.
+
+Cada evento guarda tipo, marca de tiempo (segundos epoch), duración en
+segundos y resultado. En disco se guarda en columnas y las marcas se
+codifican como diferencias con el evento anterior:
+
+- ``historial.bin``: cabecera y segmentos sellados de
+  ``EVENTOS_POR_SEGMENTO`` eventos, cada uno con sus columnas
+  (diferencias ``uint32``, duraciones ``uint16``, tipos y resultados
+  ``uint8``)
+  comprimidas con zlib. Solo se anexan.
+- ``historial.cola``: el segmento abierto, sin comprimir. Cada evento es
+  un registro de 12 bytes con su marca absoluta anexado al final; al
+  llenarse se sella en ``historial.bin`` y la cola vuelve a empezar.
+
+La cabecera de la cola indica cuántos eventos había sellados cuando se
+creó, así que un cierre entre sellar y vaciar la cola no duplica nada, y
+un segmento a medio escribir se descarta (sus eventos siguen en la
+cola). Diez años de uso intenso caben en unos cientos de KB y se cargan
+en milisegundos.
+
+Varias instancias (p.ej. equipos con la configuración en NFS) pueden
+anotar a la vez: toda lectura y escritura se hace con el cerrojo de
+``cerrojo``, y antes de anotar se recarga el historial si otro proceso
+cambió los archivos. Las diferencias entre marcas solo se calculan al
+sellar, a partir de lo que hay en disco.
+
+En memoria el historial son cuatro ``array`` paralelos (``marcas``,
+``duraciones``, ``tipos``, ``resultados``) listos para recorrer por
+columnas.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from pathlib import Path
+
+from .cerrojo import cerrojo_estadisticas
+from .constantes import (
+    EVENTOS_POR_SEGMENTO,
+    RUTA_COLA_HISTORIAL,
+    RUTA_HISTORIAL,
+)
+
+TIPO_AVISO = 0
+TIPO_DESCANSO = 1
+
+RESULTADO_COMPLETADO = 0
+RESULTADO_SALTADO = 1
+RESULTADO_CANCELADO = 2
+
+_MAGIA = b"ELPH"
+_VERSION = 1
+_CABECERA = struct.Struct("<4sH")
+_CABECERA_COLA = struct.Struct("<4sHQ")  # magia, versión, eventos sellados
+_SEGMENTO = struct.Struct("<II")  # eventos, bytes comprimidos
+_REGISTRO = struct.Struct("<IHBB")  # diferencia, duración, tipo, resultado
+_REGISTRO_COLA = struct.Struct("<qHBB")  # marca, duración, tipo, resultado
+
+_DURACION_MAXIMA = 0xFFFF
+_DIFERENCIA_MAXIMA = 0xFFFFFFFF
+
+
+def _a_disco(columna: array) -> bytes:
+    """Bytes little-endian de *columna*, sea cual sea la plataforma."""
+    if sys.byteorder == "big" and columna.itemsize > 1:
+        columna = array(columna.typecode, columna)
+        columna.byteswap()
+    return columna.tobytes()
+
+
+def _de_disco(tipo: str, datos: bytes) -> array:
+    columna = array(tipo)
+    columna.frombytes(datos)
+    if sys.byteorder == "big" and columna.itemsize > 1:
+        columna.byteswap()
+    return columna
+
+
+def _firma(ruta: Path) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class Historial:
+    """Eventos en columnas; se carga entero al crearse."""
+
+    def __init__(
+        self, ruta: Path = RUTA_HISTORIAL, ruta_cola: Path = RUTA_COLA_HISTORIAL
+    ) -> None:
+        self._ruta = ruta
+        self._ruta_cola = ruta_cola
+        self.marcas = array("q")
+        self.duraciones = array("H")
+        self.tipos = array("B")
+        self.resultados = array("B")
+        self._sellados = 0
+        self._en_cola = 0
+        self._fd_cola: int | None = None
+        # Firmas de historial.bin y de la cola tras la última lectura o escritura
+        self._firmas: tuple = (None, None)
+        with cerrojo_estadisticas():
+            self._cargar()
+
+    def __len__(self) -> int:
+        return len(self.marcas)
+
+    # ── Carga ──────────────────────────────────────────────────
+
+    def _anadir_columnas(
+        self, diferencias: array, duraciones: array, tipos: array, resultados: array
+    ) -> None:
+        previa = self.marcas[-1] if self.marcas else 0
+        marcas = accumulate(diferencias, initial=previa)
+        next(marcas)
+        self.marcas.extend(marcas)
+        self.duraciones.extend(duraciones)
+        self.tipos.extend(tipos)
+        self.resultados.extend(resultados)
+
+    def _cargar(self) -> None:
+        """Lee de cero ambos archivos; hay que tener el cerrojo."""
+        self.cerrar()
+        for columna in (self.marcas, self.duraciones, self.tipos, self.resultados):
+            del columna[:]
+        self._en_cola = 0
+        try:
+            datos = self._ruta.read_bytes()
+        except FileNotFoundError:
+            datos = b""
+        valido = self._cargar_segmentos(datos)
+        if valido < len(datos):
+            # Segmento truncado por un cierre inesperado: sus eventos
+            # siguen en la cola, así que basta con recortar
+            print("Aviso: historial dañado; se descarta el último segmento.")
+            with open(self._ruta, "r+b") as f:
+                f.truncate(valido)
+        self._sellados = len(self.marcas)
+        self._cargar_cola()
+        self._firmas = (_firma(self._ruta), _firma(self._ruta_cola))
+
+    def _al_dia(self) -> None:
+        """Recarga si otro proceso anotó o selló desde nuestra última vez."""
+        if (_firma(self._ruta), _firma(self._ruta_cola)) != self._firmas:
+            self._cargar()
+
+    def _cargar_segmentos(self, datos: bytes) -> int:
+        """Aplica los segmentos válidos; devuelve hasta qué byte lo son."""
+        if not datos:
+            return 0
+        if len(datos) < _CABECERA.size:
+            return 0
+        magia, version = _CABECERA.unpack_from(datos)
+        if magia != _MAGIA or version != _VERSION:
+            return 0
+        posicion = _CABECERA.size
+        # Se juntan las columnas de todos los segmentos y se añaden de una vez
+        partes: list[list[bytes]] = [[], [], [], []]
+        while posicion + _SEGMENTO.size <= len(datos):
+            eventos, tamano = _SEGMENTO.unpack_from(datos, posicion)
+            inicio = posicion + _SEGMENTO.size
+            try:
+                columnas = zlib.decompress(datos[inicio : inicio + tamano])
+            except zlib.error:
+                break
+            if len(columnas) != eventos * _REGISTRO.size:
+                break
+            cortes = (0, eventos * 4, eventos * 6, eventos * 7, eventos * 8)
+            for parte, desde, hasta in zip(partes, cortes, cortes[1:]):
+                parte.append(columnas[desde:hasta])
+            posicion = inicio + tamano
+        self._anadir_columnas(
+            _de_disco("I", b"".join(partes[0])),
+            _de_disco("H", b"".join(partes[1])),
+            array("B", b"".join(partes[2])),
+            array("B", b"".join(partes[3])),
+        )
+        return posicion
+
+    def _cargar_cola(self) -> None:
+        try:
+            datos = self._ruta_cola.read_bytes()
+        except FileNotFoundError:
+            return
+        if len(datos) < _CABECERA_COLA.size:
+            return
+        magia, version, sellados = _CABECERA_COLA.unpack_from(datos)
+        if magia != _MAGIA or version != _VERSION:
+            return
+        cuerpo = datos[_CABECERA_COLA.size :]
+        registros = len(cuerpo) // _REGISTRO_COLA.size
+        # Los primeros ya se sellaron si el proceso murió antes de vaciarla
+        omitir = max(0, self._sellados - sellados)
+        filas = _REGISTRO_COLA.iter_unpack(
+            cuerpo[omitir * _REGISTRO_COLA.size : registros * _REGISTRO_COLA.size]
+        )
+        columnas = list(zip(*filas)) or [(), (), (), ()]
+        for columna, valores in zip(
+            (self.marcas, self.duraciones, self.tipos, self.resultados), columnas
+        ):
+            columna.extend(valores)
+        self._en_cola = max(0, registros - omitir)
+        if omitir or len(cuerpo) % _REGISTRO_COLA.size:
+            self._reescribir_cola()
+
+    # ── Escritura ──────────────────────────────────────────────
+
+    def anotar(
+        self,
+        tipo: int,
+        marca: float,
+        duracion: float = 0,
+        resultado: int = RESULTADO_COMPLETADO,
+    ) -> None:
+        """Añade un evento que ocurrió en *marca* (segundos epoch)."""
+        duracion = min(max(0, int(duracion)), _DURACION_MAXIMA)
+        try:
+            with cerrojo_estadisticas():
+                self._al_dia()
+                # Con el reloj hacia atrás (o el de otro equipo adelantado)
+                # el evento queda pegado al último que hay en disco
+                marca = max(int(marca), self.marcas[-1] if self.marcas else 0)
+                if self._en_cola >= EVENTOS_POR_SEGMENTO:
+                    self._sellar()
+                fd = self._abrir_cola()
+                os.write(fd, _REGISTRO_COLA.pack(marca, duracion, tipo, resultado))
+                self.marcas.append(marca)
+                self.duraciones.append(duracion)
+                self.tipos.append(tipo)
+                self.resultados.append(resultado)
+                self._en_cola += 1
+                self._firmas = (_firma(self._ruta), _firma(self._ruta_cola))
+        except OSError as e:
+            print(f"Aviso: no se pudo guardar el historial: {e}")
+
+    def _abrir_cola(self) -> int:
+        if self._fd_cola is None:
+            self._ruta_cola.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(
+                self._ruta_cola, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600
+            )
+            if os.fstat(fd).st_size == 0:
+                os.write(
+                    fd, _CABECERA_COLA.pack(_MAGIA, _VERSION, self._sellados)
+                )
+            self._fd_cola = fd
+        return self._fd_cola
+
+    def _reescribir_cola(self) -> None:
+        """Deja en la cola solo los eventos no sellados que hay en memoria."""
+        self.cerrar()
+        inicio = self._sellados
+        cuerpo = bytearray(_CABECERA_COLA.pack(_MAGIA, _VERSION, inicio))
+        for i in range(inicio, len(self.marcas)):
+            cuerpo += _REGISTRO_COLA.pack(
+                self.marcas[i], self.duraciones[i], self.tipos[i], self.resultados[i]
+            )
+        temporal = self._ruta_cola.with_name(self._ruta_cola.name + ".tmp")
+        temporal.write_bytes(cuerpo)
+        os.replace(temporal, self._ruta_cola)
+
+    def _sellar(self) -> None:
+        """Comprime los eventos de la cola como un segmento nuevo.
+
+        Se llama con el cerrojo y el historial al día, así que las
+        diferencias salen de lo que hay en disco.
+        """
+        inicio, fin = self._sellados, self._sellados + self._en_cola
+        previa = self.marcas[inicio - 1] if inicio else 0
+        marcas = self.marcas[inicio:fin]
+        diferencias = array(
+            "I",
+            (
+                min(max(0, m - p), _DIFERENCIA_MAXIMA)
+                for m, p in zip(marcas, [previa, *marcas])
+            ),
+        )
+        columnas = zlib.compress(
+            _a_disco(diferencias)
+            + _a_disco(self.duraciones[inicio:fin])
+            + self.tipos[inicio:fin].tobytes()
+            + self.resultados[inicio:fin].tobytes(),
+            9,
+        )
+        self._ruta.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._ruta, "ab") as f:
+            if f.tell() == 0:
+                f.write(_CABECERA.pack(_MAGIA, _VERSION))
+            f.write(_SEGMENTO.pack(fin - inicio, len(columnas)) + columnas)
+            f.flush()
+            os.fsync(f.fileno())
+        self._sellados = fin
+        self._en_cola = 0
+        self.cerrar()
+        temporal = self._ruta_cola.with_name(self._ruta_cola.name + ".tmp")
+        temporal.write_bytes(_CABECERA_COLA.pack(_MAGIA, _VERSION, fin))
+        os.replace(temporal, self._ruta_cola)
+
+    def cerrar(self) -> None:
+        if self._fd_cola is not None:
+            os.close(self._fd_cola)
+            self._fd_cola = None
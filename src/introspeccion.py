@@ -0,0 +1,155 @@
+"""Carga diferida de los módulos de GObject Introspection.
+
+Importar ``gi`` y resolver ``gi.require_version`` es lo más caro del
+arranque, así que nada se importa hasta que la bandeja o los atajos se
+ponen en marcha. Cada backend declara los espacios de nombres que
+necesita y se carga una sola vez por proceso con ``cargar``.
+
+El resultado de cada sondeo se guarda en ``RUTA_CACHE_GI`` junto con una
+huella de los typelibs instalados (mtimes de los directorios
+``girepository-1.0``, de los typelibs usados y del paquete ``gi``). Con
+la huella intacta, ``disponible`` responde sin importar nada; al
+instalar o quitar un paquete la huella cambia y se vuelve a sondear.
+"""
+
+from __future__ import annotations
+
+import glob
+import importlib.util
+import json
+import os
+import sys
+from typing import Any
+
+from .constantes import RUTA_CACHE_GI
+
+# Espacios de nombres (y versión) que necesita cada backend
+BACKENDS: dict[str, tuple[tuple[str, str | None], ...]] = {
+    "bandeja": (("AppIndicator3", "0.1"), ("Gtk", "3.0")),
+    "atajos": (("Keybinder", "3.0"),),
+    "glib": (("GLib", None),),
+    "gio": (("Gio", "2.0"), ("GLib", None)),
+}
+
+_DIRECTORIOS_TYPELIB = (
+    "/usr/lib/girepository-1.0",
+    "/usr/lib64/girepository-1.0",
+    "/usr/local/lib/girepository-1.0",
+    "/usr/lib/*/girepository-1.0",
+)
+
+# Backends ya resueltos en este proceso: nombre → módulos o None
+_cargados: dict[str, dict[str, Any] | None] = {}
+_cache: dict[str, bool] | None = None
+_huella: list | None = None
+
+
+# ── Huella de los typelibs ─────────────────────────────────────
+
+def _directorios_typelib() -> list[str]:
+    rutas = os.environ.get("GI_TYPELIB_PATH", "").split(os.pathsep)
+    for patron in _DIRECTORIOS_TYPELIB:
+        rutas.extend(sorted(glob.glob(patron)))
+    return [r for r in dict.fromkeys(rutas) if r and os.path.isdir(r)]
+
+
+def _mtime(ruta: str) -> int | None:
+    try:
+        return os.stat(ruta).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _calcular_huella() -> list:
+    global _huella
+    if _huella is None:
+        directorios = _directorios_typelib()
+        huella: list = [sys.version]
+        for directorio in directorios:
+            huella.append([directorio, _mtime(directorio)])
+            for espacios in BACKENDS.values():
+                for espacio, version in espacios:
+                    typelib = f"{espacio}-{version}.typelib" if version else ""
+                    ruta = os.path.join(directorio, typelib)
+                    if typelib and os.path.exists(ruta):
+                        huella.append([ruta, _mtime(ruta)])
+        try:
+            especificacion = importlib.util.find_spec("gi")
+        except (ImportError, ValueError):
+            especificacion = None
+        origen = especificacion.origin if especificacion else None
+        huella.append([origen, _mtime(origen) if origen else None])
+        _huella = huella
+    return _huella
+
+
+# ── Caché en disco ─────────────────────────────────────────────
+
+def _leer_cache() -> dict[str, bool]:
+    global _cache
+    if _cache is None:
+        _cache = {}
+        try:
+            datos = json.loads(RUTA_CACHE_GI.read_text(encoding="utf-8"))
+            if datos.get("huella") == _calcular_huella():
+                _cache = {
+                    nombre: bool(valor)
+                    for nombre, valor in datos.get("backends", {}).items()
+                }
+        except Exception:
+            pass
+    return _cache
+
+
+def _guardar_cache(nombre: str, valor: bool) -> None:
+    cache = _leer_cache()
+    if cache.get(nombre) == valor:
+        return
+    cache[nombre] = valor
+    datos = {"huella": _calcular_huella(), "backends": cache}
+    try:
+        RUTA_CACHE_GI.parent.mkdir(parents=True, exist_ok=True)
+        temporal = RUTA_CACHE_GI.with_suffix(".json.tmp")
+        temporal.write_text(json.dumps(datos), encoding="utf-8")
+        os.replace(temporal, RUTA_CACHE_GI)
+    except OSError as e:
+        print(f"Aviso: no se pudo guardar la caché de GI: {e}")
+
+
+# ── Carga ──────────────────────────────────────────────────────
+
+def _importar(nombre: str) -> dict[str, Any] | None:
+    try:
+        import gi
+
+        for espacio, version in BACKENDS[nombre]:
+            if version is not None:
+                gi.require_version(espacio, version)
+        return {
+            espacio: importlib.import_module(f"gi.repository.{espacio}")
+            for espacio, _ in BACKENDS[nombre]
+        }
+    except Exception:
+        return None
+
+
+def cargar(nombre: str) -> dict[str, Any] | None:
+    """Importa los módulos de *nombre* o devuelve None si no están."""
+    if nombre not in _cargados:
+        if _leer_cache().get(nombre) is False:
+            # Sondeo anterior fallido con los mismos typelibs
+            _cargados[nombre] = None
+        else:
+            _cargados[nombre] = _importar(nombre)
+            _guardar_cache(nombre, _cargados[nombre] is not None)
+    return _cargados[nombre]
+
+
+def disponible(nombre: str) -> bool:
+    """Si *nombre* puede cargarse; con caché válida no importa nada."""
+    if nombre in _cargados:
+        return _cargados[nombre] is not None
+    en_cache = _leer_cache().get(nombre)
+    if en_cache is not None:
+        return en_cache
+    return cargar(nombre) is not None
@@ -0,0 +1,386 @@
+"""Motor de recordatorios independiente de la interfaz.
+
+Contiene la lógica del temporizador simple y del modo Pomodoro, las
+notificaciones, los sonidos, el registro de pausas y los recordatorios
+adicionales. No importa Tk: funciona igual bajo la ventana principal que
+en el modo ``--headless``. La interfaz, si existe, se engancha a través
+de los atributos ``al_*``.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from .constantes import (
+    INTERVALO_MAXIMO_MINUTOS,
+    INTERVALO_MINIMO_MINUTOS,
+    INTERVALO_PREDETERMINADO_MINUTOS,
+    POLITICA_RECUPERACION_PREDETERMINADA,
+    POMODORO_DESCANSO_PREDETERMINADO,
+    POMODORO_TRABAJO_PREDETERMINADO,
+    RUTA_ESTADO_PANEL,
+    RUTA_PUNTO_CONTROL,
+)
+from . import notificaciones
+from . import perfil
+from . import sonido
+from .estadisticas import Estadisticas
+from .estado_panel import EstadoPanel
+from .historial import RESULTADO_CANCELADO, RESULTADO_COMPLETADO, RESULTADO_SALTADO
+from .planificador import POLITICA_SALTAR, Planificador
+from .punto_control import EstadoTemporizador, PuntoControl
+from .recordatorios import GestorRecordatorios
+from .sincronizacion import Sincronizador
+
+CLAVE_RECORDATORIO = "recordatorio"
+# Clave de notificación compartida por los recordatorios adicionales
+CLAVE_ADICIONALES = "adicionales"
+
+
+def _nada() -> None:
+    pass
+
+
+def normalizar_intervalo(valor: int) -> int:
+    return max(INTERVALO_MINIMO_MINUTOS, min(INTERVALO_MAXIMO_MINUTOS, valor))
+
+
+class MotorRecordatorios:
+    """Temporizador, fases Pomodoro y avisos sobre un ``Planificador``."""
+
+    def __init__(
+        self, planificador: Planificador, config: dict, estadisticas: Estadisticas
+    ) -> None:
+        self.planificador = planificador
+        self.config = config
+        self.estadisticas = estadisticas
+
+        self.en_ejecucion = False
+        self.modo_pomodoro = bool(config.get("modo_pomodoro", False))
+        self.fase_pomodoro: str = "trabajo"
+        self.pomodoros_completados = 0
+        # True mientras la interfaz muestra su ventana de descanso
+        self.en_descanso_visual = False
+        # Hora de pared a la que empezó el descanso Pomodoro en curso
+        self._inicio_descanso: float | None = None
+        self.punto_control = PuntoControl(RUTA_PUNTO_CONTROL)
+        self.estado_panel = EstadoPanel(RUTA_ESTADO_PANEL)
+
+        self.recordatorios = GestorRecordatorios(
+            planificador, self._al_recordatorio_adicional, CLAVE_RECORDATORIO
+        )
+        self.recordatorios.configurar(config.get("recordatorios", {}))
+
+        # Contadores de pausas compartidos con otros equipos del usuario
+        self.sincronizador: Sincronizador | None = None
+        if config.get("sincronizacion_url"):
+            self.sincronizador = Sincronizador(
+                planificador,
+                estadisticas,
+                config["sincronizacion_url"],
+                lambda: self.al_registrar_pausa(),
+            )
+            self.sincronizador.iniciar()
+
+        # Ganchos para la interfaz
+        self.al_sincronizar_config: Callable[[], None] = _nada
+        self.al_cambiar_estado: Callable[[], None] = _nada
+        self.al_registrar_pausa: Callable[[], None] = _nada
+        # Recibe los minutos de descanso; devuelve True si muestra una ventana
+        # y llamará a finalizar_descanso() al cerrarla
+        self.al_iniciar_descanso: Callable[[int], bool] | None = None
+        self.al_cancelar_descanso: Callable[[], None] = _nada
+
+    # ── Control ────────────────────────────────────────────────
+
+    def iniciar(self) -> None:
+        self.al_sincronizar_config()
+        if self.modo_pomodoro:
+            self.fase_pomodoro = "trabajo"
+            self.pomodoros_completados = 0
+        self.en_ejecucion = True
+        self._programar_siguiente()
+        self.recordatorios.configurar(self.config.get("recordatorios", {}))
+        self.recordatorios.iniciar()
+        self.precargar_sonidos()
+
+    def detener(self) -> None:
+        self.en_ejecucion = False
+        self.planificador.cancelar(CLAVE_RECORDATORIO)
+        self.recordatorios.detener()
+        self._anotar_descanso(RESULTADO_CANCELADO)
+        if self.en_descanso_visual:
+            self.en_descanso_visual = False
+            self.al_cancelar_descanso()
+        self._anotar_estado(None)
+        self.al_cambiar_estado()
+
+    def reanudar(self) -> bool | None:
+        """Continúa donde lo dejó el proceso anterior; False si estaba parado.
+
+        Devuelve None si no hay punto de control o no es válido (primera
+        ejecución, archivo dañado), para que quien llama decida si
+        arrancar el temporizador.
+
+        Si el aviso venció con la aplicación cerrada se aplica la política
+        de recuperación: con ``saltar`` la fase vuelve a empezar; con las
+        demás se avisa en cuanto arranca el bucle.
+        """
+        estado = self.punto_control.leer()
+        if estado is None:
+            return None
+        if not estado.en_ejecucion:
+            return False
+        self.modo_pomodoro = estado.modo_pomodoro
+        self.fase_pomodoro = estado.fase_pomodoro
+        self.pomodoros_completados = estado.pomodoros_completados
+        self.en_ejecucion = True
+        if self.modo_pomodoro and self.fase_pomodoro == "descanso":
+            self._inicio_descanso = estado.vence - self.minutos_descanso() * 60
+        restante: float | None = estado.vence - time.time()
+        if restante <= 0:
+            politica = self.config.get(
+                "politica_recuperacion", POLITICA_RECUPERACION_PREDETERMINADA
+            )
+            restante = None if politica == POLITICA_SALTAR else 0.0
+        self._programar_siguiente(restante)
+        self.recordatorios.configurar(self.config.get("recordatorios", {}))
+        self.recordatorios.iniciar()
+        self.precargar_sonidos()
+        return True
+
+    def cerrar(self) -> None:
+        """Para los plazos al salir sin anotar la parada: se reanudará."""
+        self.planificador.cancelar(CLAVE_RECORDATORIO)
+        self.recordatorios.detener()
+        self.punto_control.cerrar()
+        self.estado_panel.cerrar()
+        if self.sincronizador is not None:
+            self.sincronizador.cerrar()
+
+    def alternar(self) -> None:
+        if self.en_ejecucion:
+            self.detener()
+        else:
+            self.iniciar()
+
+    # ── Consultas ──────────────────────────────────────────────
+
+    def intervalo_simple(self) -> int:
+        try:
+            valor = int(
+                self.config.get("interval_minutes", INTERVALO_PREDETERMINADO_MINUTOS)
+            )
+        except (TypeError, ValueError):
+            valor = INTERVALO_PREDETERMINADO_MINUTOS
+        return normalizar_intervalo(valor)
+
+    def minutos_descanso(self) -> int:
+        try:
+            return max(
+                1,
+                int(
+                    self.config.get(
+                        "pomodoro_descanso", POMODORO_DESCANSO_PREDETERMINADO
+                    )
+                ),
+            )
+        except (TypeError, ValueError):
+            return POMODORO_DESCANSO_PREDETERMINADO
+
+    def intervalo_fase_actual(self) -> int:
+        if self.modo_pomodoro:
+            if self.fase_pomodoro == "trabajo":
+                try:
+                    return max(
+                        1,
+                        int(
+                            self.config.get(
+                                "pomodoro_trabajo", POMODORO_TRABAJO_PREDETERMINADO
+                            )
+                        ),
+                    )
+                except (TypeError, ValueError):
+                    return POMODORO_TRABAJO_PREDETERMINADO
+            return self.minutos_descanso()
+        return self.intervalo_simple()
+
+    def restante(self) -> float | None:
+        """Segundos hasta el próximo aviso principal o None si no hay."""
+        if not self.en_ejecucion:
+            return None
+        return self.planificador.restante(CLAVE_RECORDATORIO)
+
+    def texto_estado(self) -> str:
+        if not self.en_ejecucion:
+            return "Recordatorio detenido"
+        if self.modo_pomodoro:
+            fase = "Trabajo" if self.fase_pomodoro == "trabajo" else "Descanso"
+            return f"Pomodoro: {fase} · Completados: {self.pomodoros_completados}"
+        return f"Recordatorio activo cada {self.intervalo_simple()} min"
+
+    # ── Ciclo de avisos ────────────────────────────────────────
+
+    def _anotar_estado(self, segundos: float | None) -> None:
+        """Anota el estado actual con el próximo aviso dentro de *segundos*.
+
+        Lo guarda en el punto de control y lo publica para los paneles.
+        """
+        vence = time.time() + segundos if segundos is not None else 0.0
+        self.punto_control.guardar(
+            EstadoTemporizador(
+                self.en_ejecucion,
+                self.modo_pomodoro,
+                self.fase_pomodoro,
+                self.pomodoros_completados,
+                vence,
+            )
+        )
+        if not self.modo_pomodoro:
+            fase = "S"
+        else:
+            fase = "T" if self.fase_pomodoro == "trabajo" else "D"
+        self.estado_panel.publicar(
+            self.en_ejecucion,
+            fase,
+            vence,
+            self.estadisticas.pausas_hoy(),
+            self.estadisticas.racha_dias(),
+        )
+
+    def _programar_siguiente(self, segundos: float | None = None) -> None:
+        """Programa el fin de la fase actual (en *segundos* al reanudar)."""
+        self.al_sincronizar_config()
+        if segundos is None:
+            segundos = self.intervalo_fase_actual() * 60
+        self._anotar_estado(segundos)
+        self.planificador.programar(
+            CLAVE_RECORDATORIO,
+            segundos,
+            self._al_recordatorio,
+            politica=self.config.get(
+                "politica_recuperacion", POLITICA_RECUPERACION_PREDETERMINADA
+            ),
+        )
+        with perfil.medir("interfaz.estado"):
+            self.al_cambiar_estado()
+
+    def _al_recordatorio(self) -> None:
+        if not self.en_ejecucion:
+            return
+        with perfil.aviso(CLAVE_RECORDATORIO):
+            self._atender_recordatorio()
+
+    def _atender_recordatorio(self) -> None:
+        if not self.modo_pomodoro or self.fase_pomodoro == "trabajo":
+            with perfil.medir("estadisticas"):
+                self.estadisticas.registrar_pausa()
+            with perfil.medir("interfaz.estadisticas"):
+                self.al_registrar_pausa()
+            if self.sincronizador is not None:
+                self.sincronizador.tras_pausa()
+        if self.modo_pomodoro:
+            if self.fase_pomodoro == "trabajo":
+                self.pomodoros_completados += 1
+                self._notificar_principal(
+                    "Descanso", "¡Buen trabajo! Tómate un descanso."
+                )
+                self.fase_pomodoro = "descanso"
+                self._inicio_descanso = time.time()
+                self.reproducir_pitido()
+                if self.al_iniciar_descanso is not None:
+                    with perfil.medir("ventana_descanso"):
+                        mostrada = self.al_iniciar_descanso(self.minutos_descanso())
+                    if mostrada:
+                        # La interfaz lleva la cuenta del descanso
+                        self.en_descanso_visual = True
+                        self._anotar_estado(self.minutos_descanso() * 60)
+                        self.al_cambiar_estado()
+                        return
+            else:
+                self._notificar_principal(
+                    "A trabajar", "El descanso terminó. ¡Vamos de nuevo!"
+                )
+                self.fase_pomodoro = "trabajo"
+                self._anotar_descanso(RESULTADO_COMPLETADO)
+                self.reproducir_pitido()
+        else:
+            self._notificar_principal(
+                "Hora de moverse",
+                "Levántate y estira las piernas unos minutos.",
+            )
+            self.reproducir_pitido()
+        self._programar_siguiente()
+
+    def finalizar_descanso(self, saltado: bool = False) -> None:
+        """La interfaz avisa de que su ventana de descanso se ha cerrado.
+
+        *saltado* indica que el usuario lo cortó antes de tiempo (Escape).
+        """
+        self.en_descanso_visual = False
+        if not self.en_ejecucion:
+            return
+        self._anotar_descanso(RESULTADO_SALTADO if saltado else RESULTADO_COMPLETADO)
+        self.fase_pomodoro = "trabajo"
+        self._notificar_principal(
+            "A trabajar", "El descanso terminó. ¡Vamos de nuevo!"
+        )
+        self.reproducir_pitido()
+        self._programar_siguiente()
+
+    def _anotar_descanso(self, resultado: int) -> None:
+        """Lleva al historial el descanso en curso, si lo hay."""
+        if self._inicio_descanso is None:
+            return
+        inicio, self._inicio_descanso = self._inicio_descanso, None
+        self.estadisticas.registrar_descanso(inicio, time.time() - inicio, resultado)
+
+    # ── Avisos ─────────────────────────────────────────────────
+
+    def _notificar_principal(self, titulo: str, mensaje: str) -> None:
+        """Notifica el aviso principal junto a los adicionales coincidentes."""
+        adicionales = self.recordatorios.agrupar_con_principal()
+        if adicionales:
+            mensaje += "\n" + "\n".join(f"• {t}: {m}" for t, m in adicionales)
+        with perfil.medir("notificacion"):
+            notificaciones.notificar(titulo, mensaje, CLAVE_RECORDATORIO)
+
+    def _al_recordatorio_adicional(
+        self, titulo: str, mensaje: str, nombre_sonido: str
+    ) -> None:
+        if not self.en_ejecucion or self.en_descanso_visual:
+            # Durante el descanso Pomodoro ya se está lejos de la pantalla
+            return
+        with perfil.aviso("adicional"):
+            with perfil.medir("notificacion"):
+                notificaciones.notificar(titulo, mensaje, CLAVE_ADICIONALES)
+            with perfil.medir("sonido"):
+                sonido.reproducir(sonido.obtener_ruta(nombre_sonido))
+
+    def _ruta_pitido(self) -> str:
+        return sonido.obtener_ruta(
+            self.config.get("sonido", "Completado"),
+            self.config.get("sonido_personalizado", ""),
+        )
+
+    def precargar_sonidos(self) -> None:
+        """Decodifica ya los sonidos que pueden sonar en los próximos avisos."""
+        rutas = [self._ruta_pitido()]
+        for valores in self.recordatorios.ajustes().values():
+            if valores["activo"]:
+                rutas.append(sonido.obtener_ruta(valores["sonido"]))
+        sonido.precargar(*rutas)
+
+    def reproducir_pitido(self) -> None:
+        ruta = self._ruta_pitido()
+        with perfil.medir("sonido"):
+            sonido.reproducir(ruta)
+
+    def probar_aviso(self) -> None:
+        notificaciones.notificar(
+            "Hora de moverse",
+            "Levántate y estira las piernas unos minutos.",
+            CLAVE_RECORDATORIO,
+        )
+        self.reproducir_pitido()
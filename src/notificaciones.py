@@ -1,23 +1,156 @@
-"""Notificaciones de escritorio."""
+"""Notificaciones de escritorio.
+
+El canal principal es D-Bus: se abre una sola conexión al bus de sesión
+(Gio) y cada aviso es una llamada asíncrona a
+``org.freedesktop.Notifications.Notify``, así que el bucle principal no
+espera a nadie. La respuesta (el id de la notificación) llega por el
+bucle de GLib y se guarda por *clave*: el siguiente aviso con la misma
+clave sustituye al anterior en pantalla en vez de apilarse.
+
+Si no hay Gio o el servicio no responde se usa ``notify-send`` y, en
+último término, un messagebox (o la consola en modo ``--headless``).
+Un fallo de D-Bus no es definitivo: se vuelve a intentar pasados
+``REINTENTO_DBUS_MIN_S`` segundos, plazo que se dobla con cada fallo
+seguido hasta ``REINTENTO_DBUS_MAX_S`` (p.ej. mientras el demonio de
+notificaciones se reinicia con la sesión).
+La conexión sigue ``DBUS_SESSION_BUS_ADDRESS``, de modo que se puede
+probar contra un servicio simulado en un ``dbus-daemon`` propio.
+"""
 
 from __future__ import annotations
 
-import shutil
-import subprocess
-from tkinter import messagebox
+import time
+from typing import Any
+
+from .constantes import (
+    NOMBRE_APP,
+    REINTENTO_DBUS_MAX_S,
+    REINTENTO_DBUS_MIN_S,
+    RUTA_ICONO,
+    TIEMPO_ESPERA_DBUS_MS,
+)
+from . import introspeccion
+from .procesos import supervisor
+
+# El modo --headless lo pone a False: sin ventana, el respaldo es la consola
+usar_dialogos = True
+
+_SERVICIO = "org.freedesktop.Notifications"
+_RUTA_OBJETO = "/org/freedesktop/Notifications"
+
+_conexion: Any = None  # Gio.DBusConnection
+# Sin Gio no hay nada que reintentar
+_sin_gio = False
+# Instante (monotónico) antes del cual no se vuelve a probar D-Bus
+_reintentar_en = 0.0
+_espera_reintento_s = REINTENTO_DBUS_MIN_S
+# clave → id de la última notificación mostrada con esa clave
+_ids: dict[str, int] = {}
 
 
-def notificar(titulo: str, mensaje: str) -> None:
-    """Muestra una notificación del sistema o, como fallback, un messagebox."""
-    if shutil.which("notify-send"):
+def _marcar_fallo() -> None:
+    """Descarta la conexión y aplaza el siguiente intento por D-Bus."""
+    global _conexion, _reintentar_en, _espera_reintento_s
+    _conexion = None
+    _ids.clear()
+    _reintentar_en = time.monotonic() + _espera_reintento_s
+    _espera_reintento_s = min(_espera_reintento_s * 2, REINTENTO_DBUS_MAX_S)
+
+
+def _marcar_exito() -> None:
+    global _espera_reintento_s
+    _espera_reintento_s = REINTENTO_DBUS_MIN_S
+
+
+def _conectar() -> Any:
+    global _conexion, _sin_gio
+    if _conexion is None and not _sin_gio:
+        if time.monotonic() < _reintentar_en:
+            return None
+        gi = introspeccion.cargar("gio")
+        if gi is None:
+            _sin_gio = True
+            return None
+        Gio = gi["Gio"]
         try:
-            subprocess.run(
-                ["notify-send", "-u", "normal", titulo, mensaje], check=False
-            )
+            _conexion = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+        except Exception as e:
+            print(f"Aviso: sin bus de sesión D-Bus ({e}); se usa notify-send.")
+            _marcar_fallo()
+    return _conexion
+
+
+def _enviar_dbus(titulo: str, mensaje: str, clave: str) -> bool:
+    conexion = _conectar()
+    if conexion is None:
+        return False
+    gi = introspeccion.cargar("gio")
+    GLib, Gio = gi["GLib"], gi["Gio"]
+    parametros = GLib.Variant(
+        "(susssasa{sv}i)",
+        (
+            NOMBRE_APP,
+            _ids.get(clave, 0) if clave else 0,
+            str(RUTA_ICONO),
+            titulo,
+            mensaje,
+            [],
+            {"urgency": GLib.Variant("y", 1)},
+            -1,
+        ),
+    )
+
+    def _al_responder(origen: Any, resultado: Any) -> None:
+        try:
+            (identificador,) = origen.call_finish(resultado).unpack()
+        except Exception as e:
+            print(f"Aviso: el servicio de notificaciones falló ({e}).")
+            _marcar_fallo()
+            _notificar_respaldo(titulo, mensaje)
             return
-        except Exception:
-            pass
+        _marcar_exito()
+        if clave:
+            _ids[clave] = identificador
+
+    conexion.call(
+        _SERVICIO,
+        _RUTA_OBJETO,
+        _SERVICIO,
+        "Notify",
+        parametros,
+        GLib.VariantType.new("(u)"),
+        Gio.DBusCallFlags.NONE,
+        TIEMPO_ESPERA_DBUS_MS,
+        None,
+        _al_responder,
+    )
+    return True
+
+
+def _notificar_respaldo(titulo: str, mensaje: str) -> None:
+    # Sin esperar: el supervisor recoge el proceso cuando termine
+    if supervisor.lanzar(["notify-send", "-u", "normal", titulo, mensaje]):
+        return
+    if not usar_dialogos:
+        print(f"{titulo}: {mensaje}")
+        return
     try:
+        # Importación perezosa: el modo --headless no carga Tk
+        from tkinter import messagebox
+
         messagebox.showinfo(titulo, mensaje)
     except Exception:
         pass
+
+
+def notificar(titulo: str, mensaje: str, clave: str = "") -> None:
+    """Muestra una notificación del sistema sin bloquear.
+
+    Con *clave*, sustituye a la notificación anterior con la misma clave.
+    """
+    try:
+        if _enviar_dbus(titulo, mensaje, clave):
+            return
+    except Exception as e:
+        print(f"Aviso: no se pudo notificar por D-Bus: {e}")
+    _notificar_respaldo(titulo, mensaje)
@@ -0,0 +1,185 @@
+"""Perfilado del arranque y de cada aviso.
+
+Se activa con ``--profile [RUTA]`` o con la variable de entorno
+``ESTIRA_PERFIL`` (``1`` o una ruta). Sin activar, ``medir`` y ``aviso``
+no hacen nada más que comprobar un booleano.
+
+El informe es un JSON con las fases del arranque (importaciones,
+configuración, estadísticas, estilo, interfaz, bandeja, atajos) y, por
+cada aviso, su latencia total desglosada (notificación, sonido,
+estadísticas, refresco de la interfaz), más las cuentas y duraciones de
+los procesos auxiliares (``procesos.supervisor``). Las claves son estables y las
+fases van en orden, así que dos informes se pueden comparar con
+``diff`` entre versiones.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+from .constantes import (
+    MAXIMO_AVISOS_PERFIL,
+    RUTA_INFORME_PERFIL,
+    VARIABLE_ENTORNO_PERFIL,
+)
+from .procesos import supervisor
+
+_origen = time.perf_counter()
+
+activo = False
+_ruta: Path = RUTA_INFORME_PERFIL
+_informe: dict = {}
+# Lista de fases que recibe las mediciones; None fuera de una sección
+_seccion: list[dict] | None = None
+# anotar() también llega desde hilos auxiliares (p.ej. la salida de audio)
+_cerrojo = threading.RLock()
+
+
+def _ms(segundos: float) -> float:
+    return round(segundos * 1000, 3)
+
+
+def activar(ruta: str | None = None) -> None:
+    """Empieza a perfilar; el arranque cuenta desde la importación."""
+    global activo, _ruta, _informe, _seccion
+    if ruta is None:
+        valor = os.environ.get(VARIABLE_ENTORNO_PERFIL, "")
+        ruta = valor if valor not in ("", "0", "1") else None
+    activo = True
+    _ruta = Path(ruta).expanduser() if ruta else RUTA_INFORME_PERFIL
+    _informe = {
+        "formato": 1,
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "argumentos": sys.argv[1:],
+        "arranque": {"fases": [], "total_ms": None},
+        "avisos": [],
+        "procesos": {},
+    }
+    _seccion = _informe["arranque"]["fases"]
+
+
+def activar_por_entorno() -> None:
+    if os.environ.get(VARIABLE_ENTORNO_PERFIL, "") not in ("", "0"):
+        activar()
+
+
+@contextmanager
+def medir(fase: str) -> Iterator[None]:
+    """Anota la duración de *fase* en el arranque o en el aviso en curso."""
+    if not activo or _seccion is None:
+        yield
+        return
+    destino = _seccion
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        with _cerrojo:
+            destino.append(
+                {
+                    "fase": fase,
+                    "inicio_ms": _ms(inicio - _origen),
+                    "ms": _ms(time.perf_counter() - inicio),
+                }
+            )
+
+
+def fin_arranque() -> None:
+    """Cierra la sección de arranque (justo antes del bucle principal)."""
+    global _seccion
+    if not activo or _informe["arranque"]["total_ms"] is not None:
+        return
+    _informe["arranque"]["total_ms"] = _ms(time.perf_counter() - _origen)
+    _seccion = None
+    escribir()
+
+
+@contextmanager
+def aviso(tipo: str) -> Iterator[None]:
+    """Mide la latencia de un aviso y de las fases que contiene."""
+    global _seccion
+    if not activo:
+        yield
+        return
+    previa, fases = _seccion, []
+    _seccion = fases
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _seccion = previa
+        with _cerrojo:
+            avisos = _informe["avisos"]
+            avisos.append(
+                {
+                    "aviso": tipo,
+                    "fecha": datetime.now().isoformat(timespec="seconds"),
+                    "total_ms": _ms(time.perf_counter() - inicio),
+                    "fases": fases,
+                }
+            )
+            del avisos[:-MAXIMO_AVISOS_PERFIL]
+            escribir()
+
+
+def anotar_arranque(clave: str, valor: object) -> None:
+    """Guarda un dato suelto del arranque (p.ej. pestañas construidas)."""
+    if activo:
+        _informe["arranque"][clave] = valor
+
+
+def fases_actuales() -> list[dict] | None:
+    """Fases del aviso en curso, para anotarlas luego desde otro hilo."""
+    return _seccion
+
+
+def anotar(fase: str, inicio: float, fases: list[dict] | None = None) -> None:
+    """Añade al último aviso una fase que terminó después de él.
+
+    *inicio* es un ``time.perf_counter()``; sirve para lo que se completa
+    en el bucle de eventos, como la ventana de descanso ya en pantalla.
+    Con *fases* (de ``fases_actuales``) la fase va a ese aviso aunque
+    entretanto haya empezado otro o aún no haya terminado.
+    """
+    if not activo:
+        return
+    with _cerrojo:
+        if fases is None:
+            if not _informe["avisos"]:
+                return
+            fases = _informe["avisos"][-1]["fases"]
+        fases.append(
+            {
+                "fase": fase,
+                "inicio_ms": _ms(inicio - _origen),
+                "ms": _ms(time.perf_counter() - inicio),
+            }
+        )
+        escribir()
+
+
+def escribir() -> None:
+    """Vuelca el informe a disco de forma atómica."""
+    if not activo:
+        return
+    with _cerrojo:
+        _informe["procesos"] = supervisor.resumen()
+        try:
+            _ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = _ruta.with_name(_ruta.name + ".tmp")
+            temporal.write_text(
+                json.dumps(_informe, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            os.replace(temporal, _ruta)
+        except OSError as e:
+            print(f"Aviso: no se pudo escribir el informe de perfil: {e}")
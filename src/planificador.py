@@ -0,0 +1,234 @@
+"""Planificador de plazos sobre un reloj monotónico.
+
+Todas las esperas de la aplicación (recordatorios, cuenta atrás, fin del
+descanso) se registran aquí con una clave. Los plazos se guardan en un
+montículo, así que el más cercano se obtiene en O(1) y programar cuesta
+O(log n); el planificador mantiene un único ``after`` de Tk apuntando a
+ese plazo, haya los que haya, y mide el tiempo con
+``CLOCK_BOOTTIME`` (que sigue avanzando durante la suspensión) o, si no
+existe, con ``time.monotonic``. Los saltos de NTP y los cambios de hora
+no le afectan.
+
+Cuando un plazo se detecta con más de ``TOLERANCIA_RETRASO_S`` de
+retraso (típicamente al reanudar tras una suspensión) se aplica su
+política de recuperación:
+
+- ``POLITICA_SALTAR``: no se ejecuta. Un plazo periódico pasa al
+  siguiente hueco futuro; uno simple se rearma con su duración original
+  contada desde ahora.
+- ``POLITICA_AGRUPAR``: se ejecuta una sola vez por todos los huecos
+  perdidos; un plazo periódico sigue alineado con su fase original.
+- ``POLITICA_UNA_VEZ``: se ejecuta una sola vez y un plazo periódico
+  reinicia su periodo desde ahora.
+
+Cada plazo se dispara como mucho una vez por despertar, así que tras
+reanudar nunca hay ráfagas de callbacks atrasados.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    import tkinter as tk
+
+from .constantes import ESPERA_MAXIMA_PLANIFICADOR_S, TOLERANCIA_RETRASO_S
+
+POLITICA_SALTAR = "saltar"
+POLITICA_AGRUPAR = "agrupar"
+POLITICA_UNA_VEZ = "una_vez"
+
+POLITICAS = (POLITICA_SALTAR, POLITICA_AGRUPAR, POLITICA_UNA_VEZ)
+
+
+def _reloj_arranque() -> float:
+    return time.clock_gettime(time.CLOCK_BOOTTIME)
+
+
+reloj: Callable[[], float] = (
+    _reloj_arranque if hasattr(time, "CLOCK_BOOTTIME") else time.monotonic
+)
+
+
+def hasta_proximo_segundo(restante: float) -> float:
+    """Espera hasta que una cuenta atrás de *restante* s cambie de segundo.
+
+    Programar los ticks así los alinea con el cambio de cifra y evita la
+    deriva acumulada de un ``after(1000)`` encadenado.
+    """
+    fraccion = restante % 1.0
+    return (fraccion if fraccion > 0.001 else 1.0) + 0.005
+
+
+@dataclass
+class _Plazo:
+    vence: float
+    duracion: float
+    callback: Callable[[], None]
+    periodo: float | None
+    politica: str
+
+
+class Planificador:
+    """Gestiona todos los plazos con un solo temporizador de Tk.
+
+    *ventana_raiz* solo necesita ``after`` y ``after_cancel``; en modo
+    ``--headless`` es un ``BucleSinTk``.
+    """
+
+    def __init__(self, ventana_raiz: tk.Misc) -> None:
+        self._ventana_raiz = ventana_raiz
+        self._plazos: dict[str, _Plazo] = {}
+        # (vence, orden, clave, plazo); las entradas obsoletas se descartan
+        # al llegar a la cima comparando con self._plazos
+        self._monticulo: list[tuple[float, int, str, _Plazo]] = []
+        self._orden = itertools.count()
+        self._trabajo: str | None = None
+
+    # ── API pública ────────────────────────────────────────────
+
+    def programar(
+        self,
+        clave: str,
+        segundos: float,
+        callback: Callable[[], None],
+        periodo: float | None = None,
+        politica: str = POLITICA_UNA_VEZ,
+    ) -> None:
+        """Programa *callback* dentro de *segundos*; sustituye a *clave*."""
+        if politica not in POLITICAS:
+            politica = POLITICA_UNA_VEZ
+        plazo = _Plazo(reloj() + segundos, segundos, callback, periodo, politica)
+        self._plazos[clave] = plazo
+        self._empujar(clave, plazo)
+        self._rearmar()
+
+    def cancelar(self, *claves: str) -> None:
+        for clave in claves:
+            self._plazos.pop(clave, None)
+        self._rearmar()
+
+    def cancelar_todo(self) -> None:
+        self._plazos.clear()
+        self._monticulo.clear()
+        self._rearmar()
+
+    def vencen_en(self, segundos: float, prefijo: str = "") -> list[str]:
+        """Claves (con *prefijo*) que vencen dentro de *segundos*."""
+        limite = reloj() + segundos
+        return sorted(
+            (
+                clave
+                for clave, plazo in self._plazos.items()
+                if clave.startswith(prefijo) and plazo.vence <= limite
+            ),
+            key=lambda c: self._plazos[c].vence,
+        )
+
+    def consumir(self, clave: str) -> None:
+        """Da por atendido el próximo vencimiento de *clave* sin ejecutarlo.
+
+        Un plazo periódico pasa a su siguiente periodo contado desde ahora;
+        uno simple se elimina.
+        """
+        plazo = self._plazos.get(clave)
+        if plazo is None:
+            return
+        if plazo.periodo is None:
+            del self._plazos[clave]
+        else:
+            plazo.vence = reloj() + plazo.periodo
+            self._empujar(clave, plazo)
+        self._rearmar()
+
+    def cambiar_temporizador(self, ventana_raiz: tk.Misc) -> None:
+        """Pasa a despertarse desde otro bucle (p.ej. al crear la interfaz)."""
+        if self._trabajo is not None:
+            self._ventana_raiz.after_cancel(self._trabajo)
+            self._trabajo = None
+        self._ventana_raiz = ventana_raiz
+        self._rearmar()
+
+    def activo(self, clave: str) -> bool:
+        return clave in self._plazos
+
+    def restante(self, clave: str) -> float | None:
+        """Segundos que faltan para *clave* o None si no está programada."""
+        plazo = self._plazos.get(clave)
+        if plazo is None:
+            return None
+        return max(0.0, plazo.vence - reloj())
+
+    # ── Temporizador de Tk ─────────────────────────────────────
+
+    def _empujar(self, clave: str, plazo: _Plazo) -> None:
+        heapq.heappush(
+            self._monticulo, (plazo.vence, next(self._orden), clave, plazo)
+        )
+
+    def _vigente(self, entrada: tuple[float, int, str, _Plazo]) -> bool:
+        vence, _, clave, plazo = entrada
+        return self._plazos.get(clave) is plazo and plazo.vence == vence
+
+    def _cima(self) -> tuple[float, int, str, _Plazo] | None:
+        while self._monticulo and not self._vigente(self._monticulo[0]):
+            heapq.heappop(self._monticulo)
+        return self._monticulo[0] if self._monticulo else None
+
+    def _rearmar(self) -> None:
+        if self._trabajo is not None:
+            self._ventana_raiz.after_cancel(self._trabajo)
+            self._trabajo = None
+        cima = self._cima()
+        if cima is None:
+            return
+        espera = cima[0] - reloj()
+        # Despertar al menos cada ESPERA_MAXIMA para detectar suspensiones
+        espera = max(0.0, min(espera, ESPERA_MAXIMA_PLANIFICADOR_S))
+        self._trabajo = self._ventana_raiz.after(
+            int(espera * 1000) + 1, self._despachar
+        )
+
+    def _despachar(self) -> None:
+        self._trabajo = None
+        ahora = reloj()
+        vencidos = []
+        while (cima := self._cima()) is not None and cima[0] <= ahora:
+            heapq.heappop(self._monticulo)
+            vencidos.append((cima[2], cima[3], cima[0]))
+        for clave, plazo, vence in vencidos:
+            # Un callback anterior puede haberlo cancelado o sustituido
+            if self._plazos.get(clave) is not plazo or plazo.vence != vence:
+                continue
+            ejecutar = self._recolocar(clave, plazo, ahora)
+            if clave in self._plazos:
+                self._empujar(clave, plazo)
+            if ejecutar:
+                try:
+                    plazo.callback()
+                except Exception as e:
+                    print(f"Aviso: error en el plazo {clave}: {e}")
+        self._rearmar()
+
+    def _recolocar(self, clave: str, plazo: _Plazo, ahora: float) -> bool:
+        """Recoloca el plazo tras vencer y decide si se ejecuta."""
+        atrasado = ahora - plazo.vence > TOLERANCIA_RETRASO_S
+        if plazo.periodo is None:
+            if atrasado and plazo.politica == POLITICA_SALTAR:
+                plazo.vence = ahora + plazo.duracion
+                return False
+            del self._plazos[clave]
+            return True
+        if not atrasado:
+            plazo.vence += plazo.periodo
+            return True
+        if plazo.politica == POLITICA_UNA_VEZ:
+            plazo.vence = ahora + plazo.periodo
+        else:
+            perdidos = int((ahora - plazo.vence) // plazo.periodo) + 1
+            plazo.vence += perdidos * plazo.periodo
+        return plazo.politica != POLITICA_SALTAR
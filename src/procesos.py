@@ -0,0 +1,231 @@
+"""Supervisor de los procesos auxiliares (reproductores, notify-send…).
+
+``sonido`` y ``notificaciones`` lanzan sus ayudantes externos a través
+de ``supervisor``, que:
+
+- resuelve cada binario con ``shutil.which`` una sola vez;
+- recoge a los hijos en cuanto terminan desde un hilo propio (con
+  ``pidfd`` donde existe), así que no quedan zombis;
+- limita los ayudantes simultáneos a ``MAXIMO_AYUDANTES`` y rechaza el
+  resto en vez de acumularlos;
+- mata a los que siguen vivos pasado su plazo;
+- ejecuta también los ayudantes que hay que esperar (``ejecutar``,
+  para los decodificadores) con plazo y las mismas cuentas;
+- lleva la cuenta de lanzados, fallidos, matados y rechazados, y de la
+  duración de cada tipo de ayudante (``resumen``).
+"""
+
+from __future__ import annotations
+
+import os
+import selectors
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+
+from .constantes import MAXIMO_AYUDANTES, PLAZO_AYUDANTE_S
+
+# Sin pidfd se comprueba a los hijos con esta frecuencia
+_INTERVALO_SONDEO_S = 0.1
+# Duraciones que se guardan por ayudante para media y máximo
+_MUESTRAS_DURACION = 100
+
+
+@dataclass
+class _Hijo:
+    nombre: str
+    proceso: subprocess.Popen
+    inicio: float
+    limite: float
+    pidfd: int | None = None
+
+
+@dataclass
+class _Cuentas:
+    lanzados: int = 0
+    fallidos: int = 0
+    matados: int = 0
+    rechazados: int = 0
+    duraciones_ms: list[float] = field(default_factory=list)
+
+
+class Supervisor:
+    """Lanza, recoge y vigila los procesos auxiliares."""
+
+    def __init__(self, maximo: int = MAXIMO_AYUDANTES) -> None:
+        self._maximo = maximo
+        self._rutas: dict[str, str | None] = {}
+        self._hijos: dict[int, _Hijo] = {}
+        self._cuentas: dict[str, _Cuentas] = {}
+        self._cerrojo = threading.Lock()
+        self._hilo: threading.Thread | None = None
+        # Tubería para despertar al hilo recolector cuando hay un hijo nuevo
+        self._aviso_r, self._aviso_w = os.pipe()
+        os.set_blocking(self._aviso_w, False)
+
+    # ── API pública ────────────────────────────────────────────
+
+    def ruta(self, binario: str) -> str | None:
+        """Ruta de *binario* en el PATH, resuelta una vez por proceso."""
+        if binario not in self._rutas:
+            self._rutas[binario] = shutil.which(binario)
+        return self._rutas[binario]
+
+    def lanzar(
+        self, orden: list[str], plazo: float = PLAZO_AYUDANTE_S
+    ) -> bool:
+        """Lanza *orden* sin esperar; False si no se pudo o hay demasiados."""
+        nombre = os.path.basename(orden[0])
+        ejecutable = self.ruta(orden[0])
+        if ejecutable is None:
+            return False
+        with self._cerrojo:
+            cuentas = self._cuentas.setdefault(nombre, _Cuentas())
+            if len(self._hijos) >= self._maximo:
+                cuentas.rechazados += 1
+                return False
+            try:
+                proceso = subprocess.Popen(
+                    [ejecutable, *orden[1:]],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+            except OSError:
+                cuentas.fallidos += 1
+                return False
+            cuentas.lanzados += 1
+            ahora = time.monotonic()
+            hijo = _Hijo(nombre, proceso, ahora, ahora + plazo)
+            try:
+                hijo.pidfd = os.pidfd_open(proceso.pid)
+            except (AttributeError, OSError):
+                pass
+            self._hijos[proceso.pid] = hijo
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._recoger, daemon=True)
+                self._hilo.start()
+        try:
+            os.write(self._aviso_w, b"\0")
+        except BlockingIOError:
+            pass
+        return True
+
+    def ejecutar(self, orden: list[str], plazo: float) -> bytes | None:
+        """Ejecuta *orden* esperando su salida; None si falla o se cuelga.
+
+        Pensado para hilos de trabajo: no cuenta para el límite de
+        ayudantes simultáneos, que protege a los lanzados sin esperar.
+        """
+        nombre = os.path.basename(orden[0])
+        ejecutable = self.ruta(orden[0])
+        if ejecutable is None:
+            return None
+        with self._cerrojo:
+            self._cuentas.setdefault(nombre, _Cuentas()).lanzados += 1
+        inicio = time.monotonic()
+        salida, matado, fallido = None, False, False
+        try:
+            resultado = subprocess.run(
+                [ejecutable, *orden[1:]],
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                timeout=plazo,
+                check=False,
+            )
+            fallido = resultado.returncode != 0
+            salida = None if fallido else resultado.stdout
+        except subprocess.TimeoutExpired:
+            matado = True
+        except OSError:
+            fallido = True
+        self._anotar(nombre, inicio, matado, fallido)
+        return salida
+
+    def activos(self) -> int:
+        with self._cerrojo:
+            return len(self._hijos)
+
+    def resumen(self) -> dict[str, dict]:
+        """Cuentas y duraciones (ms) por ayudante, para informes."""
+        with self._cerrojo:
+            resumen = {}
+            for nombre, cuentas in self._cuentas.items():
+                duraciones = cuentas.duraciones_ms
+                resumen[nombre] = {
+                    "lanzados": cuentas.lanzados,
+                    "fallidos": cuentas.fallidos,
+                    "matados": cuentas.matados,
+                    "rechazados": cuentas.rechazados,
+                    "media_ms": (
+                        round(sum(duraciones) / len(duraciones), 3)
+                        if duraciones
+                        else None
+                    ),
+                    "maximo_ms": max(duraciones) if duraciones else None,
+                }
+            return resumen
+
+    # ── Hilo recolector ────────────────────────────────────────
+
+    def _recoger(self) -> None:
+        selector = selectors.DefaultSelector()
+        selector.register(self._aviso_r, selectors.EVENT_READ)
+        vigilados: set[int] = set()
+        try:
+            while True:
+                with self._cerrojo:
+                    hijos = list(self._hijos.values())
+                    if not hijos:
+                        self._hilo = None
+                        return
+                for hijo in hijos:
+                    if hijo.pidfd is not None and hijo.pidfd not in vigilados:
+                        selector.register(hijo.pidfd, selectors.EVENT_READ)
+                        vigilados.add(hijo.pidfd)
+                ahora = time.monotonic()
+                espera = max(0.0, min(h.limite for h in hijos) - ahora)
+                if any(h.pidfd is None for h in hijos):
+                    espera = min(espera, _INTERVALO_SONDEO_S)
+                for clave, _ in selector.select(espera):
+                    if clave.fd == self._aviso_r:
+                        os.read(self._aviso_r, 512)
+                for hijo in hijos:
+                    if self._revisar(hijo) and hijo.pidfd is not None:
+                        selector.unregister(hijo.pidfd)
+                        vigilados.discard(hijo.pidfd)
+                        os.close(hijo.pidfd)
+        finally:
+            selector.close()
+
+    def _revisar(self, hijo: _Hijo) -> bool:
+        """Recoge a *hijo* si terminó o lo mata si pasó su plazo."""
+        codigo = hijo.proceso.poll()
+        if codigo is None:
+            if time.monotonic() < hijo.limite:
+                return False
+            hijo.proceso.kill()
+            hijo.proceso.wait()
+        with self._cerrojo:
+            del self._hijos[hijo.proceso.pid]
+        self._anotar(hijo.nombre, hijo.inicio, codigo is None, bool(codigo))
+        return True
+
+    def _anotar(
+        self, nombre: str, inicio: float, matado: bool, fallido: bool
+    ) -> None:
+        duracion = round((time.monotonic() - inicio) * 1000, 3)
+        with self._cerrojo:
+            cuentas = self._cuentas.setdefault(nombre, _Cuentas())
+            if matado:
+                cuentas.matados += 1
+            elif fallido:
+                cuentas.fallidos += 1
+            cuentas.duraciones_ms.append(duracion)
+            # Solo las últimas: la memoria no crece con el tiempo encendido
+            del cuentas.duraciones_ms[:-_MUESTRAS_DURACION]
+
+
+supervisor = Supervisor()
@@ -0,0 +1,114 @@
+"""Punto de control del temporizador para reanudar tras un reinicio.
+
+El estado del motor (en marcha, modo, fase Pomodoro, pomodoros
+completados y hora de pared del próximo aviso) se guarda en un registro
+binario de tamaño fijo, ``temporizador.estado``, que se sobrescribe en
+su sitio con un solo ``pwrite`` en cada transición (iniciar, detener,
+cambio de fase), nunca en cada tick. Un CRC32 al final detecta un
+registro a medio escribir; en ese caso se arranca como siempre.
+
+Leerlo es abrir un archivo de ``TAMANO_REGISTRO`` bytes: reanudar no
+necesita el historial de estadísticas.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+_MAGIA = b"ELPC"
+_VERSION = 1
+
+# magia, versión, banderas, fase, pomodoros, vence (epoch)
+_CUERPO = struct.Struct("<4sHBBId")
+_CRC = struct.Struct("<I")
+TAMANO_REGISTRO = _CUERPO.size + _CRC.size
+
+_EN_EJECUCION = 1
+_MODO_POMODORO = 2
+
+_FASES = ("trabajo", "descanso")
+
+
+class EstadoTemporizador(NamedTuple):
+    en_ejecucion: bool
+    modo_pomodoro: bool
+    fase_pomodoro: str
+    pomodoros_completados: int
+    # Hora de pared (time.time()) del próximo aviso principal; 0 si no hay
+    vence: float
+
+
+def codificar(estado: EstadoTemporizador) -> bytes:
+    banderas = (_EN_EJECUCION if estado.en_ejecucion else 0) | (
+        _MODO_POMODORO if estado.modo_pomodoro else 0
+    )
+    cuerpo = _CUERPO.pack(
+        _MAGIA,
+        _VERSION,
+        banderas,
+        _FASES.index(estado.fase_pomodoro),
+        max(0, min(estado.pomodoros_completados, 0xFFFFFFFF)),
+        estado.vence,
+    )
+    return cuerpo + _CRC.pack(zlib.crc32(cuerpo))
+
+
+def decodificar(datos: bytes) -> EstadoTemporizador | None:
+    """Estado guardado en *datos*, o None si está vacío, roto o es de otra versión."""
+    if len(datos) != TAMANO_REGISTRO:
+        return None
+    cuerpo = datos[: _CUERPO.size]
+    (crc,) = _CRC.unpack_from(datos, _CUERPO.size)
+    if zlib.crc32(cuerpo) != crc:
+        return None
+    magia, version, banderas, fase, pomodoros, vence = _CUERPO.unpack(cuerpo)
+    if magia != _MAGIA or version != _VERSION or fase >= len(_FASES):
+        return None
+    return EstadoTemporizador(
+        bool(banderas & _EN_EJECUCION),
+        bool(banderas & _MODO_POMODORO),
+        _FASES[fase],
+        pomodoros,
+        vence,
+    )
+
+
+class PuntoControl:
+    """Lee y sobrescribe el registro de estado en *ruta*."""
+
+    def __init__(self, ruta: Path) -> None:
+        self._ruta = ruta
+        self._fd: int | None = None
+        self._ultimo: bytes | None = None
+
+    def leer(self) -> EstadoTemporizador | None:
+        try:
+            with open(self._ruta, "rb") as archivo:
+                datos = archivo.read(TAMANO_REGISTRO + 1)
+        except OSError:
+            return None
+        return decodificar(datos)
+
+    def guardar(self, estado: EstadoTemporizador) -> None:
+        """Escribe *estado* si cambió; un fallo solo se avisa."""
+        datos = codificar(estado)
+        if datos == self._ultimo:
+            return
+        try:
+            if self._fd is None:
+                self._ruta.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self._ruta, os.O_RDWR | os.O_CREAT, 0o600)
+                os.ftruncate(self._fd, TAMANO_REGISTRO)
+            os.pwrite(self._fd, datos, 0)
+            self._ultimo = datos
+        except OSError as e:
+            print(f"Aviso: no se pudo guardar el estado del temporizador: {e}")
+
+    def cerrar(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
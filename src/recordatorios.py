@@ -0,0 +1,126 @@
+"""Recordatorios adicionales (vista, hidratación, postura…).
+
+Cada recordatorio activo es un plazo periódico del ``Planificador`` con
+clave ``aviso:<tipo>``, así que todos comparten el único temporizador de
+Tk. Cuando uno vence, los demás que vencen dentro de
+``VENTANA_AGRUPACION_S`` se adelantan y se muestran en la misma
+notificación. Si el recordatorio principal (estirar las piernas o fase
+Pomodoro) también está a punto de vencer, los adicionales se reservan
+para que él los incluya en su aviso.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from .constantes import RECORDATORIOS_ADICIONALES, VENTANA_AGRUPACION_S
+from .planificador import POLITICA_SALTAR, Planificador
+
+PREFIJO_CLAVE = "aviso:"
+
+
+class GestorRecordatorios:
+    """Programa los recordatorios adicionales y agrupa los que coinciden."""
+
+    def __init__(
+        self,
+        planificador: Planificador,
+        al_avisar: Callable[[str, str, str], None],
+        clave_principal: str = "recordatorio",
+    ) -> None:
+        """*al_avisar* recibe (titulo, mensaje, nombre_sonido)."""
+        self._planificador = planificador
+        self._al_avisar = al_avisar
+        self._clave_principal = clave_principal
+        self._ajustes: dict[str, dict] = {}
+        self._reservados: list[str] = []
+        self.configurar({})
+
+    # ── Configuración ──────────────────────────────────────────
+
+    def configurar(self, ajustes: dict) -> None:
+        """Aplica ``{tipo: {"activo", "intervalo", "sonido"}}`` a los tipos."""
+        self._ajustes = {}
+        for tipo, definicion in RECORDATORIOS_ADICIONALES.items():
+            propio = ajustes.get(tipo, {})
+            try:
+                intervalo = max(
+                    1, int(propio.get("intervalo", definicion["intervalo"]))
+                )
+            except (TypeError, ValueError):
+                intervalo = definicion["intervalo"]
+            self._ajustes[tipo] = {
+                "activo": bool(propio.get("activo", False)),
+                "intervalo": intervalo,
+                "sonido": propio.get("sonido", definicion["sonido"]),
+            }
+
+    def ajustes(self) -> dict:
+        """Ajustes actuales, en el formato que se guarda en ``config.json``."""
+        return {tipo: dict(valores) for tipo, valores in self._ajustes.items()}
+
+    # ── Ciclo de vida ──────────────────────────────────────────
+
+    def iniciar(self) -> None:
+        self.detener()
+        for tipo, valores in self._ajustes.items():
+            if not valores["activo"]:
+                continue
+            segundos = valores["intervalo"] * 60
+            self._planificador.programar(
+                PREFIJO_CLAVE + tipo,
+                segundos,
+                lambda t=tipo: self._al_vencer(t),
+                periodo=segundos,
+                politica=POLITICA_SALTAR,
+            )
+
+    def detener(self) -> None:
+        self._planificador.cancelar(
+            *(PREFIJO_CLAVE + tipo for tipo in RECORDATORIOS_ADICIONALES)
+        )
+        self._reservados.clear()
+
+    # ── Agrupación ─────────────────────────────────────────────
+
+    def _proximos(self, excluir: str = "") -> list[str]:
+        """Tipos que vencen dentro de la ventana; se dan por atendidos."""
+        tipos = []
+        claves = self._planificador.vencen_en(VENTANA_AGRUPACION_S, PREFIJO_CLAVE)
+        for clave in claves:
+            tipo = clave[len(PREFIJO_CLAVE):]
+            if tipo == excluir:
+                continue
+            self._planificador.consumir(clave)
+            tipos.append(tipo)
+        return tipos
+
+    def _al_vencer(self, tipo: str) -> None:
+        grupo = [tipo, *self._proximos(excluir=tipo)]
+        restante = self._planificador.restante(self._clave_principal)
+        if restante is not None and restante <= VENTANA_AGRUPACION_S:
+            self._reservados.extend(t for t in grupo if t not in self._reservados)
+            return
+        self._avisar(grupo)
+
+    def agrupar_con_principal(self) -> list[tuple[str, str]]:
+        """(titulo, mensaje) de los adicionales que acompañan al aviso principal."""
+        grupo = self._reservados + [
+            t for t in self._proximos() if t not in self._reservados
+        ]
+        self._reservados = []
+        definiciones = [RECORDATORIOS_ADICIONALES[t] for t in grupo]
+        return [(d["titulo"], d["mensaje"]) for d in definiciones]
+
+    def _avisar(self, grupo: list[str]) -> None:
+        definiciones = [RECORDATORIOS_ADICIONALES[t] for t in grupo]
+        sonido = self._ajustes[grupo[0]]["sonido"]
+        if len(definiciones) == 1:
+            unica = definiciones[0]
+            self._al_avisar(unica["titulo"], unica["mensaje"], sonido)
+            return
+        self._al_avisar(
+            "Recordatorios",
+            "\n".join(f"• {d['titulo']}: {d['mensaje']}" for d in definiciones),
+            sonido,
+        )
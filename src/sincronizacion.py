@@ -0,0 +1,523 @@
+"""Sincronización de estadísticas entre equipos del mismo usuario.
+
+Cada equipo tiene un identificador propio y unos contadores de pausas
+que solo él incrementa. Fusionar dos copias es quedarse con el máximo de
+cada (equipo, clave), así que las pausas hechas a la vez en un portátil
+y un sobremesa nunca chocan: el total es la suma de los contadores de
+todos los equipos. La racha, las pausas de hoy y los totales por semana
+y por mes se calculan sobre esa suma.
+
+Las claves siguen a las estadísticas: un día (``AAAA-MM-DD``) mientras
+tiene detalle y, cuando se consolida (ver ``estadisticas.consolidar``),
+el total del mes (``AAAA-MM``), su máscara de días con pausas
+(``AAAA-MM#dias``) y el de la semana ISO (``AAAA-Wss``). Un mes con
+total sustituye a los días de ese mes del mismo equipo. Todos los
+valores solo crecen, así que el máximo sigue siendo el último.
+
+El identificador sale de ``/etc/machine-id`` y cada equipo guarda su
+estado en ``$XDG_STATE_HOME/estira-las-piernas/sincronizacion-<id>.json``.
+Los equipos que comparten el directorio de configuración (un ``$HOME``
+por NFS) comparten también las estadísticas: se apuntan en
+``equipos.json`` de ese directorio, no se suman entre sí y cada uno
+cuenta solo las pausas que registra él.
+
+El intercambio pasa por un servidor HTTP mínimo (``ServidorSincronizacion``,
+que se arranca con ``servidor_sincronizacion.py``). Otro equipo puede
+hacer de par ejecutándolo y sincronizando contra sí mismo. Cada petición
+es un ``POST`` con JSON comprimido con zlib::
+
+    → {"v": 1, "dispositivo": id, "cursor": n, "cambios": [[id, clave, valor], …]}
+    ← {"v": 1, "cursor": m, "cambios": [[id, clave, valor], …], "mas": bool}
+
+Solo viaja lo nuevo: el cliente envía los contadores propios que han
+cambiado desde el último envío confirmado (cada cambio lleva una
+versión local) y el servidor devuelve los de otros equipos posteriores
+al cursor del cliente (cada cambio lleva un número de secuencia del
+servidor). Los cambios van en lotes de ``LOTE_SINCRONIZACION``; tras
+semanas sin conexión basta con unas pocas peticiones.
+
+La red se usa en un hilo aparte. Preparar el envío y aplicar la
+respuesta ocurren en el bucle principal a través del ``Planificador``,
+así que ``Estadisticas`` nunca se toca desde otro hilo.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import urllib.request
+import zlib
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable
+
+from .cerrojo import cerrojo_estadisticas
+from .constantes import (
+    INTERVALO_SINCRONIZACION_S,
+    LOTE_SINCRONIZACION,
+    RETARDO_SINCRONIZACION_PAUSA_S,
+    RUTA_DIRECTORIO_ESTADO,
+    RUTA_ID_MAQUINA,
+    RUTA_EQUIPOS,
+    TIEMPO_ESPERA_SINCRONIZACION_S,
+)
+from .estadisticas import Estadisticas, clave_mes, clave_semana
+from .planificador import POLITICA_SALTAR, Planificador
+
+VERSION_PROTOCOLO = 1
+RUTA_HTTP = "/sincronizar"
+
+CLAVE_SINCRONIZACION = "sincronizacion"
+CLAVE_RESPUESTA = "sincronizacion.respuesta"
+# Cada cuánto se mira si el hilo de red ha terminado
+_SONDEO_RESPUESTA_S = 0.5
+
+
+def comprimir(datos: dict) -> bytes:
+    return zlib.compress(json.dumps(datos, separators=(",", ":")).encode(), 9)
+
+
+def descomprimir(cuerpo: bytes) -> dict:
+    return json.loads(zlib.decompress(cuerpo))
+
+
+def _guardar_json(ruta: Path, datos: dict) -> None:
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(ruta.name + ".tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump(datos, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporal, ruta)
+
+
+def _leer_json(ruta: Path) -> dict:
+    try:
+        return json.loads(ruta.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def fusionar(contadores: dict[str, dict[str, int]], cambios: list) -> bool:
+    """Aplica *cambios* ``[equipo, clave, valor]`` quedándose con el máximo."""
+    modificado = False
+    for dispositivo, clave, valor in cambios:
+        valores = contadores.setdefault(dispositivo, {})
+        if valor > valores.get(clave, 0):
+            valores[clave] = valor
+            modificado = True
+    return modificado
+
+
+def identificador_equipo() -> str:
+    """Identificador de esta máquina (y usuario), estable entre arranques.
+
+    Se deriva de ``/etc/machine-id`` con un hash propio, como pide
+    machine-id(5) para no difundir el original; sin él, del nombre del
+    equipo.
+    """
+    try:
+        base = RUTA_ID_MAQUINA.read_text(encoding="ascii").strip()
+    except (OSError, ValueError):
+        base = ""
+    base = base or socket.gethostname()
+    huella = hashlib.sha256(f"estira-las-piernas:{base}:{os.getuid()}".encode())
+    return huella.hexdigest()[:32]
+
+
+def _es_mascara(clave: str) -> bool:
+    return clave.endswith("#dias")
+
+
+def _es_semana(clave: str) -> bool:
+    return "-W" in clave
+
+
+def _es_mes(clave: str) -> bool:
+    return len(clave) == 7 and not _es_semana(clave)
+
+
+def contadores_de(datos: dict) -> dict[str, int]:
+    """Contadores que corresponden a unas estadísticas (``Estadisticas.datos``)."""
+    contadores = {
+        dia: entrada.get("pausas", 0) for dia, entrada in datos.get("dias", {}).items()
+    }
+    for mes, agregado in datos.get("meses", {}).items():
+        contadores[mes] = agregado.get("pausas", 0)
+        contadores[f"{mes}#dias"] = agregado.get("dias", 0)
+    contadores.update(datos.get("semanas", {}))
+    return contadores
+
+
+def sumar_equipos(
+    equipos: dict[str, dict[str, int]],
+) -> tuple[dict[str, int], dict[str, dict], dict[str, int]]:
+    """Suma los contadores de varios equipos: (días, meses, semanas).
+
+    Los días de un mes que un equipo ya consolidó no cuentan: los cubre
+    el total de ese mes.
+    """
+    dias: dict[str, int] = {}
+    meses: dict[str, dict] = {}
+    semanas: dict[str, int] = {}
+    for contadores in equipos.values():
+        for clave, valor in contadores.items():
+            if _es_mascara(clave):
+                mes = meses.setdefault(clave[:7], {"pausas": 0, "dias": 0})
+                mes["dias"] |= valor
+            elif _es_semana(clave):
+                semanas[clave] = semanas.get(clave, 0) + valor
+            elif _es_mes(clave):
+                mes = meses.setdefault(clave, {"pausas": 0, "dias": 0})
+                mes["pausas"] += valor
+            elif clave[:7] not in contadores:
+                dias[clave] = dias.get(clave, 0) + valor
+    return dias, meses, semanas
+
+
+# ── Cliente ────────────────────────────────────────────────────
+
+
+class Sincronizador:
+    """Intercambia los contadores de este equipo con el servidor en *url*.
+
+    Estado en ``$XDG_STATE_HOME/estira-las-piernas/sincronizacion-<equipo>.json``:
+    contadores propios con su versión, última versión confirmada, cursor
+    del servidor y contadores de los demás equipos.
+
+    Mientras sea el único equipo con este directorio de configuración
+    sus contadores son los de las estadísticas. Si hay más (ver
+    ``RUTA_EQUIPOS``), las estadísticas incluyen pausas de los
+    otros y cada uno suma solo las suyas al registrarlas (``tras_pausa``).
+    """
+
+    def __init__(
+        self,
+        planificador: Planificador,
+        estadisticas: Estadisticas,
+        url: str,
+        al_recibir: Callable[[], None],
+        ruta_equipos: Path = RUTA_EQUIPOS,
+        ruta_estado: Path | None = None,
+    ) -> None:
+        self._planificador = planificador
+        self._estadisticas = estadisticas
+        self._url = url.rstrip("/") + RUTA_HTTP
+        self._al_recibir = al_recibir
+        self._ruta_equipos = ruta_equipos
+        self.dispositivo = identificador_equipo()
+        self._ruta_estado = ruta_estado or (
+            RUTA_DIRECTORIO_ESTADO / f"sincronizacion-{self.dispositivo}.json"
+        )
+        self._hilo: threading.Thread | None = None
+        self._resultado: tuple[int, int, list] | None = None
+        self._error: str | None = None
+
+        estado = _leer_json(self._ruta_estado)
+        with cerrojo_estadisticas():
+            equipos: list[str] = _leer_json(ruta_equipos).get("equipos", [])
+            if self.dispositivo not in equipos:
+                equipos.append(self.dispositivo)
+                _guardar_json(ruta_equipos, {"equipos": equipos})
+        # Otros equipos con las mismas estadísticas
+        self._hermanos = set(equipos) - {self.dispositivo}
+        self._reloj: int = estado.get("reloj", 0)
+        # clave → [valor, versión]
+        self._propios: dict[str, list[int]] = estado.get("propios", {})
+        self._remotos: dict[str, dict[str, int]] = estado.get("remotos", {})
+        if estado.get("url") == self._url:
+            self._enviado: int = estado.get("enviado", 0)
+            self._cursor: int = estado.get("cursor", 0)
+        else:
+            # Servidor nuevo: se le envía todo y se recibe todo
+            self._enviado = 0
+            self._cursor = 0
+        self._remotos.pop(self.dispositivo, None)
+        self._publicar()
+
+    # ── Ciclo ──────────────────────────────────────────────────
+
+    def iniciar(self) -> None:
+        self._planificador.programar(
+            CLAVE_SINCRONIZACION,
+            RETARDO_SINCRONIZACION_PAUSA_S,
+            self.sincronizar,
+            periodo=INTERVALO_SINCRONIZACION_S,
+            politica=POLITICA_SALTAR,
+        )
+
+    def tras_pausa(self) -> None:
+        """Cuenta la pausa recién registrada y adelanta la sincronización."""
+        self._actualizar_hermanos()
+        if self._hermanos:
+            self._sumar_pausa(date.today())
+        restante = self._planificador.restante(CLAVE_SINCRONIZACION)
+        if restante is None or restante > RETARDO_SINCRONIZACION_PAUSA_S:
+            self.iniciar()
+
+    def cerrar(self) -> None:
+        self._planificador.cancelar(CLAVE_SINCRONIZACION, CLAVE_RESPUESTA)
+        self._guardar()
+
+    def sincronizar(self) -> None:
+        """Prepara los cambios propios y los envía en un hilo aparte."""
+        if self._hilo is not None:
+            return
+        self._actualizar_hermanos()
+        self._anotar_propios()
+        pendientes = sorted(
+            (version, clave, valor)
+            for clave, (valor, version) in self._propios.items()
+            if version > self._enviado
+        )
+        self._resultado = None
+        self._error = None
+        self._hilo = threading.Thread(
+            target=self._intercambiar,
+            args=(pendientes, self._cursor),
+            daemon=True,
+        )
+        self._hilo.start()
+        self._planificador.programar(
+            CLAVE_RESPUESTA, _SONDEO_RESPUESTA_S, self._recoger
+        )
+
+    def _poner(self, clave: str, valor: int) -> None:
+        self._reloj += 1
+        self._propios[clave] = [valor, self._reloj]
+
+    def _valor(self, clave: str) -> int:
+        return self._propios.get(clave, (0, 0))[0]
+
+    def _sumar_pausa(self, dia: date) -> None:
+        mes = clave_mes(dia)
+        if mes not in self._propios:
+            self._poner(dia.isoformat(), self._valor(dia.isoformat()) + 1)
+            return
+        # Mes ya consolidado (p.ej. con el reloj hacia atrás)
+        self._poner(mes, self._valor(mes) + 1)
+        mascara = f"{mes}#dias"
+        self._poner(mascara, self._valor(mascara) | 1 << (dia.day - 1))
+        semana = clave_semana(dia)
+        self._poner(semana, self._valor(semana) + 1)
+
+    def _anotar_propios(self) -> None:
+        """Da una versión nueva a cada contador propio que ha crecido."""
+        datos = self._estadisticas.datos
+        if self._hermanos:
+            # Las estadísticas no son solo nuestras: se consolidan los
+            # contadores propios al ritmo de las estadísticas
+            meses = datos.get("meses", {})
+            dias = datos.get("dias", {})
+            consolidados = [
+                d
+                for d in self._propios
+                if len(d) == 10 and d[:7] in meses and d not in dias
+            ]
+            for dia in consolidados:
+                pausas = self._propios.pop(dia)[0]
+                fecha = date.fromisoformat(dia)
+                mes, semana = clave_mes(fecha), clave_semana(fecha)
+                self._poner(mes, self._valor(mes) + pausas)
+                mascara = f"{mes}#dias"
+                self._poner(mascara, self._valor(mascara) | 1 << (fecha.day - 1))
+                self._poner(semana, self._valor(semana) + pausas)
+        else:
+            for clave, valor in contadores_de(datos).items():
+                if valor > self._valor(clave) or clave not in self._propios:
+                    self._poner(clave, valor)
+        # Los días de un mes consolidado los cubre el total del mes
+        propios = self._propios
+        cubiertos = [d for d in propios if len(d) == 10 and d[:7] in propios]
+        for dia in cubiertos:
+            del self._propios[dia]
+
+    # ── Hilo de red ────────────────────────────────────────────
+
+    def _intercambiar(self, pendientes: list, cursor: int) -> None:
+        enviado = self._enviado
+        recibidos: list = []
+        try:
+            while True:
+                lote = pendientes[:LOTE_SINCRONIZACION]
+                pendientes = pendientes[LOTE_SINCRONIZACION:]
+                respuesta = self._peticion(
+                    {
+                        "v": VERSION_PROTOCOLO,
+                        "dispositivo": self.dispositivo,
+                        "cursor": cursor,
+                        "cambios": [
+                            [self.dispositivo, clave, valor] for _, clave, valor in lote
+                        ],
+                    }
+                )
+                if lote:
+                    enviado = lote[-1][0]
+                cursor = respuesta["cursor"]
+                recibidos.extend(respuesta["cambios"])
+                if not pendientes and not respuesta.get("mas"):
+                    break
+        except Exception as e:
+            self._error = str(e)
+        # Lo confirmado hasta el fallo se aplica igualmente
+        self._resultado = (enviado, cursor, recibidos)
+
+    def _peticion(self, datos: dict) -> dict:
+        peticion = urllib.request.Request(
+            self._url,
+            data=comprimir(datos),
+            headers={"Content-Type": "application/octet-stream"},
+            method="POST",
+        )
+        with urllib.request.urlopen(
+            peticion, timeout=TIEMPO_ESPERA_SINCRONIZACION_S
+        ) as respuesta:
+            return descomprimir(respuesta.read())
+
+    # ── Vuelta al bucle principal ──────────────────────────────
+
+    def _recoger(self) -> None:
+        hilo = self._hilo
+        if hilo is None:
+            return
+        if hilo.is_alive():
+            self._planificador.programar(
+                CLAVE_RESPUESTA, _SONDEO_RESPUESTA_S, self._recoger
+            )
+            return
+        self._hilo = None
+        if self._error is not None:
+            print(f"Aviso: no se pudo sincronizar con {self._url}: {self._error}")
+        if self._resultado is None:
+            return
+        self._enviado, self._cursor, recibidos = self._resultado
+        cambios = [c for c in recibidos if c[0] != self.dispositivo]
+        if fusionar(self._remotos, cambios):
+            self._publicar()
+            self._al_recibir()
+        self._guardar()
+
+    def _actualizar_hermanos(self) -> None:
+        """Relee qué equipos comparten el directorio de configuración."""
+        equipos = _leer_json(self._ruta_equipos).get("equipos", [])
+        hermanos = set(equipos) - {self.dispositivo}
+        if hermanos != self._hermanos:
+            self._hermanos = hermanos
+            self._publicar()
+
+    def _publicar(self) -> None:
+        """Pasa a ``Estadisticas`` la suma de los demás equipos.
+
+        Los que comparten estas estadísticas ya están en ellas.
+        """
+        otros = {
+            equipo: contadores
+            for equipo, contadores in self._remotos.items()
+            if equipo not in self._hermanos
+        }
+        self._estadisticas.actualizar_remotos(*sumar_equipos(otros))
+
+    def _guardar(self) -> None:
+        try:
+            _guardar_json(
+                self._ruta_estado,
+                {
+                    "reloj": self._reloj,
+                    "propios": self._propios,
+                    "url": self._url,
+                    "enviado": self._enviado,
+                    "cursor": self._cursor,
+                    "remotos": self._remotos,
+                },
+            )
+        except OSError as e:
+            print(f"Aviso: no se pudo guardar el estado de sincronización: {e}")
+
+
+# ── Servidor ───────────────────────────────────────────────────
+
+
+class ServidorSincronizacion:
+    """Guarda los contadores de todos los equipos y reparte los cambios.
+
+    Cada (equipo, clave) se guarda con el número de secuencia del último
+    cambio, de modo que a cada cliente se le devuelve solo lo posterior
+    a su cursor. El estado vive en un JSON que se reescribe tras cada
+    petición que cambia algo.
+    """
+
+    def __init__(self, ruta: Path) -> None:
+        self._ruta = ruta
+        estado = _leer_json(ruta)
+        self._secuencia: int = estado.get("secuencia", 0)
+        # equipo → clave → [valor, secuencia]
+        self._contadores: dict[str, dict[str, list[int]]] = estado.get(
+            "contadores", {}
+        )
+        self._cerrojo = threading.Lock()
+
+    def atender(self, peticion: dict) -> dict:
+        if peticion.get("v") != VERSION_PROTOCOLO:
+            raise ValueError("versión de protocolo no admitida")
+        dispositivo = peticion["dispositivo"]
+        cursor = int(peticion.get("cursor", 0))
+        with self._cerrojo:
+            modificado = False
+            for origen, clave, valor in peticion.get("cambios", []):
+                valores = self._contadores.setdefault(origen, {})
+                if valor > valores.get(clave, (0, 0))[0]:
+                    self._secuencia += 1
+                    valores[clave] = [valor, self._secuencia]
+                    modificado = True
+            if modificado:
+                _guardar_json(
+                    self._ruta,
+                    {"secuencia": self._secuencia, "contadores": self._contadores},
+                )
+            nuevos = sorted(
+                (secuencia, origen, clave, valor)
+                for origen, valores in self._contadores.items()
+                if origen != dispositivo
+                for clave, (valor, secuencia) in valores.items()
+                if secuencia > cursor
+            )
+            lote = nuevos[:LOTE_SINCRONIZACION]
+            mas = len(nuevos) > len(lote)
+            return {
+                "v": VERSION_PROTOCOLO,
+                "cursor": lote[-1][0] if mas else self._secuencia,
+                "cambios": [[origen, clave, valor] for _, origen, clave, valor in lote],
+                "mas": mas,
+            }
+
+    def servir(self, direccion: str, puerto: int) -> None:
+        servidor = self
+
+        class _Manejador(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:
+                if self.path != RUTA_HTTP:
+                    self.send_error(404)
+                    return
+                try:
+                    largo = int(self.headers.get("Content-Length", 0))
+                    respuesta = servidor.atender(descomprimir(self.rfile.read(largo)))
+                except (ValueError, KeyError, TypeError, zlib.error) as e:
+                    self.send_error(400, str(e))
+                    return
+                cuerpo = comprimir(respuesta)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, formato: str, *args) -> None:
+                pass
+
+        with ThreadingHTTPServer((direccion, puerto), _Manejador) as http:
+            print(f"Sincronización en http://{direccion}:{puerto}{RUTA_HTTP}")
+            http.serve_forever()
@@ -1,12 +1,49 @@
-"""Reproducción de sonidos de aviso."""
+"""Reproducción de sonidos de aviso.
+
+Los sonidos se decodifican una vez a PCM (16 bits con signo,
+``FRECUENCIA_AUDIO`` Hz, ``CANALES_AUDIO`` canales) y se guardan en
+memoria junto al mtime y el tamaño del archivo; si el archivo cambia se
+vuelven a decodificar. Los WAV que ya están en ese formato se leen con
+``wave``; el resto pasa por el primer decodificador disponible
+(``ffmpeg``, ``gst-launch-1.0`` o ``sox``).
+
+La reproducción va a un único proceso ``pacat`` (o ``aplay``) que se
+mantiene abierto y recibe el PCM por su entrada estándar desde un hilo,
+así que un aviso no lanza procesos ni espera a que arranquen. Mientras
+un sonido no está en la caché se reproduce como antes, con un proceso
+por sonido, y se decodifica en segundo plano para la próxima vez. Esos
+procesos y los decodificadores van por ``procesos.supervisor``, que los
+recoge al terminar y los mata si se cuelgan.
+
+Un archivo que no se pudo decodificar se recuerda (también con su mtime
+y tamaño) y no se vuelve a intentar ni a avisar hasta que cambie. Con el
+perfilado activo, cada aviso anota en ``sonido.inicio`` cuánto tardó el
+PCM en llegar a la salida de audio.
+"""
 
 from __future__ import annotations
 
-import shutil
+import os
+import queue
 import subprocess
+import threading
+import time
+import wave
 from pathlib import Path
+from typing import NamedTuple
 
-from .constantes import SONIDOS_SISTEMA
+from .constantes import (
+    CANALES_AUDIO,
+    DURACION_MAXIMA_SONIDO_S,
+    FRECUENCIA_AUDIO,
+    LATENCIA_AUDIO_MS,
+    PLAZO_DECODIFICADOR_S,
+    SONIDOS_SISTEMA,
+)
+from . import perfil
+from .procesos import supervisor
+
+_BYTES_POR_MUESTRA = 2
 
 
 def obtener_ruta(nombre_sonido: str, ruta_personalizada: str = "") -> str:
@@ -16,27 +53,281 @@ def obtener_ruta(nombre_sonido: str, ruta_personalizada: str = "") -> str:
     return SONIDOS_SISTEMA.get(nombre_sonido, "")
 
 
-def reproducir(ruta: str) -> None:
-    """Reproduce un archivo de sonido; usa campana de terminal como fallback."""
-    if not ruta:
-        return
+# ── Decodificación y caché ─────────────────────────────────────
 
-    if not Path(ruta).exists():
-        print(f"Aviso: archivo de sonido no encontrado: {ruta}")
-        print("\a", end="", flush=True)
+
+class _Muestras(NamedTuple):
+    mtime_ns: int
+    tamano: int
+    pcm: bytes
+
+
+_cache: dict[str, _Muestras] = {}
+# ruta → (mtime_ns, tamaño) del archivo que no se pudo decodificar
+_fallidos: dict[str, tuple[int, int]] = {}
+_decodificando: set[str] = set()
+_cerrojo_cache = threading.Lock()
+
+
+def _limite_bytes() -> int:
+    return int(
+        DURACION_MAXIMA_SONIDO_S * FRECUENCIA_AUDIO * CANALES_AUDIO * _BYTES_POR_MUESTRA
+    )
+
+
+def _orden_decodificador(ruta: str) -> list[str] | None:
+    frecuencia, canales = str(FRECUENCIA_AUDIO), str(CANALES_AUDIO)
+    if supervisor.ruta("ffmpeg"):
+        return [
+            "ffmpeg", "-v", "quiet", "-i", ruta,
+            "-f", "s16le", "-ac", canales, "-ar", frecuencia, "-",
+        ]
+    if supervisor.ruta("gst-launch-1.0"):
+        return [
+            "gst-launch-1.0", "-q", "filesrc", f"location={ruta}", "!",
+            "decodebin", "!", "audioconvert", "!", "audioresample", "!",
+            f"audio/x-raw,format=S16LE,rate={frecuencia},channels={canales}",
+            "!", "fdsink", "fd=1",
+        ]
+    if supervisor.ruta("sox"):
+        return [
+            "sox", ruta, "-t", "raw", "-e", "signed-integer", "-b", "16",
+            "-c", canales, "-r", frecuencia, "-",
+        ]
+    return None
+
+
+def _leer_wav(ruta: str) -> bytes | None:
+    """PCM de un WAV que ya está en el formato del reproductor."""
+    try:
+        with wave.open(ruta, "rb") as wav:
+            if (
+                wav.getsampwidth() != _BYTES_POR_MUESTRA
+                or wav.getframerate() != FRECUENCIA_AUDIO
+                or wav.getnchannels() != CANALES_AUDIO
+            ):
+                return None
+            return wav.readframes(wav.getnframes())
+    except (OSError, EOFError, wave.Error):
+        return None
+
+
+def _decodificar(ruta: str) -> bytes | None:
+    pcm = _leer_wav(ruta) if ruta.lower().endswith(".wav") else None
+    if pcm is None:
+        orden = _orden_decodificador(ruta)
+        if orden is None:
+            return None
+        pcm = supervisor.ejecutar(orden, PLAZO_DECODIFICADOR_S)
+        if not pcm:
+            return None
+    return pcm[: _limite_bytes()]
+
+
+def _en_cache(ruta: str) -> bytes | None:
+    """PCM de *ruta* si está en caché y el archivo no ha cambiado."""
+    try:
+        datos = os.stat(ruta)
+    except OSError:
+        return None
+    with _cerrojo_cache:
+        muestras = _cache.get(ruta)
+    if (
+        muestras is not None
+        and muestras.mtime_ns == datos.st_mtime_ns
+        and muestras.tamano == datos.st_size
+    ):
+        return muestras.pcm
+    return None
+
+
+def _fallido(ruta: str) -> bool:
+    """True si *ruta* ya falló al decodificarse y no ha cambiado desde entonces."""
+    with _cerrojo_cache:
+        firma = _fallidos.get(ruta)
+    if firma is None:
+        return False
+    try:
+        datos = os.stat(ruta)
+    except OSError:
+        return True
+    return firma == (datos.st_mtime_ns, datos.st_size)
+
+
+def _decodificar_en_cache(ruta: str) -> None:
+    try:
+        datos = os.stat(ruta)
+        pcm = _decodificar(ruta)
+        with _cerrojo_cache:
+            if pcm is not None:
+                _cache[ruta] = _Muestras(datos.st_mtime_ns, datos.st_size, pcm)
+                _fallidos.pop(ruta, None)
+            else:
+                _fallidos[ruta] = (datos.st_mtime_ns, datos.st_size)
+        if pcm is None:
+            print(f"Aviso: no se pudo decodificar {ruta}; se reproducirá sin caché.")
+    except OSError:
+        pass
+    finally:
+        with _cerrojo_cache:
+            _decodificando.discard(ruta)
+
+
+def precargar(*rutas: str) -> None:
+    """Decodifica en segundo plano los sonidos que aún no están en caché."""
+    if not _reproductor.disponible():
         return
+    _reproductor.preparar()
+    for ruta in rutas:
+        if not ruta or _en_cache(ruta) is not None or _fallido(ruta):
+            continue
+        with _cerrojo_cache:
+            if ruta in _decodificando:
+                continue
+            _decodificando.add(ruta)
+        threading.Thread(
+            target=_decodificar_en_cache, args=(ruta,), daemon=True
+        ).start()
+
+
+# ── Reproductor persistente ────────────────────────────────────
+
+
+def _orden_reproductor() -> list[str] | None:
+    frecuencia, canales = str(FRECUENCIA_AUDIO), str(CANALES_AUDIO)
+    if supervisor.ruta("pacat"):
+        return [
+            "pacat", "--playback", "--raw", "--format=s16le",
+            f"--rate={frecuencia}", f"--channels={canales}",
+            f"--latency-msec={LATENCIA_AUDIO_MS}", "--client-name=estira-las-piernas",
+        ]
+    if supervisor.ruta("aplay"):
+        return [
+            "aplay", "-q", "-t", "raw", "-f", "S16_LE",
+            "-r", frecuencia, "-c", canales,
+            "--buffer-time", str(LATENCIA_AUDIO_MS * 1000),
+        ]
+    return None
+
 
+class _Reproductor:
+    """Un proceso de salida de audio abierto y un hilo que le escribe."""
+
+    def __init__(self) -> None:
+        self._orden: list[str] | None = None
+        self._resuelto = False
+        self._proceso: subprocess.Popen | None = None
+        # (PCM, instante del aviso, fases de perfil a las que anotarlo)
+        self._cola: queue.Queue[tuple[bytes, float, list | None] | None] = (
+            queue.Queue()
+        )
+        self._hilo: threading.Thread | None = None
+        self._cerrojo = threading.Lock()
+
+    def disponible(self) -> bool:
+        if not self._resuelto:
+            self._orden = _orden_reproductor()
+            self._resuelto = True
+        return self._orden is not None
+
+    def preparar(self) -> None:
+        """Abre ya la salida para que el primer aviso no espere al proceso."""
+        self.reproducir(b"")
+
+    def reproducir(self, pcm: bytes) -> None:
+        with self._cerrojo:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._escribir, daemon=True)
+                self._hilo.start()
+        self._cola.put((pcm, time.perf_counter(), perfil.fases_actuales()))
+
+    def _abrir(self) -> subprocess.Popen | None:
+        if self._proceso is not None and self._proceso.poll() is None:
+            return self._proceso
+        try:
+            self._proceso = subprocess.Popen(
+                [supervisor.ruta(self._orden[0]), *self._orden[1:]],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            print(f"Aviso: no se pudo abrir la salida de audio: {e}")
+            self._proceso = None
+        return self._proceso
+
+    def _escribir(self) -> None:
+        while (elemento := self._cola.get()) is not None:
+            pcm, inicio, fases = elemento
+            proceso = self._abrir()
+            if proceso is None:
+                continue
+            try:
+                proceso.stdin.write(pcm)
+                proceso.stdin.flush()
+            except (BrokenPipeError, OSError):
+                # El servidor de sonido se reinició: se reabre al siguiente
+                proceso.kill()
+                proceso.wait()
+                continue
+            if pcm:
+                perfil.anotar("sonido.inicio", inicio, fases)
+
+    def cerrar(self) -> None:
+        if self._hilo is not None and self._hilo.is_alive():
+            self._cola.put(None)
+            self._hilo.join(timeout=1)
+        proceso, self._proceso = self._proceso, None
+        if proceso is not None:
+            try:
+                proceso.stdin.close()
+            except OSError:
+                pass
+            proceso.terminate()
+            try:
+                proceso.wait(timeout=1)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+                proceso.wait()
+
+
+_reproductor = _Reproductor()
+
+
+# ── API pública ────────────────────────────────────────────────
+
+
+def _reproducir_con_proceso(ruta: str) -> None:
     for reproductor, args_extra, condicion in [
         ("paplay", [], True),
         ("aplay", [], ruta.endswith(".wav")),
         ("canberra-gtk-play", ["-f"], True),
     ]:
-        if condicion and shutil.which(reproductor):
-            try:
-                subprocess.Popen([reproductor, *args_extra, ruta])
-                return
-            except Exception:
-                continue
+        if condicion and supervisor.lanzar([reproductor, *args_extra, ruta]):
+            return
 
     # Fallback: campana de terminal
     print("\a", end="", flush=True)
+
+
+def reproducir(ruta: str) -> None:
+    """Reproduce un archivo de sonido; usa campana de terminal como fallback."""
+    if not ruta:
+        return
+
+    if not Path(ruta).exists():
+        print(f"Aviso: archivo de sonido no encontrado: {ruta}")
+        print("\a", end="", flush=True)
+        return
+
+    pcm = _en_cache(ruta) if _reproductor.disponible() else None
+    if pcm is not None:
+        _reproductor.reproducir(pcm)
+        return
+    _reproducir_con_proceso(ruta)
+    precargar(ruta)
+
+
+def cerrar() -> None:
+    """Cierra la salida de audio persistente (al salir de la aplicación)."""
+    _reproductor.cerrar()
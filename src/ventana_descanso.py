@@ -1,46 +1,176 @@
-"""Ventana de descanso a pantalla completa para el modo Pomodoro."""
+"""Ventana de descanso a pantalla completa para el modo Pomodoro.
+
+La ventana se construye una sola vez, oculta, poco después del arranque
+(``preparar``) y en cada descanso solo se muestra y se vuelve a ocultar,
+así que no hay que crear widgets mientras el servidor X dibuja. Hay una
+ventana por monitor (según ``xrandr --listmonitors``).
+
+``xrandr`` nunca se ejecuta en el hilo de Tk: se consulta en un hilo al
+preparar, al empezar y al terminar cada descanso, y el resultado vuelve
+por un ``control.Buzon``. Mientras tanto se usa la última geometría
+conocida; si al llegar la respuesta los monitores cambiaron (p.ej. se
+conectó uno), las ventanas se reconstruyen, también con el descanso en
+pantalla.
+
+Desde el inicio del descanso hasta que todas las ventanas se han
+dibujado se mide el tiempo: se guarda en ``ultima_latencia_ms`` y, con
+``--profile``, va al informe del aviso.
+"""
 
 from __future__ import annotations
 
+import re
+import threading
+import time
 import tkinter as tk
-from datetime import datetime, timedelta
 from typing import Callable
 
+from . import control
+from . import perfil
+from .constantes import PLAZO_AYUDANTE_S
+from .planificador import POLITICA_UNA_VEZ, Planificador, hasta_proximo_segundo
+from .procesos import supervisor
+
+_COLOR_FONDO = "#1e293b"
+
+# "1: +HDMI-1 2560/597x1440/336+1920+0  HDMI-1"
+_PATRON_MONITOR = re.compile(r"(\d+)/\d+x(\d+)/\d+\+(-?\d+)\+(-?\d+)")
+
+
+Geometria = tuple[int, int, int, int]
+
+
+def monitores() -> list[Geometria]:
+    """Geometría (ancho, alto, x, y) de cada monitor; el principal primero.
+
+    Ejecuta ``xrandr`` y espera su respuesta: no llamar desde el hilo de
+    Tk. Lista vacía si no hay ``xrandr`` o no informa de ningún monitor.
+    """
+    salida = supervisor.ejecutar(["xrandr", "--listmonitors"], PLAZO_AYUDANTE_S)
+    encontrados: list[Geometria] = []
+    for linea in (salida or b"").decode(errors="replace").splitlines()[1:]:
+        coincidencia = _PATRON_MONITOR.search(linea)
+        if coincidencia is None:
+            continue
+        geometria = tuple(int(g) for g in coincidencia.groups())
+        if "*" in linea.split()[1]:
+            encontrados.insert(0, geometria)
+        else:
+            encontrados.append(geometria)
+    return encontrados
+
 
 class VentanaDescanso:
-    """Muestra una ventana fullscreen con cuenta atrás durante el descanso."""
+    """Ventanas fullscreen reutilizables con cuenta atrás para el descanso."""
 
-    def __init__(
-        self,
-        ventana_padre: tk.Tk,
-        minutos_descanso: int,
-        al_finalizar: Callable[[], None],
-    ) -> None:
-        self._al_finalizar = al_finalizar
-        self._trabajo_reloj: str | None = None
+    def __init__(self, ventana_padre: tk.Tk, planificador: Planificador) -> None:
+        self._padre = ventana_padre
+        self._planificador = planificador
+        self._al_finalizar: Callable[[bool], None] | None = None
+
+        self._ventanas: list[tk.Toplevel] = []
+        # Geometrías con las que se construyeron las ventanas y las últimas
+        # que devolvió xrandr (None hasta la primera respuesta)
+        self._geometrias: list[Geometria] = []
+        self._monitores: list[Geometria] | None = None
+        self._buzon = control.Buzon(ventana_padre.tk)
+        self._consultando = False
+        self._repetir_consulta = False
+        self._cerrojo_consulta = threading.Lock()
+        self._var_cuenta = tk.StringVar(master=ventana_padre)
+        self._texto_cuenta = ""
+
+        # Medición de la latencia de aparición
+        self._inicio: float | None = None
+        self._pendientes: set[tk.Toplevel] = set()
+        self.ultima_latencia_ms: float | None = None
+
+    @property
+    def visible(self) -> bool:
+        return self._al_finalizar is not None
+
+    # ── Construcción ──────────────────────────────────────────────
 
-        self.ventana = tk.Toplevel(ventana_padre)
-        self.ventana.title("☕ Descanso")
-        self.ventana.configure(bg="#1e293b")
-        self.ventana.attributes("-fullscreen", True)
-        self.ventana.attributes("-topmost", True)
+    def preparar(self) -> None:
+        """Construye las ventanas ocultas y pide en segundo plano los monitores."""
+        self._consultar_monitores()
+        self._reconstruir()
+
+    def _geometrias_actuales(self) -> list[Geometria]:
+        if self._monitores:
+            return self._monitores
+        # Sin respuesta de xrandr: toda la pantalla como un único monitor
+        ancho, alto = self._padre.winfo_screenwidth(), self._padre.winfo_screenheight()
+        return [(ancho, alto, 0, 0)]
+
+    def _reconstruir(self) -> None:
+        """Vuelve a construir las ventanas si faltan o cambiaron los monitores."""
+        geometrias = self._geometrias_actuales()
+        if self._ventanas and geometrias == self._geometrias:
+            return
+        for ventana in self._ventanas:
+            ventana.destroy()
+        self._geometrias = geometrias
+        self._ventanas = [self._construir(*geometria) for geometria in geometrias]
+        if self.visible:
+            self._pendientes = set(self._ventanas)
+            for ventana in self._ventanas:
+                ventana.deiconify()
+                ventana.lift()
+            self._ventanas[0].focus_force()
+
+    def _consultar_monitores(self) -> None:
+        """Lanza ``xrandr`` en un hilo; la respuesta llega por el buzón."""
+        with self._cerrojo_consulta:
+            if self._consultando:
+                self._repetir_consulta = True
+                return
+            self._consultando = True
+        threading.Thread(target=self._hilo_monitores, daemon=True).start()
+
+    def _hilo_monitores(self) -> None:
+        while True:
+            encontrados = monitores()
+            with self._cerrojo_consulta:
+                if not self._repetir_consulta:
+                    self._consultando = False
+                    break
+                self._repetir_consulta = False
+        self._buzon.llamar(lambda: self._al_conocer_monitores(encontrados))
+
+    def _al_conocer_monitores(self, encontrados: list[Geometria]) -> None:
+        self._monitores = encontrados
+        if self._ventanas:
+            self._reconstruir()
+
+    def _construir(self, ancho: int, alto: int, x: int, y: int) -> tk.Toplevel:
+        ventana = tk.Toplevel(self._padre)
+        ventana.withdraw()
+        ventana.title("☕ Descanso")
+        ventana.configure(bg=_COLOR_FONDO)
+        # El gestor de ventanas pone a pantalla completa en el monitor
+        # donde está la ventana
+        ventana.geometry(f"{ancho}x{alto}+{x}+{y}")
+        ventana.attributes("-fullscreen", True)
+        ventana.attributes("-topmost", True)
 
         # Evitar que se cierre con Alt+F4 (debe esperar al fin del descanso)
-        self.ventana.protocol("WM_DELETE_WINDOW", lambda: None)
+        ventana.protocol("WM_DELETE_WINDOW", lambda: None)
 
         # Permitir cerrar con Escape si el usuario realmente quiere saltarse el descanso
-        self.ventana.bind("<Escape>", lambda _e: self._cerrar_anticipado())
+        ventana.bind("<Escape>", lambda _e: self._cerrar_anticipado())
+        ventana.bind("<Expose>", self._al_dibujar)
 
         # ── Contenido centrado ─────────────────────────────────────
 
-        marco = tk.Frame(self.ventana, bg="#1e293b")
+        marco = tk.Frame(ventana, bg=_COLOR_FONDO)
         marco.place(relx=0.5, rely=0.5, anchor="center")
 
         tk.Label(
             marco,
             text="☕",
             font=("Sans", 72),
-            bg="#1e293b",
+            bg=_COLOR_FONDO,
             fg="#ffffff",
         ).pack(pady=(0, 10))
 
@@ -48,7 +178,7 @@ class VentanaDescanso:
             marco,
             text="¡Hora de descansar!",
             font=("Sans", 36, "bold"),
-            bg="#1e293b",
+            bg=_COLOR_FONDO,
             fg="#ffffff",
         ).pack(pady=(0, 8))
 
@@ -56,16 +186,15 @@ class VentanaDescanso:
             marco,
             text="Levántate, estira las piernas y descansa la vista.",
             font=("Sans", 16),
-            bg="#1e293b",
+            bg=_COLOR_FONDO,
             fg="#94a3b8",
         ).pack(pady=(0, 30))
 
-        self._var_cuenta = tk.StringVar()
         tk.Label(
             marco,
             textvariable=self._var_cuenta,
             font=("Sans", 48, "bold"),
-            bg="#1e293b",
+            bg=_COLOR_FONDO,
             fg="#38bdf8",
         ).pack(pady=(0, 30))
 
@@ -73,41 +202,91 @@ class VentanaDescanso:
             marco,
             text="Pulsa Escape para saltar el descanso",
             font=("Sans", 11),
-            bg="#1e293b",
+            bg=_COLOR_FONDO,
             fg="#475569",
         ).pack()
+        return ventana
+
+    # ── Mostrar y ocultar ─────────────────────────────────────────
 
-        # ── Cuenta atrás ──────────────────────────────────────────
+    def mostrar(
+        self, minutos_descanso: int, al_finalizar: Callable[[bool], None]
+    ) -> None:
+        """Muestra las ventanas y empieza la cuenta atrás del descanso.
+
+        Al terminar se llama a *al_finalizar* con True si se saltó.
+        """
+        self._inicio = time.perf_counter()
+        self._al_finalizar = al_finalizar
+        self._reconstruir()
+        # Por si se conectó o desconectó un monitor desde la última consulta
+        self._consultar_monitores()
 
-        self._fin = datetime.now() + timedelta(minutes=minutos_descanso)
+        # Si el descanso termina durante una suspensión, se cierra al volver
+        self._planificador.programar(
+            "descanso", minutos_descanso * 60, self._cerrar, politica=POLITICA_UNA_VEZ
+        )
+        self._texto_cuenta = ""
         self._actualizar_cuenta()
 
-    def _actualizar_cuenta(self) -> None:
-        restante = self._fin - datetime.now()
-        total_seg = max(0, int(restante.total_seconds()))
-        minutos, segundos = divmod(total_seg, 60)
-        self._var_cuenta.set(f"{minutos:02d}:{segundos:02d}")
+        self._pendientes = set(self._ventanas)
+        for ventana in self._ventanas:
+            ventana.deiconify()
+            ventana.lift()
+        self._ventanas[0].focus_force()
 
-        if total_seg <= 0:
-            self._cerrar()
+    def _al_dibujar(self, evento: tk.Event) -> None:
+        if evento.widget not in self._pendientes:
             return
+        self._pendientes.discard(evento.widget)
+        if self._pendientes or self._inicio is None:
+            return
+        inicio, self._inicio = self._inicio, None
+        self.ultima_latencia_ms = (time.perf_counter() - inicio) * 1000
+        perfil.anotar("ventana_descanso.visible", inicio)
 
-        self._trabajo_reloj = self.ventana.after(1000, self._actualizar_cuenta)
+    def _actualizar_cuenta(self) -> None:
+        restante = self._planificador.restante("descanso")
+        if restante is None:
+            return
+        minutos, segundos = divmod(int(restante), 60)
+        texto = f"{minutos:02d}:{segundos:02d}"
+        if texto != self._texto_cuenta:
+            self._texto_cuenta = texto
+            self._var_cuenta.set(texto)
+        # Tick alineado con el cambio de segundo
+        self._planificador.programar(
+            "descanso_reloj",
+            hasta_proximo_segundo(restante),
+            self._actualizar_cuenta,
+            politica=POLITICA_UNA_VEZ,
+        )
 
-    def _cerrar(self) -> None:
-        if self._trabajo_reloj is not None:
-            self.ventana.after_cancel(self._trabajo_reloj)
-            self._trabajo_reloj = None
-        self.ventana.destroy()
-        self._al_finalizar()
+    def _cerrar(self, saltado: bool = False) -> None:
+        al_finalizar = self._al_finalizar
+        self.cerrar()
+        # Deja la geometría al día para el próximo descanso
+        self._consultar_monitores()
+        if al_finalizar is not None:
+            al_finalizar(saltado)
 
     def cerrar(self) -> None:
-        """Cierra la ventana desde fuera (p.ej. al detener el temporizador)."""
-        if self._trabajo_reloj is not None:
-            self.ventana.after_cancel(self._trabajo_reloj)
-            self._trabajo_reloj = None
-        self.ventana.destroy()
+        """Oculta las ventanas desde fuera (p.ej. al detener el temporizador)."""
+        self._planificador.cancelar("descanso", "descanso_reloj")
+        self._al_finalizar = None
+        self._inicio = None
+        self._pendientes = set()
+        for ventana in self._ventanas:
+            ventana.withdraw()
+
+    def destruir(self) -> None:
+        """Libera las ventanas (al salir de la aplicación)."""
+        self.cerrar()
+        for ventana in self._ventanas:
+            ventana.destroy()
+        self._ventanas = []
+        self._buzon.cerrar()
 
     def _cerrar_anticipado(self) -> None:
         """El usuario pulsa Escape para saltarse el descanso."""
-        self._cerrar()
+        self._cerrar(saltado=True)
@@ -0,0 +1,18 @@
+"""Configuración común de las pruebas.
+
+``constantes`` calcula sus rutas a partir de ``$HOME`` al importarse, así
+que antes de importar nada de ``src`` se apunta ``HOME`` a un directorio
+temporal: las pruebas nunca tocan la configuración real del usuario.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_HOME = tempfile.mkdtemp(prefix="estira-pruebas-")
+os.environ["HOME"] = _HOME
+os.environ.pop("XDG_STATE_HOME", None)
+os.environ.pop("XDG_CONFIG_HOME", None)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,72 @@
+"""Servicio ``org.freedesktop.Notifications`` simulado para las pruebas.
+
+Se lanza con ``dbus-run-session -- python stub_notificaciones.py``:
+escribe en la salida la dirección de su bus de sesión y, por cada
+``Notify`` recibido, una línea ``<replaces_id> <id> <resumen>``. Los ids
+se reparten desde 1; si el resumen es ``fallar`` responde con un error.
+"""
+
+import os
+import sys
+
+from gi.repository import Gio, GLib
+
+_XML = """
+<node>
+  <interface name="org.freedesktop.Notifications">
+    <method name="Notify">
+      <arg type="s" direction="in"/>
+      <arg type="u" direction="in"/>
+      <arg type="s" direction="in"/>
+      <arg type="s" direction="in"/>
+      <arg type="s" direction="in"/>
+      <arg type="as" direction="in"/>
+      <arg type="a{sv}" direction="in"/>
+      <arg type="i" direction="in"/>
+      <arg type="u" direction="out"/>
+    </method>
+  </interface>
+</node>
+"""
+
+_siguiente = [1]
+
+
+def _al_llamar(_con, _emisor, _ruta, _interfaz, _metodo, parametros, invocacion):
+    _app, sustituye, _icono, resumen, _cuerpo, _acc, _pistas, _plazo = (
+        parametros.unpack()
+    )
+    if resumen == "fallar":
+        print(f"{sustituye} 0 {resumen}", flush=True)
+        invocacion.return_dbus_error("org.freedesktop.DBus.Error.Failed", "simulado")
+        return
+    identificador = sustituye or _siguiente[0]
+    if not sustituye:
+        _siguiente[0] += 1
+    print(f"{sustituye} {identificador} {resumen}", flush=True)
+    invocacion.return_value(GLib.Variant("(u)", (identificador,)))
+
+
+def principal() -> None:
+    conexion = Gio.bus_get_sync(Gio.BusType.SESSION, None)
+    interfaz = Gio.DBusNodeInfo.new_for_xml(_XML).interfaces[0]
+    conexion.register_object_with_closures(
+        "/org/freedesktop/Notifications", interfaz, _al_llamar, None, None
+    )
+    conexion.call_sync(
+        "org.freedesktop.DBus",
+        "/org/freedesktop/DBus",
+        "org.freedesktop.DBus",
+        "RequestName",
+        GLib.Variant("(su)", ("org.freedesktop.Notifications", 0)),
+        GLib.VariantType.new("(u)"),
+        Gio.DBusCallFlags.NONE,
+        -1,
+        None,
+    )
+    print(os.environ["DBUS_SESSION_BUS_ADDRESS"], flush=True)
+    GLib.MainLoop().run()
+
+
+if __name__ == "__main__":
+    sys.exit(principal())
@@ -0,0 +1,68 @@
+"""Pruebas del análisis por lotes del historial de eventos."""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from src.analisis import Analizador, calcular
+from src.constantes import SEMANAS_MEDIA
+from src.historial import (
+    RESULTADO_COMPLETADO,
+    RESULTADO_SALTADO,
+    TIPO_AVISO,
+    TIPO_DESCANSO,
+    Historial,
+)
+
+
+@pytest.fixture
+def historial(tmp_path):
+    h = Historial(tmp_path / "historial.bin", tmp_path / "historial.cola")
+    yield h
+    h.cerrar()
+
+
+def _marca(dia: date, hora: int, minuto: int = 0) -> float:
+    return datetime.combine(dia, time(hora, minuto)).timestamp()
+
+
+def test_cifras_del_historial(historial):
+    hoy = date(2024, 6, 12)
+    lunes = hoy - timedelta(days=hoy.weekday())
+    # Dos avisos por semana en las semanas que promedia, a las 9 y a las 11
+    for semana in range(SEMANAS_MEDIA, 0, -1):
+        dia = lunes - timedelta(weeks=semana)
+        historial.anotar(TIPO_AVISO, _marca(dia, 9))
+        historial.anotar(TIPO_AVISO, _marca(dia, 11))
+    # Esta semana no cuenta para la media
+    historial.anotar(TIPO_AVISO, _marca(lunes, 10, 30))
+    historial.anotar(TIPO_DESCANSO, _marca(lunes, 12), 300, RESULTADO_COMPLETADO)
+    historial.anotar(TIPO_DESCANSO, _marca(lunes, 13), 60, RESULTADO_SALTADO)
+
+    resumen = calcular(historial, hoy)
+    assert resumen.media_semanal == pytest.approx(2.0)
+    assert resumen.por_hora[9] == resumen.por_hora[11] == SEMANAS_MEDIA
+    assert resumen.por_hora[10] == 1
+    assert sum(resumen.por_hora) == 2 * SEMANAS_MEDIA + 1
+    # Los descansos no cuentan como avisos ni como huecos
+    assert resumen.separacion_media_min == pytest.approx(120.0)
+    assert resumen.descansos == 2
+    assert resumen.tasa_saltos == pytest.approx(0.5)
+
+
+def test_historial_vacio(historial):
+    resumen = calcular(historial, date(2024, 6, 12))
+    assert resumen.media_semanal == 0
+    assert resumen.por_hora == (0,) * 24
+    assert resumen.separacion_media_min is None
+    assert resumen.tasa_saltos is None
+
+
+def test_resumen_en_cache_hasta_el_siguiente_evento(historial):
+    analizador = Analizador(historial)
+    primero = analizador.resumen()
+    assert analizador.resumen() is primero
+    historial.anotar(TIPO_AVISO, datetime.now().timestamp())
+    segundo = analizador.resumen()
+    assert segundo is not primero
+    assert sum(segundo.por_hora) == 1
@@ -0,0 +1,55 @@
+"""Pruebas de la ventana principal: pestañas construidas bajo demanda."""
+
+import json
+import shutil
+
+import pytest
+
+from src import perfil
+from src.constantes import RUTA_DIRECTORIO_CONFIG
+
+tk = pytest.importorskip("tkinter")
+
+
+@pytest.fixture
+def ventana():
+    shutil.rmtree(RUTA_DIRECTORIO_CONFIG, ignore_errors=True)
+    try:
+        raiz = tk.Tk()
+    except tk.TclError:
+        pytest.skip("sin pantalla para Tk")
+    yield raiz
+    shutil.rmtree(RUTA_DIRECTORIO_CONFIG, ignore_errors=True)
+
+
+@pytest.fixture
+def perfilando(tmp_path, monkeypatch):
+    for nombre in ("activo", "_ruta", "_informe", "_seccion"):
+        monkeypatch.setattr(perfil, nombre, getattr(perfil, nombre))
+    ruta = tmp_path / "perfil.json"
+    perfil.activar(str(ruta))
+    return ruta
+
+
+def test_pestanas_bajo_demanda(ventana, perfilando, capsys):
+    from src.aplicacion import AplicacionRecordatorioEstiramiento
+
+    app = AplicacionRecordatorioEstiramiento(ventana)
+    try:
+        # Solo la pestaña visible y nada impreso al arrancar
+        assert len(app._pestanas_construidas) == 1
+        assert len(app._pestanas_pendientes) == 6
+        assert "Interfaz lista" not in capsys.readouterr().out
+
+        nombre, (tab, _) = next(iter(app._pestanas_pendientes.items()))
+        assert not tab.winfo_children()
+        tab.master.select(tab)
+        ventana.update()
+        assert nombre in app._pestanas_construidas
+        assert tab.winfo_children()
+
+        perfil.fin_arranque()
+        informe = json.loads(perfilando.read_text())
+        assert informe["arranque"]["pestanas"] == {"construidas": 1, "total": 7}
+    finally:
+        app.salir_aplicacion()
@@ -0,0 +1,175 @@
+"""Pruebas de la integración de GLib y del buzón en el bucle principal."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src import bucle_glib, introspeccion
+from src.constantes import (
+    INTERVALO_GLIB_MAX_MS,
+    INTERVALO_GLIB_MIN_MS,
+    PRESUPUESTO_ITERACIONES_GLIB,
+)
+from src.control import Buzon
+
+
+class _Contexto:
+    """``GLib.MainContext`` con una cola de fuentes y un descriptor."""
+
+    def __init__(self) -> None:
+        self.fuentes: list = []
+        self.espera_ms = -1
+        self.descriptores = [SimpleNamespace(fd=7, events=1)]
+        self.listo = False
+        self.sin_consulta = False
+
+    def acquire(self) -> bool:
+        return True
+
+    def pending(self) -> bool:
+        return bool(self.fuentes)
+
+    def iteration(self, _bloquear: bool) -> None:
+        self.fuentes.pop(0)()
+
+    def prepare(self):
+        return False, 0
+
+    def query(self, _prioridad):
+        if self.sin_consulta:
+            raise TypeError("query no está enlazado")
+        return 0, self.espera_ms, self.descriptores
+
+    def check(self, _prioridad, _descriptores) -> bool:
+        return self.listo
+
+    def dispatch(self) -> None:
+        self.listo = False
+
+
+class _Bucle:
+    """``after`` y descriptores sin Tk: los despertares los provoca la prueba."""
+
+    def __init__(self) -> None:
+        self.pendientes: dict[str, tuple[int, object]] = {}
+        self.vigilados: dict[int, int] = {}
+        self._ids = 0
+
+    def after(self, ms: int, funcion) -> str:
+        self._ids += 1
+        ident = f"after#{self._ids}"
+        self.pendientes[ident] = (ms, funcion)
+        return ident
+
+    def after_cancel(self, ident: str) -> None:
+        self.pendientes.pop(ident, None)
+
+    def createfilehandler(self, descriptor: int, mascara: int, _funcion) -> None:
+        self.vigilados[descriptor] = mascara
+
+    def deletefilehandler(self, descriptor: int) -> None:
+        del self.vigilados[descriptor]
+
+    def esperas(self) -> list[int]:
+        return [ms for ms, _ in self.pendientes.values()]
+
+    def despertar(self) -> None:
+        (ident,) = self.pendientes
+        _, funcion = self.pendientes.pop(ident)
+        funcion()
+
+
+@pytest.fixture
+def contexto(monkeypatch):
+    contexto = _Contexto()
+    glib = SimpleNamespace(MainContext=SimpleNamespace(default=lambda: contexto))
+    monkeypatch.setattr(introspeccion, "cargar", lambda _nombre: {"GLib": glib})
+    for nombre, valor in (
+        ("_contexto", None),
+        ("_adquirido", False),
+        ("_temporizador", None),
+        ("_trabajo", None),
+        ("_vigilados", {}),
+        ("_sondeo", False),
+    ):
+        monkeypatch.setattr(bucle_glib, nombre, valor)
+    yield contexto
+    bucle_glib.detener()
+
+
+def test_en_reposo_solo_vigila_descriptores(contexto):
+    bucle = _Bucle()
+    assert bucle_glib.iniciar(bucle)
+    assert bucle.esperas() == [0]
+    bucle.despertar()
+    # Sin plazos de GLib no queda ningún despertar periódico
+    assert bucle.vigilados == {7: bucle_glib.LEGIBLE}
+    assert bucle.esperas() == []
+
+    # Un temporizador de GLib pasa a ser un after con su espera
+    contexto.espera_ms = 250
+    contexto.fuentes.append(lambda: None)
+    bucle_glib._al_despertar(7, bucle_glib.LEGIBLE)
+    assert not contexto.fuentes
+    assert bucle.esperas() == [250]
+
+    bucle_glib.detener()
+    assert bucle.vigilados == {}
+    assert bucle.esperas() == []
+
+
+def test_reparte_el_trabajo_por_presupuesto(contexto):
+    bucle = _Bucle()
+    bucle_glib.iniciar(bucle)
+    atendidas = []
+    for i in range(PRESUPUESTO_ITERACIONES_GLIB + 5):
+        contexto.fuentes.append(lambda i=i: atendidas.append(i))
+    bucle.despertar()
+    assert len(atendidas) == PRESUPUESTO_ITERACIONES_GLIB
+    # Sigue enseguida, dejando antes pasar los eventos de Tk
+    assert bucle.esperas() == [0]
+    bucle.despertar()
+    assert len(atendidas) == PRESUPUESTO_ITERACIONES_GLIB + 5
+    assert bucle.esperas() == []
+
+
+def test_sin_descriptores_sondea_cada_vez_menos(contexto, capsys):
+    contexto.sin_consulta = True
+    bucle = _Bucle()
+    bucle_glib.iniciar(bucle)
+    bucle.despertar()
+    assert "Aviso: GLib no permite vigilar" in capsys.readouterr().out
+    esperas = []
+    for _ in range(6):
+        esperas.extend(bucle.esperas())
+        bucle.despertar()
+    assert esperas[0] == INTERVALO_GLIB_MIN_MS
+    assert esperas == sorted(esperas)
+    assert esperas[-1] == INTERVALO_GLIB_MAX_MS
+    # Con actividad vuelve al intervalo mínimo
+    contexto.fuentes.append(lambda: None)
+    bucle.despertar()
+    assert bucle.esperas() == [INTERVALO_GLIB_MIN_MS]
+
+
+def test_buzon_lleva_llamadas_al_hilo_de_tcl():
+    tkinter = pytest.importorskip("tkinter")
+    interprete = tkinter.Tcl()
+    buzon = Buzon(interprete.tk)
+    hilos = []
+    try:
+        threading.Thread(
+            target=buzon.llamar, args=(lambda: hilos.append(threading.get_ident()),)
+        ).start()
+        limite = time.monotonic() + 10
+        while not hilos and time.monotonic() < limite:
+            interprete.tk.dooneevent(tkinter._tkinter.DONT_WAIT)
+            time.sleep(0.01)
+    finally:
+        buzon.cerrar()
+    assert hilos == [threading.get_ident()]
+    # Cerrado, las llamadas se descartan sin error
+    buzon.llamar(lambda: hilos.append(None))
+    assert hilos == [threading.get_ident()]
@@ -0,0 +1,69 @@
+"""Pruebas del guardado atómico y agrupado de la configuración."""
+
+import shutil
+import threading
+
+import pytest
+
+from src import config
+from src.constantes import RUTA_DIRECTORIO_CONFIG
+
+
+@pytest.fixture
+def config_vacia():
+    shutil.rmtree(RUTA_DIRECTORIO_CONFIG, ignore_errors=True)
+    yield
+    shutil.rmtree(RUTA_DIRECTORIO_CONFIG, ignore_errors=True)
+
+
+@pytest.fixture
+def escrituras(monkeypatch):
+    """Sustituye ``guardar`` y avisa de cada escritura."""
+    hechas: list[dict] = []
+    evento = threading.Event()
+
+    def guardar(datos: dict) -> None:
+        hechas.append(datos)
+        evento.set()
+
+    monkeypatch.setattr(config, "guardar", guardar)
+    return hechas, evento
+
+
+def test_guardar_es_atomico(config_vacia):
+    config.guardar({"minutos": 30})
+    assert config.cargar() == {"minutos": 30}
+    with pytest.raises(TypeError):
+        # Falla a mitad de serializar: el archivo anterior sigue intacto
+        config.guardar({"minutos": object()})
+    assert config.cargar() == {"minutos": 30}
+
+
+def test_sin_cambios_no_escribe(escrituras):
+    hechas, _ = escrituras
+    guardado = config.GuardadoDiferido({"minutos": 30}, retardo=0)
+    assert guardado.campos_modificados({"minutos": 30}) == set()
+    guardado.programar({"minutos": 30})
+    guardado.vaciar()
+    assert hechas == []
+
+
+def test_agrupa_una_rafaga_en_una_escritura(escrituras):
+    hechas, evento = escrituras
+    guardado = config.GuardadoDiferido({"minutos": 30}, retardo=0.05)
+    for minutos in (31, 32, 33):
+        guardado.programar({"minutos": minutos, "sonido": True})
+    assert guardado.campos_modificados({"minutos": 33}) == {"sonido"}
+    assert evento.wait(5)
+    guardado.vaciar()
+    assert hechas == [{"minutos": 33, "sonido": True}]
+    # Lo escrito pasa a ser la referencia
+    assert guardado.campos_modificados({"minutos": 33, "sonido": True}) == set()
+
+
+def test_vaciar_escribe_lo_pendiente_al_momento(escrituras):
+    hechas, _ = escrituras
+    guardado = config.GuardadoDiferido({}, retardo=60)
+    guardado.programar({"minutos": 45})
+    guardado.vaciar()
+    assert hechas == [{"minutos": 45}]
@@ -0,0 +1,109 @@
+"""Pruebas de la instancia única y del socket de control."""
+
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src import control
+
+_RAIZ = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def ejecucion(tmp_path, monkeypatch):
+    """``$XDG_RUNTIME_DIR`` temporal, también para los procesos hijos."""
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setattr(control, "RUTA_SOCKET", tmp_path / "estira-las-piernas.sock")
+    monkeypatch.setattr(control, "RUTA_CERROJO", tmp_path / "estira-las-piernas.lock")
+    return tmp_path
+
+
+def _servidor(ordenes: list[str]) -> control.ServidorControl:
+    servidor = control.ServidorControl()
+    assert servidor.adquirir()
+
+    def atender(orden: str) -> str:
+        ordenes.append(orden)
+        return f"hecho: {orden}"
+
+    servidor.iniciar(atender, lambda funcion: funcion())
+    return servidor
+
+
+def test_ordenes_por_el_socket(ejecucion):
+    assert control.enviar("estado") is None
+    ordenes: list[str] = []
+    servidor = _servidor(ordenes)
+    try:
+        assert control.enviar("estado") == "hecho: estado"
+        assert control.enviar("bailar") == "error: orden desconocida 'bailar'"
+        assert ordenes == ["estado"]
+        # Otra instancia no puede quedarse con el cerrojo
+        assert not control.ServidorControl().adquirir()
+    finally:
+        servidor.cerrar()
+    assert not control.RUTA_SOCKET.exists()
+
+
+def test_segundo_lanzamiento_reenvia_y_termina(ejecucion):
+    ordenes: list[str] = []
+    servidor = _servidor(ordenes)
+    try:
+        for argumentos, esperada in (
+            (["--headless"], "estado"),
+            (["toggle"], "alternar"),
+        ):
+            resultado = subprocess.run(
+                [sys.executable, str(_RAIZ / "estira_las_piernas.py"), *argumentos],
+                cwd=_RAIZ,
+                capture_output=True,
+                text=True,
+                timeout=30,
+            )
+            assert resultado.returncode == 0, resultado.stderr
+            assert resultado.stdout.strip() == f"hecho: {esperada}"
+    finally:
+        servidor.cerrar()
+    assert ordenes == ["estado", "alternar"]
+
+
+def _instancia_que_muere() -> None:
+    servidor = control.ServidorControl()
+    servidor.adquirir()
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+def test_recupera_el_socket_de_una_instancia_muerta(ejecucion):
+    proceso = multiprocessing.get_context("fork").Process(target=_instancia_que_muere)
+    proceso.start()
+    proceso.join(30)
+    assert proceso.exitcode == -signal.SIGKILL
+    # Quedan el socket y el cerrojo, pero nadie escucha
+    assert control.RUTA_SOCKET.exists()
+    assert control.enviar("estado") is None
+
+    ordenes: list[str] = []
+    servidor = _servidor(ordenes)
+    try:
+        assert control.enviar("mostrar") == "hecho: mostrar"
+    finally:
+        servidor.cerrar()
+
+
+def test_rechaza_a_otro_usuario(ejecucion, monkeypatch):
+    ordenes: list[str] = []
+    servidor = _servidor(ordenes)
+    try:
+        uid = os.getuid()
+        # Visto desde el servidor, el cliente es de otro usuario
+        monkeypatch.setattr(control.os, "getuid", lambda: uid + 1)
+        respuesta = control.enviar("detener")
+    finally:
+        servidor.cerrar()
+    assert respuesta is not None and respuesta.startswith("error: otro usuario")
+    assert ordenes == []
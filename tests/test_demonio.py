@@ -0,0 +1,137 @@
+"""Pruebas del modo ``--headless`` y de su bucle sin Tk."""
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src import bucle_glib, control
+from src.demonio import BucleSinTk
+
+_RAIZ = Path(__file__).resolve().parent.parent
+
+
+def _ejecutar(bucle: BucleSinTk) -> None:
+    """Atiende el bucle en otro hilo para no colgar la prueba si falla."""
+    hilo = threading.Thread(target=bucle.ejecutar, daemon=True)
+    hilo.start()
+    hilo.join(10)
+    assert not hilo.is_alive()
+
+
+def test_temporizadores_en_orden_y_cancelados():
+    bucle = BucleSinTk()
+    orden = []
+    bucle.after(30, orden.append, "a")
+    bucle.after(10, orden.append, "b")
+    bucle.after_cancel(bucle.after(20, orden.append, "cancelado"))
+    bucle.after(40, bucle.detener)
+    _ejecutar(bucle)
+    assert orden == ["b", "a"]
+
+
+def test_llamadas_desde_otro_hilo_lo_despiertan():
+    bucle = BucleSinTk()
+    hilos = []
+
+    def llamada() -> None:
+        hilos.append(threading.get_ident())
+        bucle.detener()
+
+    # Sin temporizadores el bucle espera sin límite: solo lo despierta la tubería
+    threading.Timer(0.05, bucle.llamar, (llamada,)).start()
+    _ejecutar(bucle)
+    assert len(hilos) == 1 and hilos[0] != threading.get_ident()
+
+
+def test_vigila_descriptores():
+    bucle = BucleSinTk()
+    lectura, escritura = os.pipe()
+    leido = []
+
+    def al_leer(descriptor: int, mascara: int) -> None:
+        leido.append((os.read(descriptor, 16), mascara))
+        bucle.deletefilehandler(descriptor)
+        bucle.detener()
+
+    bucle.createfilehandler(lectura, bucle_glib.LEGIBLE, al_leer)
+    threading.Timer(0.05, os.write, (escritura, b"hola")).start()
+    _ejecutar(bucle)
+    os.close(lectura)
+    os.close(escritura)
+    assert leido == [(b"hola", bucle_glib.LEGIBLE)]
+
+
+def test_una_senal_en_otro_hilo_lo_despierta():
+    bucle = BucleSinTk()
+    recibidas = []
+
+    def al_recibir(numero, _marco) -> None:
+        recibidas.append(numero)
+        bucle.detener()
+
+    anterior = signal.signal(signal.SIGUSR1, al_recibir)
+    # El núcleo puede entregar la señal a cualquier hilo (p.ej. el del socket)
+    otro = threading.Timer(
+        0.05, lambda: signal.pthread_kill(threading.get_ident(), signal.SIGUSR1)
+    )
+    respaldo = threading.Timer(10, bucle.llamar, (bucle.detener,))
+    otro.start()
+    respaldo.start()
+    inicio = time.monotonic()
+    try:
+        bucle.ejecutar()
+    finally:
+        respaldo.cancel()
+        signal.signal(signal.SIGUSR1, anterior)
+    assert recibidas == [signal.SIGUSR1]
+    assert time.monotonic() - inicio < 5
+
+
+def test_importar_el_demonio_no_carga_tk():
+    resultado = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, src.demonio; print('tkinter' in sys.modules)",
+        ],
+        cwd=_RAIZ,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert resultado.stdout.strip() == "False", resultado.stderr
+
+
+@pytest.fixture
+def ejecucion(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.delenv("DISPLAY", raising=False)
+    monkeypatch.delenv("WAYLAND_DISPLAY", raising=False)
+    monkeypatch.setattr(control, "RUTA_SOCKET", tmp_path / "estira-las-piernas.sock")
+    return tmp_path
+
+
+def test_headless_arranca_sin_pantalla(ejecucion):
+    proceso = subprocess.Popen(
+        [sys.executable, str(_RAIZ / "estira_las_piernas.py"), "--headless"],
+        cwd=_RAIZ,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        respuesta = control.enviar("estado", espera=20)
+        assert respuesta is not None and "Próximo aviso" in respuesta
+        assert control.enviar("detener") == "Recordatorio detenido"
+    finally:
+        proceso.send_signal(signal.SIGTERM)
+        salida, _ = proceso.communicate(timeout=10)
+    assert proceso.returncode == 0, salida
+    assert not control.RUTA_SOCKET.exists()
@@ -0,0 +1,205 @@
+"""Pruebas de las estadísticas diarias: diario, consolidación y varios procesos."""
+
+import json
+import multiprocessing
+import random
+import shutil
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from src import estadisticas as modulo
+from src.constantes import (
+    RUTA_ARCHIVO_ESTADISTICAS,
+    RUTA_DIARIO_ESTADISTICAS,
+    RUTA_DIRECTORIO_CONFIG,
+)
+from src.estadisticas import AlmacenJSON, Estadisticas, clave_mes, inicio_detalle
+
+
+@pytest.fixture
+def config_vacia():
+    shutil.rmtree(RUTA_DIRECTORIO_CONFIG, ignore_errors=True)
+    RUTA_DIRECTORIO_CONFIG.mkdir(parents=True)
+    yield
+    shutil.rmtree(RUTA_DIRECTORIO_CONFIG, ignore_errors=True)
+
+
+def _escribir_dias(desde: date, hasta: date) -> dict[str, int]:
+    """Guarda un estadisticas.json con pausas aleatorias; devuelve el detalle."""
+    aleatorio = random.Random(7)
+    pausas = {}
+    dia = desde
+    while dia <= hasta:
+        if aleatorio.random() < 0.8:
+            pausas[dia.isoformat()] = aleatorio.randint(1, 9)
+        dia += timedelta(days=1)
+    dias = {
+        iso: {"pausas": n, "primera": "09:00", "ultima": "17:00"}
+        for iso, n in pausas.items()
+    }
+    RUTA_ARCHIVO_ESTADISTICAS.write_text(json.dumps({"dias": dias}))
+    return pausas
+
+
+def _suma(pausas: dict[str, int], desde: date, hasta: date) -> int:
+    desde_iso, hasta_iso = desde.isoformat(), hasta.isoformat()
+    return sum(n for iso, n in pausas.items() if desde_iso <= iso <= hasta_iso)
+
+
+def test_rangos_sobre_dias_consolidados(config_vacia):
+    hoy = date.today()
+    pausas = _escribir_dias(hoy - timedelta(days=500), hoy)
+    estadisticas = Estadisticas("json", retencion_dias=60)
+    limite = inicio_detalle(estadisticas.datos)
+    assert limite is not None and limite < hoy - timedelta(days=60)
+
+    dia = hoy - timedelta(days=500)
+    while dia <= hoy:
+        lunes = dia - timedelta(days=dia.weekday())
+        assert estadisticas.pausas_semana(dia) == _suma(
+            pausas, lunes, lunes + timedelta(days=6)
+        )
+        inicio = dia.replace(day=1)
+        fin = (inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        assert estadisticas.pausas_mes(dia) == _suma(pausas, inicio, fin)
+        dia += timedelta(days=7)
+
+    # Meses completos seguidos del detalle
+    desde = (hoy - timedelta(days=400)).replace(day=1)
+    assert estadisticas.pausas_en_rango(desde, hoy) == _suma(pausas, desde, hoy)
+    assert estadisticas.pausas_totales() == sum(pausas.values())
+
+    # Sin alinear con meses ni semanas no hay respuesta exacta
+    lunes_antiguo = limite - timedelta(days=60 + limite.weekday())
+    assert estadisticas.pausas_en_rango(lunes_antiguo + timedelta(days=1), hoy) is None
+    assert estadisticas.pausas_por_dia(lunes_antiguo, hoy) is None
+    assert estadisticas.pausas_por_dia(limite, hoy) is not None
+    estadisticas.cerrar()
+
+
+def _escritor(proceso: int, n: int, listo) -> None:
+    almacen = AlmacenJSON()
+    datos = almacen.cargar()
+    dia = date.today() - timedelta(days=proceso)
+    listo.wait()
+    for i in range(n):
+        almacen.registrar(datetime.combine(dia, time(8, 0, i)))
+        if i % 10 == 9:
+            # Compactar mientras los demás siguen anexando
+            almacen.guardar(datos)
+
+
+def test_varios_procesos_suman_sus_pausas(config_vacia, monkeypatch):
+    monkeypatch.setattr(modulo, "UMBRAL_COMPACTACION_DIARIO", 7)
+    contexto = multiprocessing.get_context("fork")
+    listo = contexto.Event()
+    procesos = [
+        contexto.Process(target=_escritor, args=(p, 40, listo)) for p in range(4)
+    ]
+    for proceso in procesos:
+        proceso.start()
+    listo.set()
+    for proceso in procesos:
+        proceso.join(30)
+        assert proceso.exitcode == 0
+
+    dias = AlmacenJSON().cargar()["dias"]
+    for p in range(4):
+        entrada = dias[(date.today() - timedelta(days=p)).isoformat()]
+        assert entrada["pausas"] == 40
+        assert (entrada["primera"], entrada["ultima"]) == ("08:00:00", "08:00:39")
+
+
+def test_mejor_racha_incluye_lo_consolidado(config_vacia):
+    hoy = date.today()
+    antigua = hoy - timedelta(days=400)
+    # 40 días seguidos hace más de un año y 3 hasta hoy
+    pausas = {(antigua + timedelta(days=i)).isoformat(): 1 for i in range(40)}
+    pausas.update({(hoy - timedelta(days=i)).isoformat(): 2 for i in range(3)})
+    RUTA_ARCHIVO_ESTADISTICAS.write_text(
+        json.dumps({"dias": {iso: {"pausas": n} for iso, n in pausas.items()}})
+    )
+    estadisticas = Estadisticas("json", retencion_dias=60)
+    assert antigua.isoformat() not in estadisticas.datos["dias"]
+    assert estadisticas.racha_dias() == 3
+    assert estadisticas.mejor_racha() == 40
+
+    # Otro equipo llena el hueco hasta hoy con días ya consolidados
+    otros_meses: dict = {}
+    dia = antigua + timedelta(days=40)
+    while dia < hoy - timedelta(days=2):
+        mes = otros_meses.setdefault(clave_mes(dia), {"pausas": 0, "dias": 0})
+        mes["pausas"] += 1
+        mes["dias"] |= 1 << (dia.day - 1)
+        dia += timedelta(days=1)
+    estadisticas.actualizar_remotos({}, otros_meses)
+    assert estadisticas.mejor_racha() == (hoy - antigua).days + 1
+    estadisticas.cerrar()
+
+
+def test_registrar_anexa_al_diario_y_compacta(config_vacia, monkeypatch):
+    monkeypatch.setattr(modulo, "UMBRAL_COMPACTACION_DIARIO", 3)
+    hoy = date.today()
+    RUTA_ARCHIVO_ESTADISTICAS.write_text(json.dumps({"dias": {}}))
+    almacen = AlmacenJSON()
+    almacen.cargar()
+    snapshot = RUTA_ARCHIVO_ESTADISTICAS.stat().st_mtime_ns
+    almacen.registrar(datetime.combine(hoy, time(9)))
+    almacen.registrar(datetime.combine(hoy, time(10)))
+    # Solo el diario crece; el snapshot no se reescribe
+    assert RUTA_ARCHIVO_ESTADISTICAS.stat().st_mtime_ns == snapshot
+    lineas = RUTA_DIARIO_ESTADISTICAS.read_text().splitlines()
+    assert [json.loads(linea)["h"] for linea in lineas] == ["09:00:00", "10:00:00"]
+
+    almacen.registrar(datetime.combine(hoy, time(11)))
+    assert not RUTA_DIARIO_ESTADISTICAS.exists()
+    entrada = json.loads(RUTA_ARCHIVO_ESTADISTICAS.read_text())["dias"][hoy.isoformat()]
+    assert (entrada["pausas"], entrada["ultima"]) == (3, "11:00:00")
+
+
+def test_descarta_la_linea_truncada_del_diario(config_vacia):
+    hoy = date.today()
+    almacen = AlmacenJSON()
+    almacen.cargar()
+    almacen.registrar(datetime.combine(hoy, time(9)))
+    # Cierre inesperado a mitad de escribir la segunda línea
+    with open(RUTA_DIARIO_ESTADISTICAS, "a") as f:
+        f.write('{"d":"' + hoy.isoformat())
+
+    otro = AlmacenJSON()
+    assert otro.cargar()["dias"][hoy.isoformat()]["pausas"] == 1
+    otro.registrar(datetime.combine(hoy, time(10)))
+    assert AlmacenJSON().cargar()["dias"][hoy.isoformat()]["pausas"] == 2
+
+
+def test_indice_del_dia_y_cambio_de_dia(config_vacia, monkeypatch):
+    hoy = date.today()
+    pausas = {(hoy - timedelta(days=i)).isoformat(): 1 for i in range(1, 4)}
+    RUTA_ARCHIVO_ESTADISTICAS.write_text(
+        json.dumps({"dias": {iso: {"pausas": n} for iso, n in pausas.items()}})
+    )
+    estadisticas = Estadisticas("json")
+    # Racha de ayer viva, pero hoy aún sin pausas
+    assert (estadisticas.pausas_hoy(), estadisticas.racha_dias()) == (0, 0)
+    assert estadisticas.tiempo_desde_primera_pausa_hoy() == "—"
+    estadisticas.registrar_pausa()
+    estadisticas.registrar_pausa()
+    assert (estadisticas.pausas_hoy(), estadisticas.racha_dias()) == (2, 4)
+    assert estadisticas.tiempo_desde_primera_pausa_hoy() == "0h 0m"
+
+    class Manana(date):
+        @classmethod
+        def today(cls):
+            return hoy + timedelta(days=1)
+
+    # Otro equipo ya tiene una pausa de mañana
+    estadisticas.actualizar_remotos({Manana.today().isoformat(): 1})
+    # Medianoche: el índice avanza sin volver a cargar
+    monkeypatch.setattr(modulo, "date", Manana)
+    monkeypatch.setattr(
+        estadisticas, "_reconstruir_indice", lambda: pytest.fail("recorrido")
+    )
+    assert (estadisticas.pausas_hoy(), estadisticas.racha_dias()) == (1, 5)
+    monkeypatch.undo()
+    estadisticas.cerrar()
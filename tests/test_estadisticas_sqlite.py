@@ -0,0 +1,177 @@
+"""Pruebas del almacén SQLite: importación, registro, rangos y consolidación."""
+
+import json
+import random
+import shutil
+import sqlite3
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from src.constantes import (
+    RUTA_ARCHIVO_ESTADISTICAS,
+    RUTA_BD_ESTADISTICAS,
+    RUTA_DIARIO_ESTADISTICAS,
+    RUTA_DIRECTORIO_CONFIG,
+)
+from src.estadisticas import AlmacenJSON, Estadisticas, limite_consolidacion
+from src.estadisticas_sqlite import AlmacenSQLite
+
+
+@pytest.fixture
+def config_vacia():
+    shutil.rmtree(RUTA_DIRECTORIO_CONFIG, ignore_errors=True)
+    RUTA_DIRECTORIO_CONFIG.mkdir(parents=True)
+    yield
+    shutil.rmtree(RUTA_DIRECTORIO_CONFIG, ignore_errors=True)
+
+
+def _dia_completo(dia: date) -> tuple[datetime, datetime]:
+    return datetime.combine(dia, time.min), datetime.combine(dia, time.max)
+
+
+def test_importa_el_json_sin_tocarlo(config_vacia):
+    hoy = date.today()
+    hace_tres = hoy - timedelta(days=3)
+    RUTA_ARCHIVO_ESTADISTICAS.write_text(
+        json.dumps(
+            {
+                "dias": {
+                    hace_tres.isoformat(): {
+                        "pausas": 5,
+                        "primera": "09:00:00",
+                        "ultima": "17:00:00",
+                    }
+                },
+                "meses": {"2020-01": {"pausas": 12, "dias": 0b1011}},
+                "semanas": {"2020-W02": 12},
+            }
+        )
+    )
+    RUTA_DIARIO_ESTADISTICAS.write_text(
+        "".join(
+            json.dumps({"d": hoy.isoformat(), "h": h}) + "\n"
+            for h in ("10:00:00", "11:30:00")
+        )
+    )
+    originales = (
+        RUTA_ARCHIVO_ESTADISTICAS.read_bytes(),
+        RUTA_DIARIO_ESTADISTICAS.read_bytes(),
+    )
+
+    almacen = AlmacenSQLite()
+    datos = almacen.cargar()
+    assert datos["dias"][hace_tres.isoformat()]["pausas"] == 5
+    assert datos["dias"][hoy.isoformat()] == {
+        "pausas": 2,
+        "primera": "10:00:00",
+        "ultima": "11:30:00",
+    }
+    assert datos["meses"] == {"2020-01": {"pausas": 12, "dias": 0b1011}}
+    assert datos["semanas"] == {"2020-W02": 12}
+    # Los días importados cuentan igual con ambos motores
+    json_ = AlmacenJSON()
+    json_.leer()
+    for dia in (hace_tres, hoy):
+        assert almacen.pausas_entre(*_dia_completo(dia)) == json_.pausas_entre(
+            *_dia_completo(dia)
+        )
+    assert almacen.pausas_entre(
+        datetime.combine(hace_tres, time(9)), datetime.combine(hace_tres, time(13))
+    ) == 3
+    almacen.cerrar()
+
+    assert originales == (
+        RUTA_ARCHIVO_ESTADISTICAS.read_bytes(),
+        RUTA_DIARIO_ESTADISTICAS.read_bytes(),
+    )
+    # Abrirla otra vez no importa de nuevo
+    almacen = AlmacenSQLite()
+    assert almacen.cargar()["dias"][hace_tres.isoformat()]["pausas"] == 5
+    assert almacen.pausas_entre(*_dia_completo(hace_tres)) == 5
+    almacen.cerrar()
+
+
+def test_registrar_y_consultar_por_rango(config_vacia):
+    hoy = date.today()
+    almacen = AlmacenSQLite()
+    almacen.cargar()
+    for hora in (time(9), time(12), time(18)):
+        almacen.registrar(datetime.combine(hoy, hora))
+    almacen.registrar(datetime.combine(hoy - timedelta(days=1), time(10)))
+
+    assert almacen.pausas_por_dia(hoy - timedelta(days=2), hoy) == {
+        (hoy - timedelta(days=1)).isoformat(): 1,
+        hoy.isoformat(): 3,
+    }
+    assert almacen.pausas_entre(
+        datetime.combine(hoy, time(8)), datetime.combine(hoy, time(13))
+    ) == 2
+    entrada = almacen.cargar()["dias"][hoy.isoformat()]
+    assert (entrada["primera"], entrada["ultima"]) == ("09:00:00", "18:00:00")
+    almacen.cerrar()
+
+
+def test_dos_instancias_suman_sus_pausas(config_vacia):
+    hoy = date.today()
+    una, otra = AlmacenSQLite(), AlmacenSQLite()
+    una.cargar()
+    otra.cargar()
+    assert una.registrar(datetime.combine(hoy, time(9))) is False
+    # La fila del día ya incluía la pausa de la otra instancia
+    assert otra.registrar(datetime.combine(hoy, time(10))) is True
+    assert una.registrar(datetime.combine(hoy, time(11))) is True
+    for almacen in (una, otra):
+        assert almacen.pausas_por_dia(hoy, hoy) == {hoy.isoformat(): 3}
+        almacen.cerrar()
+
+
+def test_consolida_los_meses_antiguos(config_vacia):
+    hoy = date.today()
+    aleatorio = random.Random(3)
+    pausas = {}
+    dia = hoy - timedelta(days=400)
+    while dia <= hoy:
+        if aleatorio.random() < 0.8:
+            pausas[dia.isoformat()] = aleatorio.randint(1, 9)
+        dia += timedelta(days=1)
+    RUTA_ARCHIVO_ESTADISTICAS.write_text(
+        json.dumps(
+            {
+                "dias": {
+                    iso: {"pausas": n, "primera": "09:00:00", "ultima": "17:00:00"}
+                    for iso, n in pausas.items()
+                }
+            }
+        )
+    )
+
+    for _ in range(2):
+        # La segunda carga no vuelve a sumar lo ya consolidado
+        estadisticas = Estadisticas("sqlite", retencion_dias=60)
+        limite = limite_consolidacion(60, hoy)
+        assert min(estadisticas.datos["dias"]) == min(
+            iso for iso in pausas if iso >= limite.isoformat()
+        )
+        assert estadisticas.pausas_totales() == sum(pausas.values())
+        dia = hoy - timedelta(days=400)
+        while dia <= hoy:
+            lunes = dia - timedelta(days=dia.weekday())
+            domingo = lunes + timedelta(days=6)
+            assert estadisticas.pausas_semana(dia) == sum(
+                n
+                for iso, n in pausas.items()
+                if lunes.isoformat() <= iso <= domingo.isoformat()
+            )
+            dia += timedelta(days=7)
+        assert estadisticas.pausas_entre(
+            *_dia_completo(limite - timedelta(days=1))
+        ) is None
+        estadisticas.cerrar()
+
+    conexion = sqlite3.connect(RUTA_BD_ESTADISTICAS)
+    (antiguas,) = conexion.execute(
+        "SELECT COUNT(*) FROM pausas WHERE dia < ?", (limite.isoformat(),)
+    ).fetchone()
+    conexion.close()
+    assert antiguas == 0
@@ -0,0 +1,75 @@
+"""Pruebas del registro de estado para barras de escritorio."""
+
+import json
+import shutil
+import subprocess
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.estado_panel import MAGIA, TAMANO_REGISTRO, EstadoPanel, formatear
+
+_LECTOR = Path(__file__).resolve().parent.parent / "estado_panel.sh"
+
+
+def test_registro_de_ancho_fijo():
+    registro = formatear(7, True, "T", 1_700_000_000, date(2024, 6, 12), 3, 12)
+    assert len(registro) == TAMANO_REGISTRO and registro.endswith(b"\n")
+    assert registro.split() == [
+        MAGIA.encode(), b"7", b"1", b"T", b"1700000000", b"20240612", b"3", b"12"
+    ]
+    # Los contadores enormes no desbordan el registro
+    largo = formatear(10**10 - 1, False, "S", 0, date(2024, 6, 12), 10**9, 10**9)
+    assert len(largo) == TAMANO_REGISTRO
+    assert largo.split()[-2:] == [b"99999", b"99999"]
+
+
+def test_solo_reescribe_cuando_cambia(tmp_path):
+    ruta = tmp_path / "panel.estado"
+    panel = EstadoPanel(ruta)
+    panel.publicar(True, "S", 1_700_000_000.7, 2, 5)
+    panel.publicar(True, "S", 1_700_000_000.2, 2, 5)
+    assert ruta.read_bytes().split()[1] == b"1"
+    panel.publicar(True, "S", 1_700_000_000, 3, 5)
+    campos = ruta.read_bytes().split()
+    assert (campos[1], campos[6]) == (b"2", b"3")
+
+    panel.cerrar()
+    campos = ruta.read_bytes().split()
+    assert (campos[1], campos[2], campos[4]) == (b"3", b"0", b"0")
+    assert ruta.stat().st_size == TAMANO_REGISTRO
+
+
+def _leer_con_el_script(home: Path) -> dict:
+    resultado = subprocess.run(
+        ["sh", str(_LECTOR), "--json"],
+        env={"HOME": str(home), "PATH": "/usr/bin:/bin"},
+        capture_output=True,
+        text=True,
+        timeout=10,
+        check=True,
+    )
+    return json.loads(resultado.stdout)
+
+
+@pytest.mark.skipif(shutil.which("sh") is None, reason="sin sh")
+def test_el_script_lee_el_registro(tmp_path):
+    assert _leer_con_el_script(tmp_path)["class"] == "parado"
+
+    ruta = tmp_path / ".config" / "estira-las-piernas" / "panel.estado"
+    panel = EstadoPanel(ruta)
+    panel.publicar(True, "T", time.time() + 125, 4, 9)
+    salida = _leer_con_el_script(tmp_path)
+    assert salida["class"] == "trabajo"
+    assert salida["text"] in ("🍅 02:04", "🍅 02:05")
+    assert salida["tooltip"] == "Pausas hoy: 4 · Racha: 9 días"
+    panel.cerrar()
+
+    # Un registro de otro día no cuenta sus pausas como de hoy
+    ayer = date.today() - timedelta(days=1)
+    ruta.write_bytes(formatear(1, True, "D", 0, ayer, 4, 9))
+    salida = _leer_con_el_script(tmp_path)
+    assert (salida["text"], salida["class"]) == ("☕ 00:00", "descanso")
+    assert salida["tooltip"].startswith("Pausas hoy: 0 ")
@@ -0,0 +1,148 @@
+"""Pruebas del agregado de flota: procesos, caché y archivos dañados."""
+
+import json
+import os
+import sqlite3
+from datetime import date
+
+import pytest
+
+from src import flota
+from src.flota import SIN_EQUIPO, actualizar, agregar
+
+
+def _usuario_json(directorio, dias, diario=(), meses=None, semanas=None):
+    directorio.mkdir(parents=True)
+    datos = {"dias": {dia: {"pausas": n} for dia, n in dias.items()}}
+    if meses:
+        datos["meses"] = meses
+        datos["semanas"] = semanas or {}
+    (directorio / "estadisticas.json").write_text(json.dumps(datos))
+    if diario:
+        (directorio / "estadisticas.diario").write_text(
+            "".join(json.dumps({"d": dia, "h": "10:00:00"}) + "\n" for dia in diario)
+        )
+
+
+def _usuario_sqlite(directorio, dias, meses=None, semanas=None):
+    directorio.mkdir(parents=True)
+    conexion = sqlite3.connect(directorio / "estadisticas.sqlite3")
+    conexion.executescript(
+        "CREATE TABLE dias (dia TEXT PRIMARY KEY, pausas INTEGER);"
+        "CREATE TABLE meses (mes TEXT PRIMARY KEY, pausas INTEGER, dias INTEGER);"
+        "CREATE TABLE semanas (semana TEXT PRIMARY KEY, pausas INTEGER);"
+    )
+    conexion.executemany("INSERT INTO dias VALUES (?, ?)", dias.items())
+    conexion.executemany(
+        "INSERT INTO meses VALUES (?, ?, ?)",
+        [(mes, a["pausas"], a["dias"]) for mes, a in (meses or {}).items()],
+    )
+    conexion.executemany("INSERT INTO semanas VALUES (?, ?)", (semanas or {}).items())
+    conexion.commit()
+    conexion.close()
+
+
+@pytest.fixture
+def raiz(tmp_path):
+    raiz = tmp_path / "flota"
+    _usuario_json(
+        raiz / "ventas" / "ana",
+        {"2024-06-10": 3, "2024-06-11": 1},
+        diario=["2024-06-11", "2024-06-11"],
+    )
+    _usuario_sqlite(
+        raiz / "ventas" / "luis",
+        {"2024-06-10": 2},
+        # Enero consolidado: pausas los días 1 y 2
+        meses={"2024-01": {"pausas": 5, "dias": 0b11}},
+        semanas={"2024-W01": 5},
+    )
+    _usuario_json(
+        raiz / "soporte" / "eva",
+        {"2024-06-12": 4},
+        meses={"2024-01": {"pausas": 2, "dias": 0b10}},
+        semanas={"2024-W01": 2},
+    )
+    # Usuario directamente bajo la raíz
+    _usuario_json(raiz / "suelto", {"2024-06-10": 1})
+    return raiz
+
+
+def test_agregado_por_equipo(raiz, tmp_path):
+    usuarios, releidos = actualizar(raiz, tmp_path / "cache.json", procesos=1)
+    assert releidos == 4
+    equipos = agregar(usuarios)
+    assert sorted(equipos) == [SIN_EQUIPO, "soporte", "ventas"]
+
+    ventas = equipos["ventas"]
+    assert ventas["usuarios"] == 2
+    assert ventas["diario"]["2024-06-10"] == {"pausas": 5, "usuarios_activos": 2}
+    assert ventas["diario"]["2024-06-11"] == {"pausas": 3, "usuarios_activos": 1}
+    # Días consolidados: activos sin detalle de pausas
+    assert ventas["diario"]["2024-01-02"] == {"pausas": 0, "usuarios_activos": 1}
+    assert ventas["semanal"]["2024-W01"] == {"pausas": 5, "usuarios_activos": 1}
+    semana = date(2024, 6, 10).isocalendar()
+    assert ventas["semanal"][f"2024-W{semana.week:02d}"] == {
+        "pausas": 8,
+        "usuarios_activos": 2,
+    }
+    assert equipos["soporte"]["diario"]["2024-01-02"]["usuarios_activos"] == 1
+    assert equipos[SIN_EQUIPO]["usuarios"] == 1
+
+
+def test_con_procesos_igual_que_en_serie(raiz, tmp_path, monkeypatch):
+    en_serie, _ = actualizar(raiz, tmp_path / "serie.json", procesos=1)
+    # Que compense repartir ya con un usuario por proceso
+    monkeypatch.setattr(flota, "MINIMO_USUARIOS_POR_PROCESO", 1)
+    en_paralelo, releidos = actualizar(raiz, tmp_path / "paralelo.json", procesos=2)
+    assert releidos == 4
+    assert agregar(en_paralelo) == agregar(en_serie)
+
+
+def test_la_cache_solo_relee_lo_que_cambia(raiz, tmp_path):
+    cache = tmp_path / "cache.json"
+    actualizar(raiz, cache, procesos=1)
+    usuarios, releidos = actualizar(raiz, cache, procesos=1)
+    assert releidos == 0
+
+    diario = raiz / "ventas" / "ana" / "estadisticas.diario"
+    with open(diario, "a") as f:
+        f.write(json.dumps({"d": "2024-06-12", "h": "09:00:00"}) + "\n")
+    usuarios, releidos = actualizar(raiz, cache, procesos=1)
+    assert releidos == 1
+    assert usuarios["ventas/ana"]["dias"]["2024-06-12"] == 1
+
+    # Mismo tamaño, otra fecha de modificación
+    snapshot = raiz / "soporte" / "eva" / "estadisticas.json"
+    snapshot.write_text(snapshot.read_text().replace('"pausas": 4', '"pausas": 5'))
+    st = snapshot.stat()
+    os.utime(snapshot, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    usuarios, releidos = actualizar(raiz, cache, procesos=1)
+    assert releidos == 1
+    assert usuarios["soporte/eva"]["dias"]["2024-06-12"] == 5
+
+    (raiz / "suelto" / "estadisticas.json").unlink()
+    usuarios, releidos = actualizar(raiz, cache, procesos=1)
+    assert releidos == 0
+    assert f"{SIN_EQUIPO}/suelto" not in usuarios
+    assert f"{SIN_EQUIPO}/suelto" not in json.loads(cache.read_text())["usuarios"]
+
+
+def test_archivos_danados_no_paran_el_agregado(raiz, tmp_path, capsys):
+    (raiz / "soporte" / "eva" / "estadisticas.json").write_text('{"dias": {"2024-')
+    (raiz / "ventas" / "luis" / "estadisticas.sqlite3").write_bytes(b"no es sqlite")
+    # Diario con una línea cortada por un cierre inesperado
+    with open(raiz / "ventas" / "ana" / "estadisticas.diario", "a") as f:
+        f.write('{"d": "2024-06-1')
+
+    usuarios, _ = actualizar(raiz, tmp_path / "cache.json", procesos=1)
+    avisos = capsys.readouterr().out
+    assert "Aviso: no se pudieron leer las estadísticas" in avisos
+    assert usuarios["soporte/eva"]["dias"] == {}
+    assert usuarios["ventas/luis"]["dias"] == {}
+    assert usuarios["ventas/ana"]["dias"] == {"2024-06-10": 3, "2024-06-11": 3}
+    equipos = agregar(usuarios)
+    assert equipos["ventas"]["diario"]["2024-06-10"] == {
+        "pausas": 3,
+        "usuarios_activos": 1,
+    }
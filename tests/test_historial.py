@@ -0,0 +1,128 @@
+"""Pruebas del historial: ida y vuelta, recuperación y varios procesos."""
+
+import multiprocessing
+
+import pytest
+
+from src import historial as modulo
+from src.historial import (
+    RESULTADO_SALTADO,
+    TIPO_AVISO,
+    TIPO_DESCANSO,
+    Historial,
+)
+
+
+@pytest.fixture
+def rutas(tmp_path, monkeypatch):
+    monkeypatch.setattr(modulo, "EVENTOS_POR_SEGMENTO", 4)
+    return tmp_path / "historial.bin", tmp_path / "historial.cola"
+
+
+def _columnas(h):
+    return (list(h.marcas), list(h.duraciones), list(h.tipos), list(h.resultados))
+
+
+def _anotar_varios(h, n, desde=1_700_000_000):
+    for i in range(n):
+        if i % 3 == 2:
+            h.anotar(TIPO_DESCANSO, desde + 60 * i, 300, RESULTADO_SALTADO)
+        else:
+            h.anotar(TIPO_AVISO, desde + 60 * i)
+
+
+def test_ida_y_vuelta(rutas):
+    h = Historial(*rutas)
+    _anotar_varios(h, 11)
+    h.cerrar()
+    assert rutas[0].exists()  # se sellaron dos segmentos
+    releido = Historial(*rutas)
+    assert _columnas(releido) == _columnas(h)
+    assert len(releido) == 11
+    assert releido.marcas[-1] == 1_700_000_000 + 600
+
+
+def test_reloj_hacia_atras_queda_pegado(rutas):
+    h = Historial(*rutas)
+    h.anotar(TIPO_AVISO, 2000)
+    h.anotar(TIPO_AVISO, 1000)
+    assert list(h.marcas) == [2000, 2000]
+    assert list(Historial(*rutas).marcas) == [2000, 2000]
+
+
+def test_segmento_truncado_se_recupera_de_la_cola(rutas):
+    h = Historial(*rutas)
+    _anotar_varios(h, 4)
+    esperadas = _columnas(h)
+    h.cerrar()
+    # Cierre a medio sellar: el segmento quedó a medias y la cola sigue entera
+    cola = rutas[1].read_bytes()
+    h2 = Historial(*rutas)
+    _anotar_varios(h2, 1, desde=1_700_000_000 + 240)
+    h2.cerrar()
+    rutas[1].write_bytes(cola)
+    datos = rutas[0].read_bytes()
+    rutas[0].write_bytes(datos[:-3])
+
+    recuperado = Historial(*rutas)
+    assert _columnas(recuperado) == esperadas
+    assert len(rutas[0].read_bytes()) < len(datos)
+
+
+def test_cola_con_registro_a_medias(rutas):
+    h = Historial(*rutas)
+    _anotar_varios(h, 3)
+    esperadas = _columnas(h)
+    h.cerrar()
+    with open(rutas[1], "ab") as f:
+        f.write(b"\x01\x02\x03")
+    recuperado = Historial(*rutas)
+    assert _columnas(recuperado) == esperadas
+    # La cola se reescribe sin el resto
+    assert (rutas[1].stat().st_size - modulo._CABECERA_COLA.size) % 12 == 0
+
+
+def test_no_duplica_lo_ya_sellado(rutas):
+    h = Historial(*rutas)
+    _anotar_varios(h, 4)
+    cola_llena = rutas[1].read_bytes()
+    _anotar_varios(h, 1, desde=1_700_000_000 + 240)  # sella los 4 primeros
+    esperadas = _columnas(h)
+    h.cerrar()
+    # Murió tras sellar y antes de vaciar la cola
+    rutas[1].write_bytes(cola_llena)
+    recuperado = Historial(*rutas)
+    assert _columnas(recuperado)[0] == esperadas[0][:4]
+    assert len(recuperado) == 4
+
+
+def _escritor(rutas, proceso, n, listo):
+    modulo.EVENTOS_POR_SEGMENTO = 4
+    h = Historial(*rutas)
+    listo.wait()
+    for i in range(n):
+        # La duración identifica el evento aunque la marca se ajuste
+        h.anotar(TIPO_AVISO, 1_000_000 * proceso + i, 100 * proceso + i)
+    h.cerrar()
+
+
+def test_varios_procesos_no_pierden_ni_duplican(rutas):
+    contexto = multiprocessing.get_context("fork")
+    listo = contexto.Event()
+    procesos = [
+        contexto.Process(target=_escritor, args=(rutas, p, 25, listo))
+        for p in range(1, 5)
+    ]
+    for proceso in procesos:
+        proceso.start()
+    listo.set()
+    for proceso in procesos:
+        proceso.join(30)
+        assert proceso.exitcode == 0
+
+    h = Historial(*rutas)
+    assert sorted(h.duraciones) == [100 * p + i for p in range(1, 5) for i in range(25)]
+    marcas = list(h.marcas)
+    assert marcas == sorted(marcas)
+    # Las marcas son absolutas: ningún evento hereda la diferencia de otro
+    assert marcas[-1] <= 4_000_000 + 24
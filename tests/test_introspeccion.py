@@ -0,0 +1,77 @@
+"""Pruebas de la carga diferida de GObject Introspection y su caché."""
+
+import json
+
+import pytest
+
+from src import introspeccion
+
+
+@pytest.fixture
+def proceso_nuevo(tmp_path, monkeypatch):
+    """Estado de módulo vacío y caché en un directorio temporal.
+
+    Devuelve una función que simula arrancar otro proceso y cuenta las
+    importaciones reales.
+    """
+    typelibs = tmp_path / "girepository-1.0"
+    typelibs.mkdir()
+    monkeypatch.setenv("GI_TYPELIB_PATH", str(typelibs))
+    monkeypatch.setattr(introspeccion, "RUTA_CACHE_GI", tmp_path / "gi.json")
+    importaciones = []
+
+    def reiniciar(resultado):
+        monkeypatch.setattr(introspeccion, "_cargados", {})
+        monkeypatch.setattr(introspeccion, "_cache", None)
+        monkeypatch.setattr(introspeccion, "_huella", None)
+
+        def importar(nombre):
+            importaciones.append(nombre)
+            return resultado
+
+        monkeypatch.setattr(introspeccion, "_importar", importar)
+
+    reiniciar(None)
+    return reiniciar, importaciones, typelibs
+
+
+def test_un_sondeo_por_proceso(proceso_nuevo):
+    _, importaciones, _ = proceso_nuevo
+    assert introspeccion.cargar("atajos") is None
+    assert introspeccion.cargar("atajos") is None
+    assert not introspeccion.disponible("atajos")
+    assert importaciones == ["atajos"]
+
+
+def test_la_cache_evita_importar_en_el_siguiente_arranque(proceso_nuevo):
+    reiniciar, importaciones, _ = proceso_nuevo
+    modulos = {"Keybinder": object()}
+    reiniciar(modulos)
+    assert introspeccion.cargar("atajos") is modulos
+    assert introspeccion.cargar("bandeja") is modulos
+    datos = json.loads(introspeccion.RUTA_CACHE_GI.read_text())
+    assert datos["backends"] == {"atajos": True, "bandeja": True}
+
+    reiniciar(None)
+    # Con la huella intacta responde sin importar nada
+    assert introspeccion.disponible("atajos")
+    assert importaciones == ["atajos", "bandeja"]
+
+
+def test_un_fallo_en_cache_no_se_reintenta(proceso_nuevo):
+    reiniciar, importaciones, _ = proceso_nuevo
+    assert introspeccion.cargar("bandeja") is None
+    reiniciar({"Gtk": object()})
+    assert introspeccion.cargar("bandeja") is None
+    assert importaciones == ["bandeja"]
+
+
+def test_instalar_un_typelib_invalida_la_cache(proceso_nuevo):
+    reiniciar, importaciones, typelibs = proceso_nuevo
+    assert introspeccion.cargar("atajos") is None
+
+    (typelibs / "Keybinder-3.0.typelib").write_bytes(b"")
+    modulos = {"Keybinder": object()}
+    reiniciar(modulos)
+    assert introspeccion.cargar("atajos") is modulos
+    assert importaciones == ["atajos", "atajos"]
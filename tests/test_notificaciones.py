@@ -0,0 +1,189 @@
+"""Pruebas de notificaciones: reintento tras fallos y servicio simulado."""
+
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from src import notificaciones
+
+
+@pytest.fixture
+def estado_limpio(monkeypatch):
+    monkeypatch.setattr(notificaciones, "_conexion", None)
+    monkeypatch.setattr(notificaciones, "_sin_gio", False)
+    monkeypatch.setattr(notificaciones, "_reintentar_en", 0.0)
+    monkeypatch.setattr(
+        notificaciones, "_espera_reintento_s", notificaciones.REINTENTO_DBUS_MIN_S
+    )
+    monkeypatch.setattr(notificaciones, "_ids", {})
+    respaldos = []
+    monkeypatch.setattr(
+        notificaciones, "_notificar_respaldo", lambda t, m: respaldos.append(t)
+    )
+    return respaldos
+
+
+# ── Reintento con un Gio falso ─────────────────────────────────
+
+
+class _Respuesta:
+    def __init__(self, identificador):
+        self._identificador = identificador
+
+    def unpack(self):
+        return (self._identificador,)
+
+
+class _ConexionFalsa:
+    def __init__(self):
+        self.fallar = True
+        self.llamadas = 0
+
+    def call(self, *args):
+        self.llamadas += 1
+        al_responder = args[-1]
+        al_responder(self, None)
+
+    def call_finish(self, _resultado):
+        if self.fallar:
+            raise RuntimeError("simulado")
+        return _Respuesta(7)
+
+
+class _Gio:
+    class BusType:
+        SESSION = 0
+
+    class DBusCallFlags:
+        NONE = 0
+
+    def __init__(self, conexion):
+        self._conexion = conexion
+
+    def bus_get_sync(self, *_args):
+        return self._conexion
+
+
+class _GLib:
+    @staticmethod
+    def Variant(*args):
+        return args
+
+    class VariantType:
+        @staticmethod
+        def new(tipo):
+            return tipo
+
+
+def test_un_fallo_aplaza_dbus_pero_no_lo_descarta(estado_limpio, monkeypatch):
+    conexion = _ConexionFalsa()
+    gi = {"Gio": _Gio(conexion), "GLib": _GLib}
+    monkeypatch.setattr(notificaciones.introspeccion, "cargar", lambda _n: gi)
+    reloj = [1000.0]
+    monkeypatch.setattr(notificaciones.time, "monotonic", lambda: reloj[0])
+
+    notificaciones.notificar("uno", "m", "clave")
+    assert conexion.llamadas == 1
+    assert estado_limpio == ["uno"]
+
+    # Dentro del plazo ni se intenta: va directo al respaldo
+    notificaciones.notificar("dos", "m", "clave")
+    assert conexion.llamadas == 1
+    assert estado_limpio == ["uno", "dos"]
+
+    # Pasado el plazo se reintenta; con éxito la espera vuelve al mínimo
+    conexion.fallar = False
+    reloj[0] += notificaciones.REINTENTO_DBUS_MIN_S
+    notificaciones.notificar("tres", "m", "clave")
+    assert conexion.llamadas == 2
+    assert notificaciones._ids == {"clave": 7}
+    assert notificaciones._espera_reintento_s == notificaciones.REINTENTO_DBUS_MIN_S
+
+
+def test_fallos_seguidos_doblan_la_espera_hasta_el_tope(estado_limpio, monkeypatch):
+    conexion = _ConexionFalsa()
+    gi = {"Gio": _Gio(conexion), "GLib": _GLib}
+    monkeypatch.setattr(notificaciones.introspeccion, "cargar", lambda _n: gi)
+    reloj = [0.0]
+    monkeypatch.setattr(notificaciones.time, "monotonic", lambda: reloj[0])
+
+    esperas = []
+    for _ in range(8):
+        notificaciones.notificar("t", "m")
+        esperas.append(notificaciones._reintentar_en - reloj[0])
+        reloj[0] = notificaciones._reintentar_en
+    assert esperas[0] == notificaciones.REINTENTO_DBUS_MIN_S
+    assert esperas[1] == 2 * notificaciones.REINTENTO_DBUS_MIN_S
+    assert esperas[-1] == notificaciones.REINTENTO_DBUS_MAX_S
+    assert conexion.llamadas == 8
+
+
+# ── Servicio simulado en un bus de sesión propio ───────────────
+
+
+@pytest.fixture
+def servicio(monkeypatch):
+    pytest.importorskip("gi")
+    if shutil.which("dbus-run-session") is None:
+        pytest.skip("falta dbus-run-session")
+    stub = Path(__file__).with_name("stub_notificaciones.py")
+    proceso = subprocess.Popen(
+        ["dbus-run-session", "--", sys.executable, str(stub)],
+        stdout=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+    )
+    try:
+        direccion = proceso.stdout.readline().strip()
+        if not direccion:
+            pytest.skip("no arrancó el bus de sesión")
+        monkeypatch.setenv("DBUS_SESSION_BUS_ADDRESS", direccion)
+        yield proceso.stdout
+    finally:
+        os.killpg(proceso.pid, signal.SIGTERM)
+        proceso.wait(timeout=5)
+
+
+def _esperar(condicion, plazo=5.0):
+    from gi.repository import GLib
+
+    contexto = GLib.MainContext.default()
+    limite = time.monotonic() + plazo
+    while not condicion() and time.monotonic() < limite:
+        contexto.iteration(False)
+        time.sleep(0.01)
+    return condicion()
+
+
+def test_notify_reutiliza_el_id_de_la_misma_clave(estado_limpio, servicio):
+    notificaciones.notificar("primera", "m", "pausa")
+    assert _esperar(lambda: "pausa" in notificaciones._ids)
+    assert servicio.readline().split() == ["0", "1", "primera"]
+
+    notificaciones.notificar("segunda", "m", "pausa")
+    assert servicio.readline().split() == ["1", "1", "segunda"]
+    notificaciones.notificar("otra", "m", "ojos")
+    assert servicio.readline().split() == ["0", "2", "otra"]
+    assert _esperar(lambda: notificaciones._ids.get("ojos") == 2)
+    assert estado_limpio == []
+
+
+def test_error_del_servicio_usa_el_respaldo_y_se_reintenta(
+    estado_limpio, servicio, monkeypatch
+):
+    notificaciones.notificar("fallar", "m", "pausa")
+    assert _esperar(lambda: estado_limpio == ["fallar"])
+    assert servicio.readline().split() == ["0", "0", "fallar"]
+    assert notificaciones._conexion is None
+
+    # Pasado el plazo se vuelve a usar D-Bus
+    monkeypatch.setattr(notificaciones, "_reintentar_en", 0.0)
+    notificaciones.notificar("vuelve", "m", "pausa")
+    assert servicio.readline().split() == ["0", "1", "vuelve"]
+    assert _esperar(lambda: notificaciones._ids.get("pausa") == 1)
@@ -0,0 +1,85 @@
+"""Pruebas del informe de perfilado (``--profile``)."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from src import perfil
+from src.constantes import VARIABLE_ENTORNO_PERFIL
+
+
+@pytest.fixture(autouse=True)
+def estado(monkeypatch):
+    """Deja el módulo como estaba, perfilado o no."""
+    for nombre in ("activo", "_ruta", "_informe", "_seccion"):
+        monkeypatch.setattr(perfil, nombre, getattr(perfil, nombre))
+    monkeypatch.setattr(perfil, "activo", False)
+    monkeypatch.setattr(perfil, "_seccion", None)
+
+
+def _fases(lista: list[dict]) -> list[str]:
+    return [fase["fase"] for fase in lista]
+
+
+def test_desactivado_no_mide_ni_escribe(tmp_path, monkeypatch):
+    monkeypatch.delenv(VARIABLE_ENTORNO_PERFIL, raising=False)
+    monkeypatch.setattr(perfil, "_ruta", tmp_path / "perfil.json")
+    perfil.activar_por_entorno()
+    with perfil.medir("interfaz"), perfil.aviso("recordatorio"):
+        perfil.anotar("interfaz", time.perf_counter())
+    perfil.fin_arranque()
+    assert not perfil.activo
+    assert not (tmp_path / "perfil.json").exists()
+
+
+def test_arranque_y_avisos(tmp_path, monkeypatch):
+    ruta = tmp_path / "perfil.json"
+    monkeypatch.setenv(VARIABLE_ENTORNO_PERFIL, str(ruta))
+    perfil.activar_por_entorno()
+    with perfil.medir("config.cargar"):
+        pass
+    with perfil.medir("interfaz"):
+        perfil.anotar_arranque("pestanas", {"construidas": 1, "total": 7})
+    perfil.fin_arranque()
+    informe = json.loads(ruta.read_text())
+    arranque = informe["arranque"]
+    assert _fases(arranque["fases"]) == ["config.cargar", "interfaz"]
+    assert arranque["total_ms"] >= arranque["fases"][-1]["inicio_ms"]
+    assert arranque["pestanas"] == {"construidas": 1, "total": 7}
+
+    # Fuera del arranque y de un aviso no se anota nada
+    with perfil.medir("suelta"):
+        pass
+    with perfil.aviso("recordatorio"):
+        with perfil.medir("notificacion"):
+            pass
+        fases = perfil.fases_actuales()
+    # Lo que termina después, p.ej. desde el hilo de audio
+    hilo = threading.Thread(
+        target=perfil.anotar, args=("sonido", time.perf_counter(), fases)
+    )
+    hilo.start()
+    hilo.join()
+    perfil.anotar("ventana_descanso", time.perf_counter())
+
+    informe = json.loads(ruta.read_text())
+    assert _fases(informe["arranque"]["fases"]) == ["config.cargar", "interfaz"]
+    (aviso,) = informe["avisos"]
+    assert aviso["aviso"] == "recordatorio"
+    assert _fases(aviso["fases"]) == ["notificacion", "sonido", "ventana_descanso"]
+
+
+def test_conserva_solo_los_ultimos_avisos(tmp_path, monkeypatch):
+    monkeypatch.setattr(perfil, "MAXIMO_AVISOS_PERFIL", 2)
+    ruta = tmp_path / "perfil.json"
+    perfil.activar(str(ruta))
+    perfil.fin_arranque()
+    for tipo in ("uno", "dos", "tres"):
+        with perfil.aviso(tipo):
+            pass
+    informe = json.loads(ruta.read_text())
+    assert [aviso["aviso"] for aviso in informe["avisos"]] == ["dos", "tres"]
+    assert informe["formato"] == 1
+    assert "procesos" in informe
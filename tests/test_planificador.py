@@ -0,0 +1,147 @@
+"""Pruebas de las políticas de recuperación del planificador y de la cuenta atrás."""
+
+import pytest
+
+from src import planificador
+from src.constantes import ESPERA_MAXIMA_PLANIFICADOR_S, TOLERANCIA_RETRASO_S
+from src.planificador import (
+    POLITICA_AGRUPAR,
+    POLITICA_SALTAR,
+    POLITICA_UNA_VEZ,
+    Planificador,
+    hasta_proximo_segundo,
+)
+
+
+class _Bucle:
+    """``after``/``after_cancel`` sin Tk: el despertar lo provoca la prueba."""
+
+    def __init__(self) -> None:
+        self.pendiente = None
+        self.ms = None
+        self._ids = 0
+
+    def after(self, ms: int, funcion) -> str:
+        self._ids += 1
+        self.ms = ms
+        self.pendiente = (f"after#{self._ids}", funcion)
+        return self.pendiente[0]
+
+    def after_cancel(self, identificador: str) -> None:
+        if self.pendiente is not None and self.pendiente[0] == identificador:
+            self.pendiente = None
+
+    def despertar(self) -> None:
+        _, funcion = self.pendiente
+        self.pendiente = None
+        funcion()
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(planificador, "reloj", lambda: ahora[0])
+    return ahora
+
+
+def _planificar(reloj, politica: str, periodo: float | None = 60.0):
+    bucle = _Bucle()
+    plan = Planificador(bucle)
+    ejecuciones = []
+    plan.programar(
+        "aviso",
+        60.0,
+        lambda: ejecuciones.append(reloj[0]),
+        periodo=periodo,
+        politica=politica,
+    )
+    return bucle, plan, ejecuciones
+
+
+def test_a_tiempo_se_ejecuta_y_sigue_la_fase(reloj):
+    bucle, plan, ejecuciones = _planificar(reloj, POLITICA_SALTAR)
+    reloj[0] += 60.0 + TOLERANCIA_RETRASO_S / 2
+    bucle.despertar()
+    assert len(ejecuciones) == 1
+    assert plan.restante("aviso") == pytest.approx(60.0 - TOLERANCIA_RETRASO_S / 2)
+
+
+@pytest.mark.parametrize(
+    "politica, ejecuta, restante",
+    [
+        # Pasa al siguiente hueco de la fase original sin avisar
+        (POLITICA_SALTAR, 0, 50.0),
+        # Un solo aviso por los cinco huecos perdidos, misma fase
+        (POLITICA_AGRUPAR, 1, 50.0),
+        # Un solo aviso y el periodo vuelve a contar desde ahora
+        (POLITICA_UNA_VEZ, 1, 60.0),
+    ],
+)
+def test_periodico_tras_una_suspension(reloj, politica, ejecuta, restante):
+    bucle, plan, ejecuciones = _planificar(reloj, politica)
+    reloj[0] += 60.0 * 5 + 10.0
+    bucle.despertar()
+    assert len(ejecuciones) == ejecuta
+    assert plan.restante("aviso") == pytest.approx(restante)
+    # Nada de ráfagas: el siguiente despertar no vuelve a ejecutarlo
+    bucle.despertar()
+    assert len(ejecuciones) == ejecuta
+
+
+@pytest.mark.parametrize(
+    "politica, ejecuta, activo",
+    [
+        # Se rearma con su duración contada desde ahora
+        (POLITICA_SALTAR, 0, True),
+        (POLITICA_AGRUPAR, 1, False),
+        (POLITICA_UNA_VEZ, 1, False),
+    ],
+)
+def test_simple_tras_una_suspension(reloj, politica, ejecuta, activo):
+    bucle, plan, ejecuciones = _planificar(reloj, politica, periodo=None)
+    reloj[0] += 600.0
+    bucle.despertar()
+    assert len(ejecuciones) == ejecuta
+    assert plan.activo("aviso") is activo
+    if activo:
+        assert plan.restante("aviso") == pytest.approx(60.0)
+
+
+def test_despierta_a_menudo_para_notar_la_suspension(reloj):
+    bucle = _Bucle()
+    plan = Planificador(bucle)
+    plan.programar("largo", 3600.0, lambda: None)
+    assert bucle.ms <= ESPERA_MAXIMA_PLANIFICADOR_S * 1000 + 1
+    reloj[0] += ESPERA_MAXIMA_PLANIFICADOR_S
+    bucle.despertar()
+    assert plan.restante("largo") == pytest.approx(
+        3600.0 - ESPERA_MAXIMA_PLANIFICADOR_S
+    )
+    assert bucle.ms <= ESPERA_MAXIMA_PLANIFICADOR_S * 1000 + 1
+
+
+@pytest.mark.parametrize(
+    "restante, espera",
+    [(10.3, 0.305), (10.0, 1.005), (0.5, 0.505), (12.0005, 1.005)],
+)
+def test_hasta_proximo_segundo(restante, espera):
+    assert hasta_proximo_segundo(restante) == pytest.approx(espera)
+
+
+def test_cuenta_atras_sin_deriva(reloj):
+    bucle = _Bucle()
+    plan = Planificador(bucle)
+    plan.programar("recordatorio", 10.3, lambda: None)
+    mostrados = []
+
+    def tick() -> None:
+        restante = plan.restante("recordatorio")
+        mostrados.append(int(restante))
+        plan.programar("reloj", hasta_proximo_segundo(restante), tick)
+
+    tick()
+    for _ in range(9):
+        # Cada despertar llega justo tras cambiar la cifra
+        reloj[0] += bucle.ms / 1000
+        bucle.despertar()
+    assert mostrados == list(range(10, 0, -1))
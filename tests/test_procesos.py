@@ -0,0 +1,64 @@
+"""Pruebas del supervisor de procesos auxiliares."""
+
+import os
+import time
+
+import pytest
+
+from src.procesos import Supervisor
+
+
+def _esperar_a_que_terminen(supervisor: Supervisor) -> None:
+    limite = time.monotonic() + 10
+    while supervisor.activos() and time.monotonic() < limite:
+        time.sleep(0.02)
+    assert supervisor.activos() == 0
+
+
+@pytest.fixture(params=["pidfd", "sondeo"])
+def supervisor(request, monkeypatch):
+    if request.param == "sondeo":
+        monkeypatch.delattr(os, "pidfd_open", raising=False)
+    elif not hasattr(os, "pidfd_open"):
+        pytest.skip("sin pidfd")
+    return Supervisor(maximo=2)
+
+
+def test_recoge_a_los_hijos_y_los_cuenta(supervisor):
+    assert supervisor.lanzar(["true"])
+    assert supervisor.lanzar(["false"])
+    _esperar_a_que_terminen(supervisor)
+    resumen = supervisor.resumen()
+    assert (resumen["true"]["lanzados"], resumen["true"]["fallidos"]) == (1, 0)
+    assert (resumen["false"]["lanzados"], resumen["false"]["fallidos"]) == (1, 1)
+    assert resumen["true"]["media_ms"] is not None
+
+
+def test_limita_y_mata_a_los_colgados(supervisor):
+    assert supervisor.lanzar(["sleep", "30"], plazo=0.2)
+    assert supervisor.lanzar(["sleep", "30"], plazo=0.2)
+    # Ya hay el máximo en marcha: se rechaza en vez de acumular
+    assert not supervisor.lanzar(["sleep", "30"], plazo=0.2)
+    _esperar_a_que_terminen(supervisor)
+    cuentas = supervisor.resumen()["sleep"]
+    assert cuentas["lanzados"] == cuentas["matados"] == 2
+    assert cuentas["rechazados"] == 1
+    assert supervisor.lanzar(["true"])
+    _esperar_a_que_terminen(supervisor)
+
+
+def test_ejecutar_con_plazo(supervisor):
+    assert supervisor.ejecutar(["sh", "-c", "echo hola"], 5) == b"hola\n"
+    assert supervisor.ejecutar(["false"], 5) is None
+    assert supervisor.ejecutar(["sleep", "30"], 0.1) is None
+    assert supervisor.resumen()["sleep"]["matados"] == 1
+    assert supervisor.resumen()["false"]["fallidos"] == 1
+    # No cuentan para el límite de lanzados sin esperar
+    assert supervisor.activos() == 0
+
+
+def test_binario_ausente(supervisor):
+    assert supervisor.ruta("no-existe-este-ayudante") is None
+    assert not supervisor.lanzar(["no-existe-este-ayudante"])
+    assert supervisor.ejecutar(["no-existe-este-ayudante"], 1) is None
+    assert supervisor.resumen() == {}
@@ -0,0 +1,47 @@
+"""Pruebas del punto de control del temporizador."""
+
+from src.punto_control import (
+    TAMANO_REGISTRO,
+    EstadoTemporizador,
+    PuntoControl,
+    codificar,
+    decodificar,
+)
+
+_ESTADO = EstadoTemporizador(True, True, "descanso", 3, 1_700_000_000.5)
+
+
+def test_ida_y_vuelta():
+    datos = codificar(_ESTADO)
+    assert len(datos) == TAMANO_REGISTRO
+    assert decodificar(datos) == _ESTADO
+
+
+def test_rechaza_cualquier_byte_alterado():
+    datos = codificar(_ESTADO)
+    for posicion in range(len(datos)):
+        roto = bytearray(datos)
+        roto[posicion] ^= 0x01
+        assert decodificar(bytes(roto)) is None, posicion
+
+
+def test_rechaza_registros_truncados_o_largos():
+    datos = codificar(_ESTADO)
+    assert decodificar(b"") is None
+    assert decodificar(datos[:-1]) is None
+    assert decodificar(datos + b"\0") is None
+
+
+def test_archivo_a_medio_escribir(tmp_path):
+    ruta = tmp_path / "temporizador.estado"
+    punto = PuntoControl(ruta)
+    assert punto.leer() is None
+    punto.guardar(_ESTADO)
+    assert punto.leer() == _ESTADO
+
+    # Un pwrite interrumpido deja mezclados el registro nuevo y el viejo
+    nuevo = codificar(_ESTADO._replace(en_ejecucion=False, vence=0.0))
+    viejo = ruta.read_bytes()
+    ruta.write_bytes(nuevo[:10] + viejo[10:])
+    assert punto.leer() is None
+    punto.cerrar()
@@ -0,0 +1,101 @@
+"""Pruebas de los recordatorios adicionales y su agrupación."""
+
+import pytest
+
+from src import planificador
+from src.constantes import RECORDATORIOS_ADICIONALES, VENTANA_AGRUPACION_S
+from src.planificador import Planificador
+from src.recordatorios import GestorRecordatorios
+
+
+class _Bucle:
+    """``after``/``after_cancel`` sin Tk: el despertar lo provoca la prueba."""
+
+    def __init__(self) -> None:
+        self.pendiente = None
+
+    def after(self, ms: int, funcion) -> str:
+        self.pendiente = funcion
+        return "after"
+
+    def after_cancel(self, identificador: str) -> None:
+        self.pendiente = None
+
+    def despertar(self) -> None:
+        funcion, self.pendiente = self.pendiente, None
+        funcion()
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1000.0]
+    monkeypatch.setattr(planificador, "reloj", lambda: ahora[0])
+    return ahora
+
+
+def _gestor(ajustes: dict):
+    bucle = _Bucle()
+    plan = Planificador(bucle)
+    avisos = []
+    gestor = GestorRecordatorios(
+        plan, lambda titulo, mensaje, sonido: avisos.append((titulo, sonido))
+    )
+    gestor.configurar(ajustes)
+    gestor.iniciar()
+    return bucle, plan, gestor, avisos
+
+
+def test_cada_tipo_con_su_intervalo(reloj):
+    bucle, plan, _, avisos = _gestor(
+        {
+            "ojos": {"activo": True, "intervalo": 20},
+            "postura": {"activo": True, "intervalo": 30, "sonido": "Click"},
+            "hidratacion": {"activo": False},
+        }
+    )
+    assert not plan.activo("aviso:hidratacion")
+    for minuto in (20, 30, 40):
+        reloj[0] = 1000.0 + minuto * 60
+        bucle.despertar()
+    ojos = RECORDATORIOS_ADICIONALES["ojos"]
+    postura = RECORDATORIOS_ADICIONALES["postura"]
+    assert avisos == [
+        (ojos["titulo"], ojos["sonido"]),
+        (postura["titulo"], "Click"),
+        (ojos["titulo"], ojos["sonido"]),
+    ]
+
+
+def test_los_que_coinciden_van_en_un_solo_aviso(reloj):
+    bucle, plan, _, avisos = _gestor(
+        {
+            "ojos": {"activo": True, "intervalo": 20},
+            "postura": {"activo": True, "intervalo": 20},
+        }
+    )
+    reloj[0] += 20 * 60
+    bucle.despertar()
+    assert avisos == [("Recordatorios", RECORDATORIOS_ADICIONALES["ojos"]["sonido"])]
+    # Ambos siguen con su periodo, sin avisar otra vez en este despertar
+    assert plan.restante("aviso:postura") == pytest.approx(20 * 60)
+
+
+def test_se_reservan_para_el_aviso_principal(reloj):
+    bucle, plan, gestor, avisos = _gestor({"ojos": {"activo": True, "intervalo": 20}})
+    plan.programar("recordatorio", 20 * 60 + VENTANA_AGRUPACION_S / 2, lambda: None)
+    reloj[0] += 20 * 60
+    bucle.despertar()
+    assert avisos == []
+    ojos = RECORDATORIOS_ADICIONALES["ojos"]
+    assert gestor.agrupar_con_principal() == [(ojos["titulo"], ojos["mensaje"])]
+    assert gestor.agrupar_con_principal() == []
+
+
+def test_ajustes_invalidos_usan_los_predeterminados():
+    gestor = GestorRecordatorios(Planificador(_Bucle()), lambda *_: None)
+    gestor.configurar({"ojos": {"activo": 1, "intervalo": "mucho"}})
+    ajustes = gestor.ajustes()
+    assert ajustes["ojos"]["activo"] is True
+    predeterminado = RECORDATORIOS_ADICIONALES["ojos"]["intervalo"]
+    assert ajustes["ojos"]["intervalo"] == predeterminado
+    assert ajustes["postura"]["activo"] is False
@@ -0,0 +1,209 @@
+"""Pruebas de la sincronización: agregados, identificador y equipos hermanos."""
+
+import json
+import random
+import shutil
+from datetime import date, timedelta
+
+import pytest
+
+from src import sincronizacion
+from src.constantes import (
+    RUTA_ARCHIVO_ESTADISTICAS,
+    RUTA_DIRECTORIO_CONFIG,
+    RUTA_DIRECTORIO_ESTADO,
+)
+from src.estadisticas import Estadisticas, consolidar, dias_activos_hasta
+from src.sincronizacion import ServidorSincronizacion, Sincronizador, sumar_equipos
+
+
+class _Planificador:
+    """Lo mínimo de ``Planificador`` que usa el sincronizador."""
+
+    def programar(self, *args, **kwargs) -> None:
+        pass
+
+    def restante(self, clave: str) -> None:
+        return None
+
+    def cancelar(self, *claves: str) -> None:
+        pass
+
+
+class _Estadisticas:
+    """Estadísticas de otro equipo: solo ``datos`` y lo que le llega."""
+
+    def __init__(self, datos: dict) -> None:
+        self.datos = datos
+        self.remotos: tuple = ({}, {}, {})
+
+    def actualizar_remotos(self, dias, meses=None, semanas=None) -> None:
+        self.remotos = (dias, meses, semanas)
+
+
+@pytest.fixture
+def config_vacia():
+    for directorio in (RUTA_DIRECTORIO_CONFIG, RUTA_DIRECTORIO_ESTADO):
+        shutil.rmtree(directorio, ignore_errors=True)
+    RUTA_DIRECTORIO_CONFIG.mkdir(parents=True)
+    yield
+    for directorio in (RUTA_DIRECTORIO_CONFIG, RUTA_DIRECTORIO_ESTADO):
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def _pausas(desde: date, hasta: date, semilla: int) -> dict[str, int]:
+    aleatorio = random.Random(semilla)
+    pausas = {}
+    dia = desde
+    while dia <= hasta:
+        if aleatorio.random() < 0.7:
+            pausas[dia.isoformat()] = aleatorio.randint(1, 9)
+        dia += timedelta(days=1)
+    return pausas
+
+
+def _datos(pausas: dict[str, int]) -> dict:
+    return {
+        "dias": {
+            iso: {"pausas": n, "primera": "09:00:00", "ultima": "17:00:00"}
+            for iso, n in pausas.items()
+        }
+    }
+
+
+def _suma(pausas: dict[str, int], desde: date, hasta: date) -> int:
+    desde_iso, hasta_iso = desde.isoformat(), hasta.isoformat()
+    return sum(n for iso, n in pausas.items() if desde_iso <= iso <= hasta_iso)
+
+
+def _cliente(
+    monkeypatch, equipo: str, estadisticas, servidor=None, ruta_equipos=None
+) -> Sincronizador:
+    monkeypatch.setattr(sincronizacion, "identificador_equipo", lambda: equipo)
+    cliente = Sincronizador(
+        _Planificador(),
+        estadisticas,
+        "http://servidor",
+        lambda: None,
+        ruta_equipos=ruta_equipos or sincronizacion.RUTA_EQUIPOS,
+        ruta_estado=RUTA_DIRECTORIO_ESTADO / f"{equipo}.json",
+    )
+    if servidor is not None:
+        cliente._peticion = servidor.atender
+    return cliente
+
+
+def _sincronizar(cliente: Sincronizador) -> None:
+    cliente.sincronizar()
+    cliente._hilo.join()
+    cliente._recoger()
+
+
+def test_sumar_equipos_usa_el_mes_en_lugar_de_sus_dias():
+    dias, meses, semanas = sumar_equipos(
+        {
+            "a": {"2024-01": 10, "2024-01#dias": 0b101, "2024-01-05": 7},
+            "b": {"2024-01": 4, "2024-01#dias": 0b110, "2024-W01": 4},
+            "c": {"2024-01-05": 2, "2024-02-01": 3},
+        }
+    )
+    assert dias == {"2024-01-05": 2, "2024-02-01": 3}
+    assert meses == {"2024-01": {"pausas": 14, "dias": 0b111}}
+    assert semanas == {"2024-W01": 4}
+
+
+def test_otros_meses_alargan_la_racha():
+    datos = _datos({"2024-03-01": 1, "2024-03-02": 1})
+    otros_meses = {"2024-02": {"pausas": 29, "dias": (1 << 29) - 1}}
+    assert dias_activos_hasta(datos, date(2024, 3, 2)) == 2
+    assert dias_activos_hasta(datos, date(2024, 3, 2), (), otros_meses) == 31
+
+
+def test_agregados_de_otro_equipo(config_vacia, monkeypatch, tmp_path):
+    hoy = date.today()
+    desde = hoy - timedelta(days=400)
+    propias = _pausas(desde, hoy, 1)
+    ajenas = _pausas(desde, hoy, 2)
+    RUTA_ARCHIVO_ESTADISTICAS.write_text(json.dumps(_datos(propias)))
+    # Este equipo conserva más detalle que el otro
+    estadisticas = Estadisticas("json", retencion_dias=200)
+    datos_ajenos = _datos(ajenas)
+    consolidar(datos_ajenos, 60, hoy)
+
+    servidor = ServidorSincronizacion(tmp_path / "servidor.json")
+    otro = _cliente(
+        monkeypatch, "otro", _Estadisticas(datos_ajenos), servidor, tmp_path / "o"
+    )
+    este = _cliente(monkeypatch, "este", estadisticas, servidor)
+    _sincronizar(otro)
+    _sincronizar(este)
+
+    assert estadisticas.pausas_por_dia(hoy - timedelta(days=150), hoy) is None
+    dia = desde
+    while dia <= hoy:
+        lunes = dia - timedelta(days=dia.weekday())
+        domingo = lunes + timedelta(days=6)
+        esperado = _suma(propias, lunes, domingo) + _suma(ajenas, lunes, domingo)
+        assert estadisticas.pausas_semana(dia) == esperado
+        inicio = dia.replace(day=1)
+        fin = (inicio + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        esperado = _suma(propias, inicio, fin) + _suma(ajenas, inicio, fin)
+        assert estadisticas.pausas_mes(dia) == esperado
+        dia += timedelta(days=5)
+
+    # El otro equipo consolida más meses: sus días se sustituyen, no se suman
+    consolidar(datos_ajenos, 30, hoy + timedelta(days=31))
+    _sincronizar(otro)
+    _sincronizar(este)
+    hace_un_mes = hoy.replace(day=1) - timedelta(days=1)
+    inicio = hace_un_mes.replace(day=1)
+    assert estadisticas.pausas_mes(hace_un_mes) == _suma(
+        propias, inicio, hace_un_mes
+    ) + _suma(ajenas, inicio, hace_un_mes)
+
+
+def test_identificador_y_estado_por_equipo(config_vacia, monkeypatch, tmp_path):
+    ids = []
+    for contenido in ("a" * 32, "b" * 32):
+        ruta = tmp_path / contenido[0]
+        ruta.write_text(contenido + "\n")
+        monkeypatch.setattr(sincronizacion, "RUTA_ID_MAQUINA", ruta)
+        ids.append(sincronizacion.identificador_equipo())
+    assert ids[0] != ids[1]
+    assert sincronizacion.identificador_equipo() == ids[1]
+
+    cliente = Sincronizador(
+        _Planificador(), _Estadisticas(_datos({})), "http://servidor", lambda: None
+    )
+    cliente.cerrar()
+    assert cliente.dispositivo == ids[1]
+    assert (RUTA_DIRECTORIO_ESTADO / f"sincronizacion-{ids[1]}.json").exists()
+    registro = json.loads(sincronizacion.RUTA_EQUIPOS.read_text())
+    assert registro == {"equipos": [ids[1]]}
+
+
+def test_equipos_que_comparten_configuracion(config_vacia, monkeypatch, tmp_path):
+    hoy = date.today()
+    # Estadísticas en el mismo $HOME por NFS: las ven los dos equipos
+    compartidas = _Estadisticas(_datos({}))
+    servidor = ServidorSincronizacion(tmp_path / "servidor.json")
+    nfs_a = _cliente(monkeypatch, "nfs-a", compartidas, servidor)
+    nfs_b = _cliente(monkeypatch, "nfs-b", compartidas, servidor)
+    fuera = _Estadisticas(_datos({}))
+    portatil = _cliente(
+        monkeypatch, "portatil", fuera, servidor, tmp_path / "portatil.json"
+    )
+
+    # nfs-a registra 2 pausas y nfs-b 1, todas en las estadísticas comunes
+    compartidas.datos = _datos({hoy.isoformat(): 3})
+    for cliente in (nfs_a, nfs_a, nfs_b):
+        cliente.tras_pausa()
+    _sincronizar(nfs_b)
+    _sincronizar(nfs_a)
+    assert nfs_a._propios[hoy.isoformat()][0] == 2
+    assert nfs_b._propios[hoy.isoformat()][0] == 1
+    # Cada equipo NFS no suma lo del otro: ya está en las estadísticas
+    assert compartidas.remotos[0] == {}
+
+    _sincronizar(portatil)
+    assert fuera.remotos[0] == {hoy.isoformat(): 3}
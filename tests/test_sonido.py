@@ -0,0 +1,114 @@
+"""Pruebas de la caché de sonidos decodificados."""
+
+import os
+import wave
+
+import pytest
+
+from src import sonido
+from src.constantes import CANALES_AUDIO, FRECUENCIA_AUDIO
+
+
+class _Reproductor:
+    """Salida de audio persistente que solo apunta lo que recibe."""
+
+    def __init__(self) -> None:
+        self.reproducidos: list[bytes] = []
+
+    def disponible(self) -> bool:
+        return True
+
+    def preparar(self) -> None:
+        pass
+
+    def reproducir(self, pcm: bytes) -> None:
+        self.reproducidos.append(pcm)
+
+
+@pytest.fixture
+def reproductor(monkeypatch):
+    monkeypatch.setattr(sonido, "_cache", {})
+    monkeypatch.setattr(sonido, "_fallidos", {})
+    monkeypatch.setattr(sonido, "_decodificando", set())
+    falso = _Reproductor()
+    monkeypatch.setattr(sonido, "_reproductor", falso)
+    return falso
+
+
+def _wav(ruta, muestras: int, valor: int = 1) -> bytes:
+    pcm = valor.to_bytes(2, "little", signed=True) * CANALES_AUDIO * muestras
+    with wave.open(str(ruta), "wb") as wav:
+        wav.setsampwidth(2)
+        wav.setframerate(FRECUENCIA_AUDIO)
+        wav.setnchannels(CANALES_AUDIO)
+        wav.writeframes(pcm)
+    return pcm
+
+
+def test_decodifica_una_vez_y_reproduce_desde_memoria(
+    reproductor, tmp_path, monkeypatch
+):
+    ruta = str(tmp_path / "aviso.wav")
+    pcm = _wav(ruta, 100)
+    sonido._decodificar_en_cache(ruta)
+    assert sonido._en_cache(ruta) == pcm
+
+    lanzados = []
+    monkeypatch.setattr(sonido.supervisor, "lanzar", lanzados.append)
+    sonido.reproducir(ruta)
+    assert reproductor.reproducidos == [pcm]
+    assert lanzados == []
+
+    # Otro archivo en la misma ruta: la caché deja de valer
+    _wav(ruta, 120, valor=2)
+    assert sonido._en_cache(ruta) is None
+
+
+def test_recorta_los_sonidos_largos(reproductor, tmp_path, monkeypatch):
+    monkeypatch.setattr(sonido, "DURACION_MAXIMA_SONIDO_S", 0.001)
+    ruta = str(tmp_path / "largo.wav")
+    _wav(ruta, FRECUENCIA_AUDIO)
+    sonido._decodificar_en_cache(ruta)
+    assert len(sonido._en_cache(ruta)) == sonido._limite_bytes()
+
+
+def test_no_reintenta_lo_que_no_se_pudo_decodificar(
+    reproductor, tmp_path, monkeypatch, capsys
+):
+    monkeypatch.setattr(sonido, "_orden_decodificador", lambda _ruta: None)
+    ruta = tmp_path / "aviso.ogg"
+    ruta.write_bytes(b"no es audio")
+    sonido._decodificar_en_cache(str(ruta))
+    assert "Aviso: no se pudo decodificar" in capsys.readouterr().out
+    assert sonido._fallido(str(ruta))
+
+    intentos = []
+    monkeypatch.setattr(sonido, "_decodificar", intentos.append)
+    sonido.precargar(str(ruta))
+    assert intentos == []
+
+    # Al cambiar el archivo se vuelve a intentar
+    ruta.write_bytes(b"otra cosa distinta")
+    os.utime(ruta, ns=(0, ruta.stat().st_mtime_ns + 1_000_000_000))
+    assert not sonido._fallido(str(ruta))
+
+
+def test_sin_cache_usa_un_proceso_y_decodifica_para_la_proxima(
+    reproductor, tmp_path, monkeypatch
+):
+    ruta = str(tmp_path / "aviso.wav")
+    pcm = _wav(ruta, 50)
+    lanzados = []
+    monkeypatch.setattr(
+        sonido.supervisor, "lanzar", lambda orden: lanzados.append(orden) or True
+    )
+    precargados = []
+    monkeypatch.setattr(sonido, "precargar", precargados.append)
+    sonido.reproducir(ruta)
+    assert lanzados == [["paplay", ruta]]
+    assert precargados == [ruta]
+    assert reproductor.reproducidos == []
+
+    sonido._decodificar_en_cache(ruta)
+    sonido.reproducir(ruta)
+    assert reproductor.reproducidos == [pcm]
@@ -0,0 +1,89 @@
+"""Pruebas de la ventana de descanso reutilizable y de sus monitores."""
+
+import pytest
+
+from src import ventana_descanso
+from src.ventana_descanso import monitores
+
+_XRANDR = b"""Monitors: 3
+ 0: +HDMI-1 1920/527x1080/296+0+0  HDMI-1
+ 1: +*eDP-1 2560/344x1600/215+1920+0  eDP-1
+ 2: +DP-2 1280/300x1024/240+-1280+56  DP-2
+"""
+
+
+def test_monitores_con_el_principal_primero(monkeypatch):
+    monkeypatch.setattr(
+        ventana_descanso.supervisor, "ejecutar", lambda _orden, _plazo: _XRANDR
+    )
+    assert monitores() == [
+        (2560, 1600, 1920, 0),
+        (1920, 1080, 0, 0),
+        (1280, 1024, -1280, 56),
+    ]
+
+
+@pytest.mark.parametrize(
+    "salida", [None, b"", b"Monitors: 0\n", b"basura\nsin datos"]
+)
+def test_monitores_sin_xrandr_o_sin_respuesta(monkeypatch, salida):
+    monkeypatch.setattr(
+        ventana_descanso.supervisor, "ejecutar", lambda _orden, _plazo: salida
+    )
+    assert monitores() == []
+
+
+class _Planificador:
+    """Solo recuerda los plazos; la prueba decide cuándo vencen."""
+
+    def __init__(self) -> None:
+        self.plazos: dict[str, tuple[float, object]] = {}
+
+    def programar(self, clave, segundos, funcion, **_opciones) -> None:
+        self.plazos[clave] = (segundos, funcion)
+
+    def cancelar(self, *claves) -> None:
+        for clave in claves:
+            self.plazos.pop(clave, None)
+
+    def restante(self, clave):
+        plazo = self.plazos.get(clave)
+        return None if plazo is None else plazo[0]
+
+
+def test_reutiliza_las_ventanas_entre_descansos(monkeypatch):
+    tk = pytest.importorskip("tkinter")
+    try:
+        raiz = tk.Tk()
+    except tk.TclError:
+        pytest.skip("sin pantalla para Tk")
+    respuesta = [[(800, 600, 0, 0)]]
+    monkeypatch.setattr(ventana_descanso, "monitores", lambda: respuesta[0])
+    planificador = _Planificador()
+    ventana = ventana_descanso.VentanaDescanso(raiz, planificador)
+    try:
+        ventana.preparar()
+        finalizados = []
+        ventana.mostrar(5, finalizados.append)
+        primeras = list(ventana._ventanas)
+        assert ventana.visible
+        assert planificador.restante("descanso") == 300
+
+        _, cerrar = planificador.plazos["descanso"]
+        cerrar()
+        assert finalizados == [False] and not ventana.visible
+        assert all(v.state() == "withdrawn" for v in primeras)
+
+        # Mismos monitores: las mismas ventanas, solo se vuelven a mostrar
+        ventana._al_conocer_monitores(respuesta[0])
+        ventana.mostrar(5, finalizados.append)
+        assert ventana._ventanas == primeras
+        ventana.cerrar()
+
+        # Un monitor nuevo: se reconstruyen, una por monitor
+        ventana._al_conocer_monitores([(800, 600, 0, 0), (1024, 768, 800, 0)])
+        assert len(ventana._ventanas) == 2
+        assert ventana._ventanas[0] is not primeras[0]
+    finally:
+        ventana.destruir()
+        raiz.destroy()